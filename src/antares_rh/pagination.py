@@ -0,0 +1,219 @@
+# antares_rh/pagination.py
+"""
+Pagination par curseur (keyset) pour les listes du backoffice.
+
+Contrairement au Paginator de Django, aucune requête COUNT(*) ni OFFSET :
+chaque page filtre sur la clé de tri de la dernière ligne vue, par exemple
+    (date_postulation, id) < (:date, :id)
+ce qui coûte le même prix à la page 1 et à la page 500 dès qu'un index
+couvre la clé de tri.
+
+Utilisation :
+    paginator = KeysetPaginator(candidatures, 20, ordering=('-date_postulation', '-pk'))
+    page_obj = paginator.get_page(request.GET)
+
+Le curseur est opaque (JSON encodé en base64) et les liens de la page
+conservent les autres paramètres GET (filtres, recherche).
+"""
+import base64
+import binascii
+import datetime
+import json
+
+from django.db import DatabaseError
+from django.db.models import Q
+
+CURSOR_PARAM = 'cursor'
+
+
+def encoder_curseur(valeurs, direction='next'):
+    brut = json.dumps({'v': valeurs, 'd': direction}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(brut.encode()).decode().rstrip('=')
+
+
+def decoder_curseur(curseur):
+    """Retourne (valeurs, direction) ou (None, 'next') si le curseur est invalide"""
+    if not curseur:
+        return None, 'next'
+    try:
+        rembourrage = '=' * (-len(curseur) % 4)
+        donnees = json.loads(base64.urlsafe_b64decode(curseur + rembourrage))
+        valeurs, direction = donnees['v'], donnees.get('d', 'next')
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        return None, 'next'
+    if not isinstance(valeurs, list) or direction not in ('next', 'prev'):
+        return None, 'next'
+    return valeurs, direction
+
+
+def _serialiser(valeur):
+    # isoformat garde les microsecondes, nécessaires à l'égalité exacte
+    if isinstance(valeur, (datetime.date, datetime.datetime)):
+        return valeur.isoformat()
+    if isinstance(valeur, (int, float, str)) or valeur is None:
+        return valeur
+    return str(valeur)
+
+
+def estimer_total(queryset):
+    """
+    Nombre de lignes estimé par le planificateur PostgreSQL (EXPLAIN),
+    sans exécuter de COUNT. Retourne None si l'estimation est indisponible.
+    """
+    try:
+        plan = json.loads(queryset.order_by().explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows'])
+    except (DatabaseError, ValueError, KeyError, IndexError, TypeError):
+        return None
+
+
+class KeysetPage:
+    def __init__(self, object_list, paginator, params, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._params = params
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def __repr__(self):
+        return f'<KeysetPage: {len(self.object_list)} éléments>'
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not (self._has_next and self.object_list):
+            return None
+        return encoder_curseur(self.paginator.cle(self.object_list[-1]), 'next')
+
+    @property
+    def previous_cursor(self):
+        if not (self._has_previous and self.object_list):
+            return None
+        return encoder_curseur(self.paginator.cle(self.object_list[0]), 'prev')
+
+    def _querystring(self, curseur):
+        params = self._params.copy()
+        for cle in (CURSOR_PARAM, 'page'):
+            params.pop(cle, None)
+        if curseur:
+            params[CURSOR_PARAM] = curseur
+        return params.urlencode()
+
+    @property
+    def next_querystring(self):
+        return self._querystring(self.next_cursor)
+
+    @property
+    def previous_querystring(self):
+        return self._querystring(self.previous_cursor)
+
+    @property
+    def first_querystring(self):
+        return self._querystring(None)
+
+    @property
+    def estimated_total(self):
+        return self.paginator.estimated_total
+
+
+class KeysetPaginator:
+    """
+    `ordering` : champs de tri, le dernier doit être unique (en général '-pk').
+    Les champs peuvent traverser des relations ou être des annotations.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-pk',), estimate_total=False):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.estimate_total = estimate_total
+        self._estimated_total = None
+
+    @staticmethod
+    def _nom(champ):
+        return champ.lstrip('-')
+
+    def cle(self, obj):
+        """Valeurs de la clé de tri d'un objet de la page"""
+        valeurs = []
+        for champ in self.ordering:
+            valeur = obj
+            for partie in self._nom(champ).split('__'):
+                valeur = getattr(valeur, partie, None)
+                if valeur is None:
+                    break
+            valeurs.append(_serialiser(valeur))
+        return valeurs
+
+    def _condition(self, valeurs, vers_l_avant):
+        """
+        Condition lexicographique (a, b, c) > / < (x, y, z) développée en
+        a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+        """
+        condition = Q()
+        egalites = {}
+        for champ, valeur in zip(self.ordering, valeurs):
+            nom = self._nom(champ)
+            descendant = champ.startswith('-')
+            # Sens de la comparaison selon l'ordre du champ et la direction
+            lookup = 'lt' if descendant == vers_l_avant else 'gt'
+            condition |= Q(**egalites, **{f'{nom}__{lookup}': valeur})
+            egalites[nom] = valeur
+        return condition
+
+    @staticmethod
+    def _inverser(champ):
+        return champ[1:] if champ.startswith('-') else f'-{champ}'
+
+    @property
+    def estimated_total(self):
+        if self.estimate_total and self._estimated_total is None:
+            self._estimated_total = estimer_total(self.queryset)
+        return self._estimated_total
+
+    def get_page(self, params):
+        """`params` : QueryDict de la requête (request.GET)"""
+        valeurs, direction = decoder_curseur(params.get(CURSOR_PARAM))
+        if valeurs is not None and len(valeurs) != len(self.ordering):
+            valeurs, direction = None, 'next'
+
+        queryset = self.queryset
+        if direction == 'prev':
+            queryset = queryset.order_by(*(self._inverser(c) for c in self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if valeurs is not None:
+            queryset = queryset.filter(self._condition(valeurs, direction == 'next'))
+
+        lignes = list(queryset[:self.per_page + 1])
+        il_y_a_plus = len(lignes) > self.per_page
+        lignes = lignes[:self.per_page]
+
+        if direction == 'prev':
+            lignes.reverse()
+            has_previous, has_next = il_y_a_plus, True
+        else:
+            has_previous, has_next = valeurs is not None, il_y_a_plus
+
+        return KeysetPage(lignes, self, params, has_next, has_previous)
@@ -54,6 +54,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'django_summernote',
     'taggit',
     'widget_tweaks',
@@ -93,19 +94,19 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-# Middleware avec cache
-# settings.py - Cache configuration
-
-#CACHES = {
-#    'default': {
-#        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-#        'LOCATION': 'antares-rh-cache',
-#        'TIMEOUT': 60 * 5, 
-#        'OPTIONS': {
-#            'MAX_ENTRIES': 100
-#        }
-#    }
-#}
+# Cache partagé par tous les processus (pages publiques, flux, fragments) :
+# fichiers dans /app/cache (créé par le Dockerfile), ou backend désigné par
+# CACHE_URL (ex. redis://redis:6379/1). Une invalidation par signal est
+# ainsi vue de tous les workers. Avec plusieurs workers, préférer Redis :
+# incr / add y sont atomiques (journal du rapprochement candidats, qui
+# tolère le cache fichiers au prix d'une reconstruction périodique).
+CACHE_DIR = '/app/cache' if os.path.isdir('/app/cache') else BASE_DIR / 'cache'
+CACHES = {
+    'default': env.cache('CACHE_URL', default=f'filecache://{CACHE_DIR}'),
+}
+CACHES['default'].setdefault('TIMEOUT', 60 * 5)
+if CACHES['default']['BACKEND'].endswith('FileBasedCache'):
+    CACHES['default'].setdefault('OPTIONS', {}).setdefault('MAX_ENTRIES', 5000)
 
 
 ROOT_URLCONF = 'antares_rh.urls'
@@ -196,6 +197,10 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Téléchargements protégés (antares_rh/telechargements.py) : 'nginx' (X-Accel-Redirect),
+# 'sendfile' (X-Sendfile) ou vide pour servir les fichiers depuis Django
+PROTECTED_DOWNLOADS_BACKEND = env('PROTECTED_DOWNLOADS_BACKEND', default=None)
+PROTECTED_DOWNLOADS_PREFIX = env('PROTECTED_DOWNLOADS_PREFIX', default='/protected-media/')
 STATICFILES_DIRS = [
     BASE_DIR / 'site_web/static',  # Chemin vers les statics de l'app site_web
 
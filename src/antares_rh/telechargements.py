@@ -0,0 +1,152 @@
+# antares_rh/telechargements.py
+"""
+Téléchargements protégés.
+
+La vue vérifie les droits, puis `servir_fichier` délègue le transfert :
+    - PROTECTED_DOWNLOADS_BACKEND = 'nginx'    : en-tête X-Accel-Redirect vers
+      PROTECTED_DOWNLOADS_PREFIX (location `internal` pointant sur MEDIA_ROOT) ;
+    - PROTECTED_DOWNLOADS_BACKEND = 'sendfile' : en-tête X-Sendfile avec le
+      chemin absolu (Apache mod_xsendfile, lighttpd) ;
+    - sinon, Django sert le fichier lui-même, avec ETag / Last-Modified,
+      réponses 304 et requêtes partielles (Range, une seule plage).
+
+Exemple nginx :
+    location /protected-media/ {
+        internal;
+        alias /app/media/;
+    }
+"""
+import mimetypes
+import os
+import re
+import zlib
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, quote_etag
+
+from documents.stockage import empreinte_depuis_nom
+
+TAILLE_BLOC = 64 * 1024
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _etag(fichier, taille, modification):
+    # Stockage dédupliqué : l'empreinte SHA-256 du contenu est un ETag fort
+    empreinte = empreinte_depuis_nom(fichier.name)
+    if empreinte:
+        return quote_etag(empreinte)
+    # Sinon taille + date de modification + nom : change à chaque ré-upload,
+    # identique d'un worker à l'autre (crc32 plutôt que hash(), salé par processus)
+    return quote_etag(f'{int(modification):x}-{taille:x}-{zlib.crc32(fichier.name.encode()):x}')
+
+
+def _plage(entete, taille):
+    """
+    (début, fin incluse) demandés par l'en-tête Range, None si absent ou
+    multi-plages (réponse complète), 'invalide' si non satisfaisable.
+    """
+    correspondance = _RANGE_RE.match((entete or '').strip())
+    if not correspondance:
+        return None
+    debut, fin = correspondance.groups()
+    if not debut and not fin:
+        return None
+    if not debut:
+        # bytes=-500 : les 500 derniers octets
+        longueur = int(fin)
+        if longueur == 0:
+            return 'invalide'
+        return max(taille - longueur, 0), taille - 1
+    debut = int(debut)
+    fin = min(int(fin), taille - 1) if fin else taille - 1
+    if debut >= taille or fin < debut:
+        return 'invalide'
+    return debut, fin
+
+
+def _lire_plage(fichier, debut, longueur):
+    try:
+        fichier.seek(debut)
+        restant = longueur
+        while restant > 0:
+            bloc = fichier.read(min(TAILLE_BLOC, restant))
+            if not bloc:
+                break
+            restant -= len(bloc)
+            yield bloc
+    finally:
+        fichier.close()
+
+
+def servir_fichier(request, fichier, nom=None, en_piece_jointe=True):
+    """
+    Réponse de téléchargement pour un FieldFile dont l'accès a déjà été vérifié.
+    `nom` : nom proposé au navigateur (par défaut le nom du fichier stocké).
+    """
+    nom = nom or os.path.basename(fichier.name)
+    # Le nom affiché n'a pas toujours d'extension (Document.nom) : on reprend celle du fichier
+    extension = os.path.splitext(fichier.name)[1]
+    if extension and not nom.lower().endswith(extension.lower()):
+        nom = f'{nom}{extension}'
+    content_type = mimetypes.guess_type(fichier.name)[0] or 'application/octet-stream'
+
+    chemin = fichier.path
+    stat = os.stat(chemin)
+    etag = _etag(fichier, stat.st_size, stat.st_mtime)
+    derniere_modification = http_date(stat.st_mtime)
+
+    # 304 si le client a déjà cette version
+    reponse = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if reponse is not None:
+        return reponse
+
+    backend = getattr(settings, 'PROTECTED_DOWNLOADS_BACKEND', None)
+    if backend == 'nginx':
+        prefixe = getattr(settings, 'PROTECTED_DOWNLOADS_PREFIX', '/protected-media/')
+        reponse = HttpResponse(content_type=content_type)
+        reponse['X-Accel-Redirect'] = prefixe.rstrip('/') + '/' + quote(fichier.name)
+    elif backend == 'sendfile':
+        reponse = HttpResponse(content_type=content_type)
+        reponse['X-Sendfile'] = chemin
+    else:
+        reponse = _reponse_django(request, fichier, stat.st_size, content_type, etag)
+
+    reponse['ETag'] = etag
+    reponse['Last-Modified'] = derniere_modification
+    reponse['Accept-Ranges'] = 'bytes'
+    reponse['Cache-Control'] = 'private, max-age=0, must-revalidate'
+    reponse['Content-Disposition'] = content_disposition_header(en_piece_jointe, nom)
+    return reponse
+
+
+def _reponse_django(request, fichier, taille, content_type, etag):
+    """Transfert par Django : fichier complet ou plage demandée (206 / 416)"""
+    plage = _plage(request.headers.get('Range'), taille)
+
+    # If-Range : la plage n'est honorée que si la version n'a pas changé
+    if_range = request.headers.get('If-Range')
+    if plage is not None and if_range and if_range != etag:
+        plage = None
+
+    if plage == 'invalide':
+        reponse = HttpResponse(status=416)
+        reponse['Content-Range'] = f'bytes */{taille}'
+        return reponse
+
+    if plage is None:
+        reponse = FileResponse(fichier.open('rb'), content_type=content_type)
+        reponse['Content-Length'] = taille
+        return reponse
+
+    debut, fin = plage
+    longueur = fin - debut + 1
+    reponse = StreamingHttpResponse(
+        _lire_plage(fichier.open('rb'), debut, longueur), status=206, content_type=content_type
+    )
+    reponse['Content-Length'] = longueur
+    reponse['Content-Range'] = f'bytes {debut}-{fin}/{taille}'
+    return reponse
@@ -20,11 +20,15 @@ from django.conf import settings
 from django.conf.urls.static import static
 
 import authentication.views
+import site_web.api
 import site_web.views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('',site_web.views.home,name='home'),
+    path('sitemap.xml', site_web.views.sitemap, name='sitemap'),
+    path('api/v1/offres/', site_web.api.offres_api, name='api-offres'),
+    path('api/v1/offres/<int:pk>/', site_web.api.offre_api, name='api-offre'),
     #19_08
     path('login/externe/', authentication.views.login_externe, name='login'),
     path('login/interne/', authentication.views.login_interne, name='login_interne'),
@@ -13,6 +13,7 @@ from .models import User
 from logs.utils import enregistrer_action
 from calendar import monthrange
 from todo.models import FichePoste, Tache,TacheSelectionnee   
+from todo.bilans import bilans_par_jour
 
 
 from django.utils import timezone
@@ -97,6 +98,10 @@ def dashboard_rh(request):
         start_of_week = today - timedelta(days=today.weekday())
         jours_semaine = [start_of_week + timedelta(days=i) for i in range(5)]
 
+        users = users.select_related('employeeprofile__fiche_poste')
+        # Bilans de la semaine de tous les employés filtrés : une requête
+        bilans = bilans_par_jour(users, jours_semaine[0], jours_semaine[-1])
+
         stats = []
         for user in users:
             # Get the employee profile using the correct related name
@@ -122,11 +127,8 @@ def dashboard_rh(request):
             daily_data = []
 
             for day in jours_semaine:
-                tasks_done = TacheSelectionnee.objects.filter(
-                    user=user,
-                    date_selection=day,
-                    is_done=True
-                ).count()
+                bilan = bilans.get((user.pk, day))
+                tasks_done = bilan.terminees if bilan else 0
                 percentage = round((tasks_done / 6) * 100) if tasks_done <= 6 else 100
                 css_class = get_performance_class(percentage)
                 daily_data.append({
@@ -323,7 +325,7 @@ def dashboard(request):
     filtre = request.GET.get("filtre", "all")
 
     # Base queryset - utilise les champs de TacheSelectionnee directement
-    taches_auj = TacheSelectionnee.objects.filter(user=request.user, date_selection=today)
+    taches_auj = TacheSelectionnee.objects.filter(user=request.user, date_selection=today).select_related('tache')
     taches_filtrees = taches_auj
 
     # Filtrage cohérent avec le modèle
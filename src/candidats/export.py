@@ -0,0 +1,249 @@
+# candidats/export.py
+"""
+Export en flux (CSV / XLSX) des candidats filtrés du backoffice.
+
+Les candidats sont lus par lots avec `iterator(chunk_size=...)` : les
+préchargements (diplômes, expériences, compétences) sont faits lot par lot
+et chaque ligne est écrite puis oubliée, la mémoire reste donc constante
+quel que soit le nombre de candidats.
+
+Le XLSX est produit sans dépendance : un classeur minimal dont la feuille
+est écrite en continu dans une archive zip non adressable (descripteurs
+de données), vidée au fur et à mesure vers la réponse.
+"""
+import csv
+import re
+import zipfile
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.db.models import Prefetch
+
+from .models import NIVEAU_CHOICES, Diplome, ExperienceProfessionnelle, CompetenceCandidat
+
+TAILLE_LOT = 500
+
+COLONNES = [
+    'ID', 'Nom', 'Prénom', 'Email', 'Téléphone', 'Téléphone secondaire',
+    'Genre', 'Date de naissance', 'Ville', 'Pays', 'Quartier',
+    'Localité souhaitée', 'Prétention salariale (FCFA)', 'Disponible', 'Recherche active',
+    "Date d'inscription", 'Plus haut diplôme', 'Niveau', 'Établissement', "Date d'obtention",
+    'Dernier poste', 'Entreprise', 'Début', 'Fin', 'Compétences',
+]
+
+RANG_NIVEAU = {code: rang for rang, (code, _) in enumerate(NIVEAU_CHOICES) if code != 'AUTRE'}
+
+
+def _date(valeur):
+    return valeur.strftime('%d/%m/%Y') if valeur else ''
+
+
+def _oui_non(valeur):
+    return 'Oui' if valeur else 'Non'
+
+
+def candidats_a_exporter(candidats):
+    """
+    Queryset d'export : repart des seuls ids filtrés (les jointures de filtre
+    et les annotations restent dans la sous-requête) et ne charge que les
+    colonnes écrites dans le fichier.
+    """
+    from authentication.models import User
+
+    return User.objects.filter(pk__in=candidats.values('pk')).select_related(
+        'profil_candidat__adresse'
+    ).defer(
+        'password', 'profil_candidat__document_recherche'
+    ).prefetch_related(
+        Prefetch(
+            'diplomes',
+            queryset=Diplome.objects.filter(est_supprime=False).only(
+                'candidat_id', 'intitule', 'niveau', 'etablissement', 'date_obtention'
+            ),
+            to_attr='diplomes_export',
+        ),
+        Prefetch(
+            'experiences',
+            queryset=ExperienceProfessionnelle.objects.filter(est_supprime=False).only(
+                'candidat_id', 'poste', 'entreprise', 'date_debut', 'date_fin', 'en_poste'
+            ).order_by('-date_debut'),
+            to_attr='experiences_export',
+        ),
+        Prefetch(
+            'index_competences',
+            queryset=CompetenceCandidat.objects.filter(
+                competence__est_supprime=False
+            ).select_related('competence').only('candidat_id', 'competence__nom'),
+            to_attr='competences_export',
+        ),
+    ).order_by('pk')
+
+
+def ligne_candidat(user):
+    """Une ligne d'export à plat pour un candidat préchargé"""
+    profil = user.profil_candidat
+    adresse = profil.adresse
+
+    diplome = max(
+        user.diplomes_export,
+        key=lambda d: (RANG_NIVEAU.get(d.niveau, -1), d.date_obtention),
+        default=None,
+    )
+    experience = user.experiences_export[0] if user.experiences_export else None
+    competences = sorted({c.competence.nom for c in user.competences_export})
+
+    return [
+        user.pk,
+        user.last_name,
+        user.first_name,
+        user.email,
+        profil.telephone,
+        profil.telephone_second,
+        profil.get_genre_display(),
+        _date(profil.date_naissance),
+        adresse.ville if adresse else '',
+        adresse.pays if adresse else '',
+        adresse.quartier if adresse else '',
+        profil.localite_souhaitee,
+        profil.pretention_salariale,
+        _oui_non(profil.disponible),
+        _oui_non(profil.recherche_active),
+        _date(profil.date_inscription),
+        diplome.intitule if diplome else '',
+        diplome.get_niveau_display() if diplome else '',
+        diplome.etablissement if diplome else '',
+        _date(diplome.date_obtention) if diplome else '',
+        experience.poste if experience else '',
+        experience.entreprise if experience else '',
+        _date(experience.date_debut) if experience else '',
+        ('En poste' if experience.en_poste else _date(experience.date_fin)) if experience else '',
+        ', '.join(competences),
+    ]
+
+
+def lignes_candidats(candidats, taille_lot=TAILLE_LOT):
+    """Générateur des lignes d'export, lot par lot"""
+    for user in candidats_a_exporter(candidats).iterator(chunk_size=taille_lot):
+        yield ligne_candidat(user)
+
+
+# ====================================================
+# CSV
+# ====================================================
+class _Echo:
+    """Pseudo-fichier : csv.writer renvoie directement la ligne écrite"""
+
+    def write(self, valeur):
+        return valeur
+
+
+def flux_csv(lignes):
+    writer = csv.writer(_Echo())
+    # BOM pour qu'Excel reconnaisse l'UTF-8 (accents)
+    yield '\ufeff' + writer.writerow(COLONNES)
+    for ligne in lignes:
+        yield writer.writerow(['' if v is None else v for v in ligne])
+
+
+# ====================================================
+# XLSX
+# ====================================================
+class _Tampon:
+    """Flux en écriture seule (non adressable) dont on récupère le contenu au fil de l'eau"""
+
+    def __init__(self):
+        self._morceaux = []
+        self._position = 0
+
+    def write(self, donnees):
+        self._morceaux.append(bytes(donnees))
+        self._position += len(donnees)
+        return len(donnees)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def vider(self):
+        donnees = b''.join(self._morceaux)
+        self._morceaux.clear()
+        return donnees
+
+
+_PARTIES_XLSX = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Candidats" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+_DEBUT_FEUILLE = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetData>'
+)
+_FIN_FEUILLE = '</sheetData></worksheet>'
+
+# Caractères de contrôle interdits en XML 1.0
+_CONTROLE_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _cellule(valeur):
+    if valeur is None or valeur == '':
+        return '<c/>'
+    if isinstance(valeur, (int, float, Decimal)) and not isinstance(valeur, bool):
+        return f'<c><v>{valeur}</v></c>'
+    texte = escape(_CONTROLE_RE.sub('', str(valeur)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{texte}</t></is></c>'
+
+
+def _ligne_xml(valeurs):
+    return ('<row>' + ''.join(_cellule(v) for v in valeurs) + '</row>').encode('utf-8')
+
+
+def flux_xlsx(lignes, vidage_toutes=TAILLE_LOT):
+    tampon = _Tampon()
+    with zipfile.ZipFile(tampon, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for nom, contenu in _PARTIES_XLSX.items():
+            archive.writestr(nom, contenu)
+        with archive.open('xl/worksheets/sheet1.xml', 'w') as feuille:
+            feuille.write(_DEBUT_FEUILLE.encode('utf-8'))
+            feuille.write(_ligne_xml(COLONNES))
+            for numero, ligne in enumerate(lignes, start=1):
+                feuille.write(_ligne_xml(ligne))
+                if numero % vidage_toutes == 0:
+                    yield tampon.vider()
+            feuille.write(_FIN_FEUILLE.encode('utf-8'))
+    yield tampon.vider()
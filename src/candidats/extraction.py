@@ -0,0 +1,181 @@
+# candidats/extraction.py
+"""
+Extraction du texte des documents candidats (CV, lettres, attestations).
+
+L'extraction ne s'exécute jamais dans la requête d'upload : le signal
+post_save de Document programme `planifier_extraction` après commit, qui
+confie le travail à un exécuteur d'arrière-plan à un seul thread. Les
+documents restés en attente (redémarrage, échec) sont repris par
+`python manage.py extraire_documents`.
+
+Le contenu est identifié par son empreinte SHA-256 (calculée à l'upload
+par le stockage dédupliqué) : un fichier déjà extrait (même version
+ré-uploadée, même CV sous un autre nom) réutilise le texte existant sans
+être relu sur disque ni par pypdf.
+"""
+import hashlib
+import io
+import logging
+import os
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.postgres.search import SearchVector
+from django.db import close_old_connections
+
+from .search import SEARCH_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Au-delà, le tsvector dépasserait la limite PostgreSQL (1 Mo)
+TAILLE_MAX_TEXTE = 200_000
+
+EXTENSIONS_TEXTE = {'.txt', '.md', '.csv'}
+# Documents bureautiques : texte dans une partie XML de l'archive
+PARTIES_XML = {
+    '.docx': 'word/document.xml',
+    '.odt': 'content.xml',
+}
+
+_BALISE_RE = re.compile(r'<[^>]+>')
+_PARAGRAPHE_RE = re.compile(r'</(w:p|text:p|text:h)>')
+_ESPACES_RE = re.compile(r'[ \t\r\f\v]+')
+_LIGNES_VIDES_RE = re.compile(r'\n\s*\n+')
+
+
+class FormatNonPrisEnCharge(Exception):
+    pass
+
+
+def normaliser_texte(texte):
+    """Supprime les caractères nuls, compacte les espaces et tronque"""
+    texte = (texte or '').replace('\x00', ' ')
+    texte = _ESPACES_RE.sub(' ', texte)
+    texte = _LIGNES_VIDES_RE.sub('\n', texte).strip()
+    return texte[:TAILLE_MAX_TEXTE]
+
+
+def _decoder(contenu):
+    try:
+        return contenu.decode('utf-8')
+    except UnicodeDecodeError:
+        return contenu.decode('latin-1')
+
+
+def extraire_texte(contenu, nom_fichier):
+    """
+    Retourne (texte normalisé, nombre de pages ou None).
+    Lève FormatNonPrisEnCharge pour les images et formats inconnus.
+    """
+    extension = os.path.splitext(nom_fichier)[1].lower()
+
+    if extension == '.pdf':
+        from pypdf import PdfReader
+
+        lecteur = PdfReader(io.BytesIO(contenu))
+        pages = [page.extract_text() or '' for page in lecteur.pages]
+        return normaliser_texte('\n'.join(pages)), len(pages)
+
+    if extension in EXTENSIONS_TEXTE:
+        return normaliser_texte(_decoder(contenu)), None
+
+    if extension in PARTIES_XML:
+        with zipfile.ZipFile(io.BytesIO(contenu)) as archive:
+            xml = archive.read(PARTIES_XML[extension]).decode('utf-8')
+        texte = _BALISE_RE.sub(' ', _PARAGRAPHE_RE.sub('\n', xml))
+        return normaliser_texte(texte), None
+
+    raise FormatNonPrisEnCharge(extension)
+
+
+def vecteur_document():
+    """tsvector d'un Document, calculé en SQL à partir de ses colonnes"""
+    return (
+        SearchVector('nom', 'mots_cles', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+        + SearchVector('texte_extrait', weight='D', config=SEARCH_CONFIG)
+    )
+
+
+def indexer_document(document_id):
+    """Recalcule le document plein texte (un UPDATE, sans relire le texte en Python)"""
+    from .models import Document
+
+    Document.objects.filter(pk=document_id).update(document_recherche=vecteur_document())
+
+
+def _extraction_existante(empreinte, document_id):
+    from .models import Document
+
+    return Document.objects.filter(
+        empreinte_contenu=empreinte, extraction_statut='ok'
+    ).exclude(pk=document_id).values('texte_extrait', 'nombre_pages').first()
+
+
+def traiter_document(document_id):
+    """
+    Extrait le texte d'un document en attente. Retourne le statut final,
+    ou None si le document n'est plus en attente.
+    """
+    from .models import Document
+
+    document = Document.objects.filter(pk=document_id, extraction_statut='attente').first()
+    if document is None or not document.fichier:
+        return None
+    nom_fichier = document.fichier.name
+
+    # Empreinte connue dès l'upload (stockage dédupliqué) : le fichier n'est
+    # relu que si aucun document de même contenu n'a déjà été extrait
+    empreinte = document.empreinte_contenu
+    deja_extrait = _extraction_existante(empreinte, document.pk) if empreinte else None
+    if deja_extrait is None:
+        with document.fichier.open('rb') as fichier:
+            contenu = fichier.read()
+        if not empreinte:
+            empreinte = hashlib.sha256(contenu).hexdigest()
+            deja_extrait = _extraction_existante(empreinte, document.pk)
+
+    if deja_extrait:
+        texte, pages, statut = deja_extrait['texte_extrait'], deja_extrait['nombre_pages'], 'ok'
+    else:
+        try:
+            texte, pages = extraire_texte(contenu, nom_fichier)
+            statut = 'ok'
+        except FormatNonPrisEnCharge:
+            texte, pages, statut = '', None, 'ignore'
+        except Exception:
+            logger.exception("Extraction impossible pour le document %s", document_id)
+            texte, pages, statut = '', None, 'echec'
+
+    # Le filtre sur le fichier évite d'écraser un ré-upload survenu entre-temps
+    mis_a_jour = Document.objects.filter(pk=document.pk, fichier=nom_fichier).update(
+        texte_extrait=texte,
+        nombre_pages=pages,
+        empreinte_contenu=empreinte,
+        extraction_statut=statut,
+    )
+    if mis_a_jour:
+        indexer_document(document.pk)
+    return statut
+
+
+# ====================================================
+# EXÉCUTION EN ARRIÈRE-PLAN
+# ====================================================
+_executeur = ThreadPoolExecutor(max_workers=1, thread_name_prefix='extraction-documents')
+
+
+def _traiter_en_arriere_plan(document_id):
+    close_old_connections()
+    try:
+        traiter_document(document_id)
+    except Exception:
+        logger.exception("Échec du traitement d'extraction du document %s", document_id)
+    finally:
+        close_old_connections()
+
+
+def planifier_extraction(document_id):
+    """Confie l'extraction à l'exécuteur d'arrière-plan (à appeler après commit)"""
+    _executeur.submit(_traiter_en_arriere_plan, document_id)
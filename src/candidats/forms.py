@@ -967,6 +967,12 @@ class CandidatFilterForm(forms.Form):
         })
     )
     
+    dans_documents = forms.BooleanField(
+        required=False,
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+        label="Rechercher aussi dans le contenu des CV et documents"
+    )
+    
     competence = forms.ModelMultipleChoiceField(
         required=False,
         queryset=Competence.objects.filter(est_supprime=False),
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from candidats.models import Document
+from candidats.extraction import traiter_document
+
+
+class Command(BaseCommand):
+    help = 'Extrait le texte des documents candidats en attente (reprise après échec ou redémarrage)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reessayer', action='store_true', help='Reprendre aussi les documents en échec')
+
+    def handle(self, *args, **options):
+        if options['reessayer']:
+            Document.objects.filter(extraction_statut='echec').update(extraction_statut='attente')
+
+        document_ids = list(
+            Document.objects.filter(extraction_statut='attente', est_supprime=False)
+            .order_by('pk').values_list('pk', flat=True)
+        )
+        statuts = {}
+        for document_id in document_ids:
+            statut = traiter_document(document_id)
+            if statut:
+                statuts[statut] = statuts.get(statut, 0) + 1
+
+        resume = ', '.join(f'{statut}: {nombre}' for statut, nombre in sorted(statuts.items())) or 'aucun'
+        self.stdout.write(
+            self.style.SUCCESS(f'{len(document_ids)} documents traités ({resume})')
+        )
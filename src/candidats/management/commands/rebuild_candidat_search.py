@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from candidats.search import profils_a_indexer, mettre_a_jour_document
+
+
+class Command(BaseCommand):
+    help = 'Reconstruit le document de recherche plein texte de tous les candidats'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=500, help='Taille des lots de profils')
+
+    def handle(self, *args, **options):
+        total = 0
+        for profil in profils_a_indexer().order_by('pk').iterator(chunk_size=options['batch']):
+            mettre_a_jour_document(profil)
+            total += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f'{total} profils candidats réindexés')
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from candidats.models import ProfilCandidat
+from candidats.search import synchroniser_competences
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index dénormalisé des compétences candidats (CompetenceCandidat)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=1000, help='Nombre de candidats par lot')
+
+    def handle(self, *args, **options):
+        batch = options['batch']
+        user_ids = list(ProfilCandidat.objects.order_by('pk').values_list('pk', flat=True))
+
+        ajoutees = supprimees = 0
+        for i in range(0, len(user_ids), batch):
+            a, s = synchroniser_competences(user_ids[i:i + batch])
+            ajoutees += a
+            supprimees += s
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{len(user_ids)} candidats traités : {ajoutees} lignes ajoutées, {supprimees} supprimées'
+            )
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from candidats.matching import construire_index
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index de matching candidats/offres et le publie dans le cache"
+
+    def handle(self, *args, **options):
+        index = construire_index()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'{len(index)} candidats indexés pour le matching')
+        )
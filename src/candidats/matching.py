@@ -0,0 +1,474 @@
+# candidats/matching.py
+"""
+Rapprochement candidats <-> offres d'emploi (NumPy).
+
+Les caractéristiques de tous les candidats actifs sont tenues en mémoire
+sous forme de tableaux alignés (une ligne par candidat) :
+    - compétences : matrice creuse candidat x compétence au format COO
+      (lignes, ids de compétence), lue depuis l'index CompetenceCandidat ;
+    - niveau : rang du plus haut diplôme dans NIVEAU_CHOICES (-1 si inconnu) ;
+    - expérience : cumul des durées des expériences, en mois ;
+    - localité souhaitée (code entier) et prétention salariale annuelle.
+
+Les exigences d'une offre (compétences citées dans le texte, niveau,
+expérience, lieu, salaire) sont extraites de JobOffer, puis tous les
+candidats sont notés en une seule passe vectorisée.
+
+L'index est gardé par processus et partagé via le cache Django : les
+signaux de candidats/signals.py journalisent les candidats modifiés
+(`marquer_candidats`) et chaque processus ne relit que ceux-là. Un index
+publié n'est jamais modifié : les mises à jour portent sur une copie,
+les threads en train de noter gardent un jeu de tableaux cohérent.
+Le journal est écrit par `cache.add` (une version déjà écrite n'est jamais
+écrasée, même sans incr atomique) ; un index de plus de AGE_MAX_INDEX est
+de toute façon reconstruit.
+`python manage.py rebuild_matching_index` reconstruit l'instantané.
+"""
+import re
+import threading
+import time
+import unicodedata
+
+import numpy as np
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+CLE_VERSION = 'matching:candidats:version'
+CLE_INDEX = 'matching:candidats:index'
+DUREE_JOURNAL = 24 * 3600
+# Filet de sécurité : un index plus ancien est reconstruit (journal perdu, cache expulsé)
+AGE_MAX_INDEX = 6 * 3600
+TENTATIVES_JOURNAL = 10
+
+# Poids des critères ; seuls les critères exprimés par l'offre comptent
+POIDS_CRITERES = {
+    'competences': 0.5,
+    'niveau': 0.2,
+    'experience': 0.15,
+    'localite': 0.1,
+    'salaire': 0.05,
+}
+
+_NON_MOT_RE = re.compile(r'[^a-z0-9+#]+')
+_DUREE_RE = re.compile(r'(\d+(?:[.,]\d+)?)\s*(ans?|annees?|mois)\b')
+_TAILLE_MAX_EXPRESSION = 4
+
+
+def _sans_accents(texte):
+    texte = unicodedata.normalize('NFKD', strip_tags(texte or ''))
+    return ''.join(c for c in texte if not unicodedata.combining(c)).lower()
+
+
+def normaliser(texte):
+    """Texte sans balises, sans accents, en minuscules, mots séparés par un espace"""
+    return _NON_MOT_RE.sub(' ', _sans_accents(texte)).strip()
+
+
+# ====================================================
+# EXIGENCES D'UNE OFFRE
+# ====================================================
+def _rangs_niveaux():
+    from .models import NIVEAU_CHOICES
+
+    # 'AUTRE' n'est pas comparable aux autres niveaux
+    return {code: rang for rang, (code, _) in enumerate(NIVEAU_CHOICES) if code != 'AUTRE'}
+
+
+# Motifs reconnus dans JobOffer.niveau_etude, évalués sur le texte normalisé
+_MOTIFS_NIVEAU = [
+    (re.compile(r'\bdoctorat\b|\bphd\b'), 'DOC'),
+    (re.compile(r'\bmaster 1\b|\bm1\b|\bmaitrise\b'), 'BAC+4'),
+    (re.compile(r'\bmaster\b|\bm2\b|\bmba\b|\bdess\b|\bdea\b|\bingenieur\b'), 'BAC+5'),
+    (re.compile(r'\blicence\b|\bbachelor\b'), 'BAC+3'),
+    (re.compile(r'\bbts\b|\bdut\b|\bdeug\b'), 'BAC+2'),
+    (re.compile(r'\bcap\b|\bbep\b'), 'CAP_BEP'),
+]
+_BAC_PLUS_RE = re.compile(r'\bbac\s*\+\s*(\d)')
+_BAC_RE = re.compile(r'\bbac(calaureat)?\b')
+
+
+def niveau_requis(texte):
+    """Rang du plus bas niveau cité par l'offre (ex. "Bac+3 / Master" -> BAC+3), ou None"""
+    rangs = _rangs_niveaux()
+    texte = normaliser(texte)
+    # "bac+3" : le + est conservé par normaliser
+    cites = [f'BAC+{min(int(n), 5)}' for n in _BAC_PLUS_RE.findall(texte) if int(n) >= 2]
+    cites += [code for motif, code in _MOTIFS_NIVEAU if motif.search(texte)]
+    if not cites and _BAC_RE.search(texte):
+        cites.append('BAC')
+    valeurs = [rangs[code] for code in cites if code in rangs]
+    return min(valeurs) if valeurs else None
+
+
+def experience_requise_mois(texte):
+    """Plus petite durée citée, en mois ("3 ans minimum" -> 36), ou None"""
+    durees = []
+    for nombre, unite in _DUREE_RE.findall(_sans_accents(texte)):
+        valeur = float(nombre.replace(',', '.'))
+        durees.append(valeur if unite == 'mois' else valeur * 12)
+    return min(durees) if durees else None
+
+
+def _expressions(texte_normalise):
+    """Toutes les suites de 1 à 4 mots consécutifs du texte"""
+    mots = texte_normalise.split()
+    return {
+        ' '.join(mots[i:i + n])
+        for n in range(1, _TAILLE_MAX_EXPRESSION + 1)
+        for i in range(len(mots) - n + 1)
+    }
+
+
+def competences_citees(texte):
+    """Ids des compétences (non supprimées) dont le nom apparaît dans le texte"""
+    from .models import Competence
+
+    expressions = _expressions(normaliser(texte))
+    if not expressions:
+        return []
+    return [
+        pk for pk, nom in Competence.objects.filter(est_supprime=False).values_list('pk', 'nom')
+        if normaliser(nom) in expressions
+    ]
+
+
+def exigences_offre(offre):
+    """Exigences d'une JobOffer, extraites de ses champs texte"""
+    texte = ' '.join([
+        offre.titre, offre.competences_qualifications, offre.profil_recherche, offre.taches,
+    ])
+    return {
+        'competences': np.array(competences_citees(texte), dtype=np.int32),
+        'niveau': niveau_requis(offre.niveau_etude),
+        'experience': experience_requise_mois(offre.experience_requise),
+        'lieu': normaliser(offre.lieu),
+        # Fourchette interprétée à l'enregistrement de l'offre (FCFA annuels)
+        'salaire': float(offre.salaire_max) if offre.salaire_max else None,
+    }
+
+
+# ====================================================
+# INDEX DES CANDIDATS
+# ====================================================
+def _mois_experience(date_debut, date_fin, en_poste, aujourd_hui):
+    # Même règle que ExperienceProfessionnelle.duree
+    fin = aujourd_hui if en_poste else date_fin
+    if not fin or not date_debut:
+        return 0
+    return max((fin - date_debut).days // 30, 0)
+
+
+def _charger(user_ids=None):
+    """
+    Lit les caractéristiques des candidats (tous si user_ids vaut None)
+    en quatre requêtes, sans instancier de modèles.
+    """
+    from .models import ProfilCandidat, Diplome, ExperienceProfessionnelle, CompetenceCandidat
+
+    profils = ProfilCandidat.objects.filter(est_supprime=False, user__is_active=True)
+    competences = CompetenceCandidat.objects.filter(competence__est_supprime=False)
+    diplomes = Diplome.objects.filter(est_supprime=False)
+    experiences = ExperienceProfessionnelle.objects.filter(est_supprime=False)
+    if user_ids is not None:
+        profils = profils.filter(pk__in=user_ids)
+        competences = competences.filter(candidat_id__in=user_ids)
+        diplomes = diplomes.filter(candidat_id__in=user_ids)
+        experiences = experiences.filter(candidat_id__in=user_ids)
+
+    donnees = {
+        profil_id: {
+            'localite': normaliser(localite),
+            'pretention': float(pretention) if pretention is not None else np.nan,
+            'niveau': -1,
+            'experience': 0,
+            'competences': set(),
+        }
+        for profil_id, localite, pretention in profils.values_list(
+            'pk', 'localite_souhaitee', 'pretention_salariale'
+        )
+    }
+
+    for candidat_id, competence_id in competences.values_list('candidat_id', 'competence_id'):
+        if candidat_id in donnees:
+            donnees[candidat_id]['competences'].add(competence_id)
+
+    rangs = _rangs_niveaux()
+    for candidat_id, niveau in diplomes.values_list('candidat_id', 'niveau'):
+        if candidat_id in donnees:
+            donnees[candidat_id]['niveau'] = max(donnees[candidat_id]['niveau'], rangs.get(niveau, -1))
+
+    aujourd_hui = timezone.now().date()
+    for candidat_id, debut, fin, en_poste in experiences.values_list(
+        'candidat_id', 'date_debut', 'date_fin', 'en_poste'
+    ):
+        if candidat_id in donnees:
+            donnees[candidat_id]['experience'] += _mois_experience(debut, fin, en_poste, aujourd_hui)
+
+    return donnees
+
+
+class IndexCandidats:
+    """Caractéristiques des candidats sous forme de tableaux NumPy alignés"""
+
+    def __init__(self, version=0):
+        self.version = version
+        self.construit_le = time.time()
+        self.user_ids = np.empty(0, dtype=np.int64)
+        self.actifs = np.empty(0, dtype=bool)
+        self.niveaux = np.empty(0, dtype=np.int8)
+        self.experience = np.empty(0, dtype=np.float32)
+        self.localites = np.empty(0, dtype=np.int32)
+        self.pretentions = np.empty(0, dtype=np.float64)
+        # Matrice creuse candidat x compétence (COO)
+        self.lignes_competences = np.empty(0, dtype=np.int32)
+        self.competences = np.empty(0, dtype=np.int32)
+        self.position = {}
+        self.codes_localite = {'': -1}
+
+    def __len__(self):
+        return int(self.actifs.sum())
+
+    def copie(self):
+        """Copie indépendante, mise à jour par `appliquer` pendant que l'original sert au scoring"""
+        index = IndexCandidats(self.version)
+        for nom, valeur in vars(self).items():
+            setattr(index, nom, valeur.copy() if hasattr(valeur, 'copy') else valeur)
+        return index
+
+    def _code_localite(self, localite):
+        if localite not in self.codes_localite:
+            self.codes_localite[localite] = len(self.codes_localite) - 1
+        return self.codes_localite[localite]
+
+    def appliquer(self, donnees, user_ids=None):
+        """
+        Remplace les lignes des candidats relus par `_charger(user_ids)`.
+        Les candidats demandés mais absents des données sont désactivés.
+        """
+        if user_ids is None:
+            user_ids = donnees.keys()
+        nouveaux = [uid for uid in donnees if uid not in self.position]
+        if nouveaux:
+            debut = len(self.user_ids)
+            self.position.update({uid: debut + i for i, uid in enumerate(nouveaux)})
+            n = len(nouveaux)
+            self.user_ids = np.concatenate([self.user_ids, np.array(nouveaux, dtype=np.int64)])
+            self.actifs = np.concatenate([self.actifs, np.zeros(n, dtype=bool)])
+            self.niveaux = np.concatenate([self.niveaux, np.full(n, -1, dtype=np.int8)])
+            self.experience = np.concatenate([self.experience, np.zeros(n, dtype=np.float32)])
+            self.localites = np.concatenate([self.localites, np.full(n, -1, dtype=np.int32)])
+            self.pretentions = np.concatenate([self.pretentions, np.full(n, np.nan)])
+
+        touchees = np.array(
+            [self.position[uid] for uid in user_ids if uid in self.position], dtype=np.int32
+        )
+        if not len(touchees):
+            return
+        self.actifs[touchees] = False
+
+        lignes, competences = [], []
+        for uid, valeurs in donnees.items():
+            ligne = self.position[uid]
+            self.actifs[ligne] = True
+            self.niveaux[ligne] = valeurs['niveau']
+            self.experience[ligne] = valeurs['experience']
+            self.localites[ligne] = self._code_localite(valeurs['localite'])
+            self.pretentions[ligne] = valeurs['pretention']
+            lignes += [ligne] * len(valeurs['competences'])
+            competences += valeurs['competences']
+
+        conservees = ~np.isin(self.lignes_competences, touchees)
+        self.lignes_competences = np.concatenate([
+            self.lignes_competences[conservees], np.array(lignes, dtype=np.int32)
+        ])
+        self.competences = np.concatenate([
+            self.competences[conservees], np.array(competences, dtype=np.int32)
+        ])
+
+    def _codes_localite_compatibles(self, lieu):
+        """Codes des localités contenues dans le lieu de l'offre (ou l'inverse)"""
+        return np.array([
+            code for localite, code in self.codes_localite.items()
+            if localite and (localite in lieu or lieu in localite)
+        ], dtype=np.int32)
+
+    def scorer(self, exigences):
+        """
+        Note tous les candidats en une passe.
+        Retourne (scores entre 0 et 1, nombre de compétences communes) ;
+        les lignes inactives valent -1.
+        """
+        n = len(self.user_ids)
+        total = np.zeros(n, dtype=np.float32)
+        poids_total = 0.0
+
+        requises = exigences['competences']
+        communes = np.zeros(n, dtype=np.int32)
+        if len(requises):
+            masque = np.isin(self.competences, requises)
+            communes = np.bincount(self.lignes_competences[masque], minlength=n).astype(np.int32)
+            total += POIDS_CRITERES['competences'] * communes / len(requises)
+            poids_total += POIDS_CRITERES['competences']
+
+        if exigences['niveau'] is not None:
+            ecart = exigences['niveau'] - self.niveaux.astype(np.float32)
+            note = np.clip(1 - 0.25 * ecart, 0, 1)
+            # Sans diplôme renseigné, note prudente plutôt qu'exclusion
+            note[self.niveaux < 0] = 0.3
+            total += POIDS_CRITERES['niveau'] * note
+            poids_total += POIDS_CRITERES['niveau']
+
+        if exigences['experience']:
+            note = np.minimum(self.experience / exigences['experience'], 1)
+            total += POIDS_CRITERES['experience'] * note
+            poids_total += POIDS_CRITERES['experience']
+
+        if exigences['lieu']:
+            note = np.where(
+                np.isin(self.localites, self._codes_localite_compatibles(exigences['lieu'])), 1.0, 0.0
+            )
+            note[self.localites < 0] = 0.5
+            total += POIDS_CRITERES['localite'] * note.astype(np.float32)
+            poids_total += POIDS_CRITERES['localite']
+
+        if exigences['salaire']:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                note = np.minimum(exigences['salaire'] / self.pretentions, 1)
+            note = np.nan_to_num(note, nan=1.0, posinf=1.0)
+            total += POIDS_CRITERES['salaire'] * note.astype(np.float32)
+            poids_total += POIDS_CRITERES['salaire']
+
+        scores = total / poids_total if poids_total else total
+        scores[~self.actifs] = -1
+        return scores, communes
+
+    def meilleurs(self, exigences, limite=20, exclure=()):
+        """[(user_id, score, compétences communes)] des `limite` meilleurs candidats"""
+        scores, communes = self.scorer(exigences)
+        if exclure:
+            lignes = [self.position[uid] for uid in exclure if uid in self.position]
+            scores[lignes] = -1
+        candidats = np.flatnonzero(scores >= 0)
+        if len(candidats) > limite:
+            candidats = candidats[np.argpartition(-scores[candidats], limite - 1)[:limite]]
+        # Tri décroissant par score, puis par id pour un ordre stable
+        candidats = candidats[np.lexsort((self.user_ids[candidats], -scores[candidats]))]
+        return [
+            (int(self.user_ids[i]), float(scores[i]), int(communes[i]))
+            for i in candidats
+        ]
+
+
+# ====================================================
+# CACHE ET MISES À JOUR INCRÉMENTALES
+# ====================================================
+_index = None
+_verrou = threading.Lock()
+
+
+def _cle_journal(version):
+    return f'matching:candidats:journal:{version}'
+
+
+def marquer_candidats(user_ids):
+    """Journalise des candidats modifiés, relus au prochain scoring par chaque processus"""
+    user_ids = sorted({uid for uid in user_ids if uid})
+    if not user_ids:
+        return
+    cache.add(CLE_VERSION, 0, None)
+    for _ in range(TENTATIVES_JOURNAL):
+        try:
+            version = cache.incr(CLE_VERSION)
+        except ValueError:
+            # Clé expulsée entre-temps : les index existants seront reconstruits
+            cache.set(CLE_VERSION, 1, None)
+            version = 1
+        # incr n'est pas atomique sur tous les backends (FileBasedCache) : deux
+        # écrivains peuvent obtenir la même version. add n'écrase pas le lot
+        # déjà journalisé ; le second passe à la version suivante.
+        if cache.add(_cle_journal(version), user_ids, DUREE_JOURNAL):
+            return
+    # Toutes les versions essayées prises (improbable) : AGE_MAX_INDEX couvre ce cas
+
+
+def _trop_ancien(index):
+    return time.time() - getattr(index, 'construit_le', 0) > AGE_MAX_INDEX
+
+
+def construire_index():
+    """Reconstruit l'index complet et le publie dans le cache"""
+    global _index
+
+    with _verrou:
+        version = cache.get(CLE_VERSION, 0)
+        index = IndexCandidats(version)
+        index.appliquer(_charger())
+        cache.set(CLE_INDEX, index, None)
+        _index = index
+        return index
+
+
+def obtenir_index():
+    """Index à jour : copie locale, sinon instantané du cache, sinon reconstruction"""
+    global _index
+
+    with _verrou:
+        version = cache.get(CLE_VERSION, 0)
+        if _index is not None and _trop_ancien(_index):
+            _index = None
+        if _index is None:
+            _index = cache.get(CLE_INDEX)
+            if _index is not None and _trop_ancien(_index):
+                _index = None
+        if _index is not None and version > _index.version:
+            modifies = set()
+            for v in range(_index.version + 1, version + 1):
+                lot = cache.get(_cle_journal(v))
+                if lot is None:
+                    # Journal incomplet : impossible de rattraper
+                    _index = None
+                    break
+                modifies.update(lot)
+            else:
+                # Les requêtes en cours notent l'ancien index : mise à jour
+                # sur une copie, publiée en une affectation
+                index = _index.copie()
+                index.appliquer(_charger(modifies), modifies)
+                index.version = version
+                _index = index
+        elif _index is not None and version < _index.version:
+            # Cache vidé : le journal ne permet plus de savoir ce qui a changé
+            _index = None
+        index = _index
+
+    return index if index is not None else construire_index()
+
+
+def shortlist(offre, limite=20, exclure=()):
+    """[(user_id, score, compétences communes)] des meilleurs candidats pour une offre"""
+    return obtenir_index().meilleurs(exigences_offre(offre), limite, exclure)
+
+
+def candidats_suggeres(offre, limite=10, exclure=()):
+    """
+    Shortlist prête à afficher : utilisateurs chargés en une requête,
+    score en pourcentage et indication des candidats ayant déjà postulé.
+    """
+    from authentication.models import User
+
+    resultats = shortlist(offre, limite, exclure)
+    utilisateurs = User.objects.select_related('profil_candidat').in_bulk(
+        [uid for uid, _, _ in resultats]
+    )
+    postules = set(offre.candidature_set.filter(est_supprime=False).values_list('candidat_id', flat=True))
+    return [
+        {
+            'candidat': utilisateurs[uid],
+            'score': round(score * 100),
+            'competences_communes': communes,
+            'a_postule': uid in postules,
+        }
+        for uid, score, communes in resultats
+        if uid in utilisateurs
+    ]
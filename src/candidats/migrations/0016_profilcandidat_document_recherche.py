@@ -0,0 +1,47 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:43
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import UnaccentExtension
+from django.db import migrations
+
+
+# Configuration plein texte française insensible aux accents,
+# partagée par les recherches candidats et offres
+CREATE_FRENCH_UNACCENT = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'french_unaccent') THEN
+        CREATE TEXT SEARCH CONFIGURATION french_unaccent (COPY = french);
+        ALTER TEXT SEARCH CONFIGURATION french_unaccent
+            ALTER MAPPING FOR hword, hword_part, word
+            WITH unaccent, french_stem;
+    END IF;
+END
+$$;
+"""
+
+DROP_FRENCH_UNACCENT = "DROP TEXT SEARCH CONFIGURATION IF EXISTS french_unaccent;"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidats', '0015_alter_candidature_statut_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        UnaccentExtension(),
+        migrations.RunSQL(CREATE_FRENCH_UNACCENT, DROP_FRENCH_UNACCENT),
+        migrations.AddField(
+            model_name='profilcandidat',
+            name='document_recherche',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='profilcandidat',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['document_recherche'], name='profil_candidat_fts_gin'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidats', '0016_profilcandidat_document_recherche'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompetenceCandidat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('profil', 'Profil'), ('diplomes', 'Diplômes'), ('experiences', 'Expériences')], max_length=20)),
+                ('candidat', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='index_competences', to=settings.AUTH_USER_MODEL)),
+                ('competence', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='index_candidats', to='candidats.competence')),
+            ],
+            options={
+                'verbose_name': 'Index compétence candidat',
+                'verbose_name_plural': 'Index compétences candidats',
+                'indexes': [models.Index(fields=['competence', 'source', 'candidat'], name='competence_candidat_idx')],
+                'constraints': [models.UniqueConstraint(fields=('candidat', 'competence', 'source'), name='uniq_competence_candidat_source')],
+            },
+        ),
+    ]
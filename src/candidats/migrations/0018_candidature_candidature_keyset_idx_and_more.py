@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidats', '0017_competencecandidat'),
+        ('jobs', '0005_joboffer_joboffer_keyset_idx'),
+        ('notes', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidature',
+            index=models.Index(fields=['-date_postulation', '-id'], name='candidature_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entretien',
+            index=models.Index(fields=['date_prevue', 'id'], name='entretien_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profilcandidat',
+            index=models.Index(fields=['-date_inscription', '-user'], name='profil_candidat_keyset_idx'),
+        ),
+    ]
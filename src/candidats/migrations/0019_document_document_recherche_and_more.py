@@ -0,0 +1,46 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:55
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidats', '0018_candidature_candidature_keyset_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='document_recherche',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='empreinte_contenu',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='extraction_statut',
+            field=models.CharField(choices=[('attente', 'En attente'), ('ok', 'Texte extrait'), ('ignore', 'Format non pris en charge'), ('echec', 'Échec')], default='attente', editable=False, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='nombre_pages',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='texte_extrait',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['document_recherche'], name='document_fts_gin'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:01
+
+import candidats.models
+import documents.stockage
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidats', '0019_document_document_recherche_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='document',
+            name='fichier',
+            field=documents.stockage.FichierDeduplique(empreinte_field='empreinte_contenu', taille_field='taille_fichier', upload_to=candidats.models.document_path, verbose_name='Fichier'),
+        ),
+    ]
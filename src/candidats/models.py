@@ -3,8 +3,11 @@ from django.core.validators import RegexValidator
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from simple_history.models import HistoricalRecords
 from jobs.models import JobOffer
+from documents.stockage import FichierDeduplique
 
 from django.core.validators import MinValueValidator, MaxValueValidator
 # ====================================================
@@ -65,6 +68,13 @@ TYPE_DOCUMENT_CHOICES = [
         ('AUTRE', 'Autre document'),
     ]
 
+STATUT_EXTRACTION_CHOICES = [
+    ('attente', 'En attente'),
+    ('ok', 'Texte extrait'),
+    ('ignore', 'Format non pris en charge'),
+    ('echec', 'Échec'),
+]
+
 LANGUE_CHOICES = [
     ('FR', 'Français'),
     ('EN', 'Anglais'),
@@ -288,10 +298,18 @@ class ProfilCandidat(models.Model):
     derniere_connexion = models.DateTimeField(null=True, blank=True, verbose_name="Dernière connexion")
     est_supprime = models.BooleanField(default=False, verbose_name="Profil supprimé")
 
+    # Document plein texte (identité, compétences, diplômes, expériences),
+    # maintenu par candidats.search via les signaux
+    document_recherche = SearchVectorField(null=True, editable=False)
+
 
     class Meta:
         verbose_name = "Profil Candidat"
         verbose_name_plural = "Profils Candidats"
+        indexes = [
+            GinIndex(fields=['document_recherche'], name='profil_candidat_fts_gin'),
+            models.Index(fields=['-date_inscription', '-user'], name='profil_candidat_keyset_idx'),
+        ]
     
     def __str__(self):
         return f"Profil de {self.user.get_full_name()}"
@@ -410,12 +428,45 @@ class ExperienceProfessionnelle(models.Model):
         self.est_supprime = True
         self.save()
 
+SOURCE_COMPETENCE_CHOICES = [
+    ('profil', 'Profil'),
+    ('diplomes', 'Diplômes'),
+    ('experiences', 'Expériences'),
+]
+
+class CompetenceCandidat(models.Model):
+    """
+    Index dénormalisé (candidat, compétence, source) des compétences d'un candidat.
+    Maintenu par les signaux M2M (candidats/signals.py), reconstructible avec
+    `python manage.py rebuild_competences_candidats`.
+    """
+    candidat = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='index_competences')
+    competence = models.ForeignKey(Competence, on_delete=models.CASCADE, related_name='index_candidats')
+    source = models.CharField(max_length=20, choices=SOURCE_COMPETENCE_CHOICES)
+
+    class Meta:
+        verbose_name = "Index compétence candidat"
+        verbose_name_plural = "Index compétences candidats"
+        constraints = [
+            models.UniqueConstraint(fields=['candidat', 'competence', 'source'], name='uniq_competence_candidat_source'),
+        ]
+        indexes = [
+            models.Index(fields=['competence', 'source', 'candidat'], name='competence_candidat_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.candidat_id} - {self.competence_id} ({self.source})"
+
 def document_path(instance, filename):
     return f'documents/candidat_{instance.candidat.id}/{instance.type_document}/{filename}'
 class Document(models.Model):
     candidat = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='documents')
     type_document = models.CharField(max_length=20, choices=TYPE_DOCUMENT_CHOICES, verbose_name="Type de document")
-    fichier = models.FileField(upload_to=document_path, verbose_name="Fichier")
+    # Taille et empreinte renseignées à l'upload (stockage dédupliqué, voir documents/stockage.py)
+    fichier = FichierDeduplique(
+        upload_to=document_path, verbose_name="Fichier",
+        taille_field='taille_fichier', empreinte_field='empreinte_contenu',
+    )
     nom = models.CharField(max_length=200, verbose_name="Nom du document")
     
     # Version automatique si même nom
@@ -445,18 +496,31 @@ class Document(models.Model):
     taille_fichier = models.PositiveIntegerField(editable=False, verbose_name="Taille du fichier")
     est_supprime = models.BooleanField(default=False)
     
+    # Texte extrait en arrière-plan (voir candidats/extraction.py)
+    texte_extrait = models.TextField(blank=True, editable=False)
+    nombre_pages = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    empreinte_contenu = models.CharField(max_length=64, blank=True, editable=False, db_index=True)
+    extraction_statut = models.CharField(
+        max_length=10, choices=STATUT_EXTRACTION_CHOICES, default='attente', editable=False
+    )
+    document_recherche = SearchVectorField(null=True, editable=False)
+    
     class Meta:
         verbose_name = "Document"
         verbose_name_plural = "Documents"
         ordering = ['-date_upload']
         unique_together = ['candidat', 'nom', 'version']
+        indexes = [
+            GinIndex(fields=['document_recherche'], name='document_fts_gin'),
+        ]
     
     def __str__(self):
         return f"{self.nom} v{self.version} ({self.get_type_document_display()})"
     
     def save(self, *args, **kwargs):
-        if self.fichier:
-            self.taille_fichier = self.fichier.size
+        # Nouveau fichier : le texte sera (ré)extrait après commit
+        if self.fichier and not self.fichier._committed:
+            self.extraction_statut = 'attente'
         super().save(*args, **kwargs)
     
     @property
@@ -544,6 +608,9 @@ class Candidature(models.Model):
         verbose_name_plural = "Candidatures"
         unique_together = ('candidat', 'offre')
         ordering = ['-date_postulation']
+        indexes = [
+            models.Index(fields=['-date_postulation', '-id'], name='candidature_keyset_idx'),
+        ]
     
     def __str__(self):
         return f"{self.candidat.get_full_name()} - {self.offre.titre}"
@@ -625,6 +692,9 @@ class Entretien(models.Model):
         verbose_name = "Entretien"
         verbose_name_plural = "Entretiens"
         ordering = ['-date_prevue']
+        indexes = [
+            models.Index(fields=['date_prevue', 'id'], name='entretien_keyset_idx'),
+        ]
     
     def __str__(self):
         return f"Entretien {self.get_type_entretien_display()} - {self.candidature}"
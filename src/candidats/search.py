@@ -0,0 +1,234 @@
+# candidats/search.py
+"""
+Recherche plein texte des candidats (PostgreSQL).
+
+Chaque ProfilCandidat porte un tsvector `document_recherche` pondéré :
+    A : nom, prénom, email
+    B : compétences (profil, diplômes, expériences)
+    C : diplômes et expériences (intitulés, domaines, postes, entreprises)
+    D : localité, adresse, téléphones
+Le document est recalculé par les signaux (voir candidats/signals.py)
+et peut être reconstruit avec `python manage.py rebuild_candidat_search`.
+
+Le filtre par compétence s'appuie sur l'index dénormalisé CompetenceCandidat,
+tenu à jour ici aussi (`python manage.py rebuild_competences_candidats`).
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import Exists, F, FloatField, OuterRef, Q, Subquery, TextField, Value
+from django.db.models.functions import Cast, Coalesce
+
+SEARCH_CONFIG = 'french_unaccent'
+
+POIDS = ('A', 'B', 'C', 'D')
+
+_TERME_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _chiffres(telephone):
+    """Version sans séparateurs d'un numéro pour la recherche par préfixe"""
+    return re.sub(r'\D', '', telephone or '')
+
+
+def _joindre(valeurs):
+    return ' '.join(v for v in valeurs if v)
+
+
+def construire_textes(user, profil):
+    """
+    Retourne les textes à indexer pour chaque poids.
+    `user` doit idéalement avoir diplomes/experiences/compétences préchargés.
+    """
+    email = user.email or ''
+    identite = [user.first_name, user.last_name, email, email.replace('@', ' ').replace('.', ' ')]
+
+    diplomes = [d for d in user.diplomes.all() if not d.est_supprime]
+    experiences = [e for e in user.experiences.all() if not e.est_supprime]
+
+    competences = {c.nom for c in profil.competences.all() if not c.est_supprime}
+    for element in diplomes + experiences:
+        competences.update(c.nom for c in element.competences.all() if not c.est_supprime)
+
+    parcours = []
+    for d in diplomes:
+        parcours += [d.intitule, d.domaine, d.etablissement]
+    for e in experiences:
+        parcours += [e.poste, e.entreprise]
+
+    localisation = [
+        profil.localite_souhaitee,
+        profil.telephone, _chiffres(profil.telephone),
+        profil.telephone_second, _chiffres(profil.telephone_second),
+    ]
+    if profil.adresse_id:
+        localisation += [profil.adresse.ville, profil.adresse.pays, profil.adresse.quartier]
+
+    return {
+        'A': _joindre(identite),
+        'B': _joindre(sorted(competences)),
+        'C': _joindre(parcours),
+        'D': _joindre(localisation),
+    }
+
+
+def expression_document(textes):
+    """Construit l'expression SQL du tsvector pondéré à partir des textes"""
+    vecteur = None
+    for poids in POIDS:
+        partie = SearchVector(
+            Value(textes.get(poids, ''), output_field=TextField()),
+            weight=poids,
+            config=SEARCH_CONFIG,
+        )
+        vecteur = partie if vecteur is None else vecteur + partie
+    return vecteur
+
+
+def profils_a_indexer():
+    """Queryset des profils avec tout ce qu'il faut pour construire le document"""
+    from .models import ProfilCandidat
+
+    return ProfilCandidat.objects.select_related('user', 'adresse').prefetch_related(
+        'competences',
+        'user__diplomes__competences',
+        'user__experiences__competences',
+    )
+
+
+def mettre_a_jour_document(profil):
+    """Recalcule le document d'un profil (profil préchargé via profils_a_indexer)"""
+    from .models import ProfilCandidat
+
+    textes = construire_textes(profil.user, profil)
+    ProfilCandidat.objects.filter(pk=profil.pk).update(
+        document_recherche=expression_document(textes)
+    )
+
+
+def mettre_a_jour_candidats(user_ids):
+    """Recalcule le document des candidats donnés (ids utilisateur)"""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return 0
+    profils = profils_a_indexer().filter(pk__in=user_ids)
+    total = 0
+    for profil in profils:
+        mettre_a_jour_document(profil)
+        total += 1
+    return total
+
+
+def construire_requete(texte):
+    """
+    Transforme la saisie libre en tsquery préfixée : "dév pyth" -> dév:* & pyth:*
+    Les termes passent par la configuration française (unaccent + racinisation).
+    Retourne None si la saisie ne contient aucun terme exploitable.
+    """
+    termes = _TERME_RE.findall(texte or '')
+    if not termes:
+        return None
+    brute = ' & '.join(f'{terme}:*' for terme in termes)
+    return SearchQuery(brute, search_type='raw', config=SEARCH_CONFIG)
+
+
+def rechercher_candidats(candidats, texte, champ='profil_candidat__document_recherche',
+                         dans_documents=False):
+    """
+    Filtre un queryset de User sur le document plein texte,
+    annote `pertinence` et trie les plus pertinents en premier.
+    Avec `dans_documents`, un candidat correspond aussi si le texte extrait
+    d'un de ses documents actifs correspond (meilleur document, poids moitié).
+    """
+    from .models import Document
+
+    requete = construire_requete(texte)
+    if requete is None:
+        return candidats
+
+    rang = Coalesce(SearchRank(F(champ), requete), 0.0)
+    condition = Q(**{champ: requete})
+    if dans_documents:
+        documents = Document.objects.filter(
+            candidat=OuterRef('pk'), est_supprime=False, est_actif=True,
+            document_recherche=requete,
+        )
+        rang_documents = documents.annotate(
+            rang=SearchRank(F('document_recherche'), requete)
+        ).order_by('-rang').values('rang')[:1]
+        condition |= Q(Exists(documents))
+        rang = rang + Coalesce(Subquery(rang_documents), 0.0) * 0.5
+
+    # Cast en double précision : la valeur relue est exacte, ce qui permet
+    # de l'utiliser comme clé de pagination par curseur
+    return candidats.filter(condition).annotate(
+        pertinence=Cast(rang, FloatField())
+    ).order_by('-pertinence', 'pk')
+
+
+# ====================================================
+# INDEX DÉNORMALISÉ DES COMPÉTENCES (CompetenceCandidat)
+# ====================================================
+def _competences_attendues(user_ids):
+    """Ensemble (candidat_id, competence_id, source) calculé depuis les M2M sources"""
+    from .models import ProfilCandidat, Diplome, ExperienceProfessionnelle
+
+    attendues = set()
+    lignes_profil = ProfilCandidat.competences.through.objects.filter(
+        profilcandidat_id__in=user_ids
+    ).values_list('profilcandidat_id', 'competence_id')
+    attendues.update((uid, cid, 'profil') for uid, cid in lignes_profil)
+
+    lignes_diplomes = Diplome.competences.through.objects.filter(
+        diplome__candidat_id__in=user_ids, diplome__est_supprime=False
+    ).values_list('diplome__candidat_id', 'competence_id')
+    attendues.update((uid, cid, 'diplomes') for uid, cid in lignes_diplomes)
+
+    lignes_experiences = ExperienceProfessionnelle.competences.through.objects.filter(
+        experienceprofessionnelle__candidat_id__in=user_ids,
+        experienceprofessionnelle__est_supprime=False,
+    ).values_list('experienceprofessionnelle__candidat_id', 'competence_id')
+    attendues.update((uid, cid, 'experiences') for uid, cid in lignes_experiences)
+    return attendues
+
+
+def synchroniser_competences(user_ids):
+    """
+    Aligne CompetenceCandidat sur les compétences réelles des candidats donnés :
+    une lecture par source, une suppression et une insertion groupées.
+    """
+    from .models import CompetenceCandidat
+
+    user_ids = {uid for uid in user_ids if uid}
+    if not user_ids:
+        return 0, 0
+
+    attendues = _competences_attendues(user_ids)
+    existantes = {
+        (uid, cid, source): pk
+        for pk, uid, cid, source in CompetenceCandidat.objects.filter(
+            candidat_id__in=user_ids
+        ).values_list('pk', 'candidat_id', 'competence_id', 'source')
+    }
+
+    obsoletes = [pk for cle, pk in existantes.items() if cle not in attendues]
+    if obsoletes:
+        CompetenceCandidat.objects.filter(pk__in=obsoletes).delete()
+
+    nouvelles = [
+        CompetenceCandidat(candidat_id=uid, competence_id=cid, source=source)
+        for uid, cid, source in attendues
+        if (uid, cid, source) not in existantes
+    ]
+    CompetenceCandidat.objects.bulk_create(nouvelles, ignore_conflicts=True)
+    return len(nouvelles), len(obsoletes)
+
+
+def candidats_avec_competences(candidats, competences, source=''):
+    """Filtre un queryset de User par semi-jointure sur l'index des compétences"""
+    from .models import CompetenceCandidat
+
+    index = CompetenceCandidat.objects.filter(competence__in=competences)
+    if source:
+        index = index.filter(source=source)
+    return candidats.filter(pk__in=index.values('candidat_id'))
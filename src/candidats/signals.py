@@ -1,7 +1,14 @@
 # Dans candidats/signals.py
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
-from .models import Candidature
+from .models import (
+    Candidature, ProfilCandidat, Diplome, ExperienceProfessionnelle, Competence, Document
+)
+from .search import mettre_a_jour_candidats, synchroniser_competences
+from .matching import marquer_candidats
+from .extraction import indexer_document, planifier_extraction
 from django.utils import timezone
 
 
@@ -11,9 +18,126 @@ def update_statut_entretien(sender, instance, **kwargs):
     Met à jour automatiquement le statut de la candidature
     lorsque la date d'entretien est passée
     """
-    if (instance.entretien_planifie and 
-        instance.date_entretien_prevue and 
+    if (instance.entretien_planifie and
+        instance.date_entretien_prevue and
         instance.date_entretien_prevue < timezone.now() and
         instance.statut == 'ENTRETIEN'):
         # Ici vous pourriez changer le statut ou déclencher une action
-        pass
\ No newline at end of file
+        pass
+
+
+# ====================================================
+# INDEX DE RECHERCHE DES CANDIDATS (plein texte + compétences + matching)
+# ====================================================
+def _reindexer_apres_commit(user_ids, competences=False):
+    """
+    Recalcule le document de recherche (et, si demandé, l'index des
+    compétences) une fois la transaction validée, puis signale les
+    candidats à l'index de matching
+    """
+    user_ids = {uid for uid in user_ids if uid}
+    if not user_ids:
+        return
+
+    def reindexer():
+        if competences:
+            synchroniser_competences(user_ids)
+        mettre_a_jour_candidats(user_ids)
+        marquer_candidats(user_ids)
+
+    transaction.on_commit(reindexer)
+
+
+@receiver(post_save, sender=ProfilCandidat)
+def reindexer_profil(sender, instance, **kwargs):
+    _reindexer_apres_commit([instance.pk])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def reindexer_utilisateur(sender, instance, update_fields=None, **kwargs):
+    # La connexion ne met à jour que last_login : inutile de réindexer
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    if instance.role == 'candidat':
+        _reindexer_apres_commit([instance.pk])
+
+
+@receiver(post_save, sender=Diplome)
+@receiver(post_delete, sender=Diplome)
+@receiver(post_save, sender=ExperienceProfessionnelle)
+@receiver(post_delete, sender=ExperienceProfessionnelle)
+def reindexer_parcours(sender, instance, **kwargs):
+    # La suppression (logique ou physique) retire aussi les compétences associées
+    _reindexer_apres_commit([instance.candidat_id], competences=True)
+
+
+@receiver(post_save, sender=Competence)
+def reindexer_competence(sender, instance, created, **kwargs):
+    """Renommage ou suppression logique d'une compétence"""
+    if created:
+        return
+    user_ids = set(instance.index_candidats.values_list('candidat_id', flat=True))
+    _reindexer_apres_commit(user_ids)
+
+
+def _candidats_concernes(instance, action, model, pk_set, reverse, champ_candidat, related_name):
+    """Ids des candidats touchés par un changement M2M sur les compétences"""
+    if action == 'pre_clear':
+        # Côté compétence, le clear ne fournit pas pk_set : on mémorise avant
+        if reverse:
+            instance._candidats_avant_clear = list(
+                getattr(instance, related_name).values_list(champ_candidat, flat=True)
+            )
+        return []
+    if not reverse:
+        return [getattr(instance, champ_candidat)]
+    if action == 'post_clear':
+        return getattr(instance, '_candidats_avant_clear', [])
+    if not pk_set:
+        return []
+    return model.objects.filter(pk__in=pk_set).values_list(champ_candidat, flat=True)
+
+
+ACTIONS_M2M = ('pre_clear', 'post_add', 'post_remove', 'post_clear')
+
+
+@receiver(m2m_changed, sender=ProfilCandidat.competences.through)
+def reindexer_competences_profil(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ACTIONS_M2M:
+        _reindexer_apres_commit(
+            _candidats_concernes(instance, action, ProfilCandidat, pk_set, reverse, 'pk', 'candidats'),
+            competences=True,
+        )
+
+
+@receiver(m2m_changed, sender=Diplome.competences.through)
+def reindexer_competences_diplome(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ACTIONS_M2M:
+        _reindexer_apres_commit(
+            _candidats_concernes(instance, action, Diplome, pk_set, reverse, 'candidat_id', 'diplomes'),
+            competences=True,
+        )
+
+
+@receiver(m2m_changed, sender=ExperienceProfessionnelle.competences.through)
+def reindexer_competences_experience(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ACTIONS_M2M:
+        _reindexer_apres_commit(
+            _candidats_concernes(instance, action, ExperienceProfessionnelle, pk_set, reverse, 'candidat_id', 'experiences'),
+            competences=True,
+        )
+
+
+# ====================================================
+# TEXTE DES DOCUMENTS CANDIDATS
+# ====================================================
+@receiver(post_save, sender=Document)
+def indexer_document_candidat(sender, instance, **kwargs):
+    """
+    Le document plein texte suit le nom, les mots-clés et la description ;
+    l'extraction du fichier est confiée à l'arrière-plan après commit
+    """
+    indexer_document(instance.pk)
+    if instance.extraction_statut == 'attente':
+        document_id = instance.pk
+        transaction.on_commit(lambda: planifier_extraction(document_id))
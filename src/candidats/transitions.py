@@ -0,0 +1,94 @@
+# candidats/transitions.py
+"""
+Transitions de statut groupées pour les candidatures du backoffice.
+
+Toutes les candidatures sélectionnées sont verrouillées, modifiées par un
+seul `bulk_update` et historisées par un seul insert groupé dans
+HistoricalCandidature (simple_history), le tout dans une transaction.
+Une seule note interne récapitule la décision, au lieu d'une note par
+candidature comme dans backoffice_candidature_quick_action.
+"""
+from django.db import transaction
+from django.utils import timezone
+from simple_history.utils import bulk_update_with_history
+
+from notes.models import NoteInterne
+from .models import Candidature
+
+# action -> (nouveau statut, statuts de départ autorisés)
+TRANSITIONS = {
+    'entretien': ('ENTRETIEN', {'POSTULE'}),
+    'accepter': ('ACCEPTE', {'ENTRETIEN'}),
+    'refuser': ('REFUSE', {'POSTULE', 'ENTRETIEN'}),
+}
+
+LIBELLES_ACTIONS = {
+    'entretien': "Passage en entretien",
+    'accepter': "Acceptation",
+    'refuser': "Refus",
+}
+
+TAILLE_LOT = 500
+
+
+def appliquer_transition(candidature_ids, action, utilisateur):
+    """
+    Applique `action` aux candidatures données.
+    Retourne (candidatures modifiées, nombre de candidatures ignorées car
+    supprimées ou dans un statut incompatible).
+    """
+    nouveau_statut, statuts_depart = TRANSITIONS[action]
+    candidature_ids = set(candidature_ids)
+
+    with transaction.atomic():
+        candidatures = list(
+            Candidature.objects.select_for_update(of=('self',)).select_related(
+                'candidat', 'offre'
+            ).filter(
+                pk__in=candidature_ids, est_supprime=False, statut__in=statuts_depart
+            ).order_by('pk')
+        )
+        if not candidatures:
+            return [], len(candidature_ids)
+
+        maintenant = timezone.now()
+        for candidature in candidatures:
+            candidature.statut = nouveau_statut
+            # auto_now n'est pas appliqué par bulk_update
+            candidature.date_mise_a_jour = maintenant
+
+        bulk_update_with_history(
+            candidatures,
+            Candidature,
+            ['statut', 'date_mise_a_jour'],
+            batch_size=TAILLE_LOT,
+            default_user=utilisateur,
+            default_change_reason=f"{LIBELLES_ACTIONS[action]} groupé",
+            default_date=maintenant,
+        )
+
+        _noter_decision(candidatures, action, utilisateur, maintenant)
+
+    return candidatures, len(candidature_ids) - len(candidatures)
+
+
+def _noter_decision(candidatures, action, utilisateur, date):
+    """Une note interne récapitulative pour tout le lot"""
+    lignes = "\n".join(
+        f"    - {c.candidat.get_full_name()} ({c.offre.titre})" for c in candidatures
+    )
+    contenu = f"""
+    {LIBELLES_ACTIONS[action]} de {len(candidatures)} candidature(s)
+    Nouveau statut: {TRANSITIONS[action][0]}
+    Décision prise par: {utilisateur.get_full_name()}
+    Date: {date.strftime('%d/%m/%Y à %H:%M')}
+
+    Candidatures concernées:
+{lignes}
+    """
+    return NoteInterne.objects.create(
+        expediteur=utilisateur,
+        sujet=f"Décision groupée - {LIBELLES_ACTIONS[action]} ({len(candidatures)})",
+        contenu=contenu,
+        niveau_urgence='low',
+    )
@@ -59,10 +59,12 @@ urlpatterns = [
     path('documents/<int:document_id>/telecharger/', views.telecharger_document, name='telecharger_document'),
     # Candidats
     path('candidats_backoffice/', views.backoffice_candidat_list, name='backoffice_candidat_list'),
+    path('candidats_backoffice/export/', views.backoffice_candidat_export, name='backoffice_candidat_export'),
     path('candidats_backoffice/<int:candidat_id>/', views.backoffice_candidat_detail, name='backoffice_candidat_detail'),
     
     # Candidatures
     path('candidatures_backoffice/', views.backoffice_candidature_list, name='backoffice_candidature_list'),
+    path('candidatures_backoffice/actions-groupees/', views.backoffice_candidature_bulk_action, name='backoffice_candidature_bulk_action'),
     path('candidatures_backoffice/<int:candidature_id>/', views.backoffice_candidature_detail, name='backoffice_candidature_detail'),
     path('candidatures_backoffice/<int:candidature_id>/action/<str:action>/', views.backoffice_candidature_quick_action, name='backoffice_candidature_quick_action'),
     
@@ -11,13 +11,15 @@ import logging
 logger = logging.getLogger(__name__)
 from authentication.models import User
 from jobs.models import JobOffer,JobStatus
+from jobs.search import rechercher_offres
 from .models import (
     ProfilCandidat, Diplome, ExperienceProfessionnelle,
     Document, Candidature, Adresse, Entretien, Competence,
     STATUT_CANDIDATURE_CHOICES,STATUT_ENTRETIEN_CHOICES,
     EvaluationEntretien  # NOUVEAU MODÈLE
 )
-from notes.models import NoteInterne,NoteReception
+from notes.models import NoteInterne
+from notes.services import diffuser_note
 
 from .forms import (
     ProfilCandidatForm, DiplomeForm, ExperienceForm,
@@ -544,14 +546,6 @@ def candidat_job_list(request):
     ).order_by('-is_open', '-date_publication')
 
     # Appliquer les filtres
-    if search_query:
-        offres = offres.filter(
-            Q(titre__icontains=search_query) |
-            Q(mission_principale__icontains=search_query) |
-            Q(profil_recherche__icontains=search_query) |
-            Q(competences_qualifications__icontains=search_query)
-        )
-
     if lieu_query:
         offres = offres.filter(lieu__icontains=lieu_query)
 
@@ -567,10 +561,18 @@ def candidat_job_list(request):
     if salaire_min_query:
         try:
             salaire_min = int(salaire_min_query)
-            offres = offres.filter(salaire__gte=salaire_min)
+            # Offres dont la fourchette (FCFA annuels) atteint le montant demandé
+            offres = offres.filter(salaire_max__gte=salaire_min)
         except ValueError:
             pass
 
+    # Recherche en dernier : le repli trigrammes ne s'applique que si aucune
+    # offre filtrée ne correspond au plein texte
+    if search_query:
+        offres = rechercher_offres(offres, search_query)
+        if 'pertinence' in offres.query.annotations:
+            offres = offres.order_by('-is_open', '-pertinence', '-date_publication')
+
     # Pagination - 12 offres par page
     paginator = Paginator(offres, 12)
     page = request.GET.get('page')
@@ -637,7 +639,12 @@ from django.contrib import messages
 from django.core.paginator import Paginator
 from django.db.models import Q, Count
 from django.utils import timezone
+from django.http import StreamingHttpResponse, Http404
+from django.core.exceptions import PermissionDenied
+from django.utils.http import url_has_allowed_host_and_scheme
 
+from antares_rh.pagination import KeysetPaginator
+from antares_rh.telechargements import servir_fichier
 from authentication.models import User
 from jobs.models import JobOffer
 from .models import (
@@ -645,6 +652,10 @@ from .models import (
     Document, Candidature, Entretien, Competence,
     EvaluationEntretien,NIVEAU_CHOICES
 )
+from .search import rechercher_candidats, candidats_avec_competences
+from .matching import candidats_suggeres
+from .export import lignes_candidats, flux_csv, flux_xlsx
+from .transitions import TRANSITIONS, appliquer_transition
 from .forms import (
     CandidatFilterForm, CandidatureBackofficeForm,
     PlanifierEntretienForm, EntretienCompteRenduForm,
@@ -720,16 +731,12 @@ def backoffice_dashboard(request):
 # ====================================================
 # VUES GESTION DES CANDIDATS (VUE 360)
 # ====================================================
-@login_required
-
-def backoffice_candidat_list(request):
-    """Liste des candidats avec filtres avancés"""
+def _candidats_filtres(form):
+    """Candidats filtrés selon CandidatFilterForm (liste et export)"""
     candidats = User.objects.filter(
         Q(profil_candidat__isnull=False) & ~Q(profil_candidat__est_supprime=True)
     ).select_related('profil_candidat')
     
-    form = CandidatFilterForm(request.GET or None)
-    
     if form.is_valid():
         q = form.cleaned_data.get('q')
         competence = form.cleaned_data.get('competence')
@@ -740,32 +747,16 @@ def backoffice_candidat_list(request):
         
         # Application des filtres
         if q:
-            candidats = candidats.filter(
-                Q(first_name__icontains=q) |
-                Q(last_name__icontains=q) |
-                Q(email__icontains=q) |
-                Q(profil_candidat__telephone__icontains=q) |
-                Q(profil_candidat__telephone_second__icontains=q) |
-                Q(profil_candidat__localite_souhaitee__icontains=q) |
-                Q(profil_candidat__competences__nom__icontains=q) |
-                Q(diplomes__competences__nom__icontains=q) |
-                Q(experiences__competences__nom__icontains=q)
-            ).distinct()
+            # Recherche plein texte sur le document indexé (GIN), triée par pertinence
+            candidats = rechercher_candidats(
+                candidats, q, dans_documents=form.cleaned_data.get('dans_documents')
+            )
         
         if competence:
             source = form.cleaned_data.get('source_competence', '')
             
-            # Create a Q object for competence filtering
-            competence_q = Q()
-            
-            if source == 'profil' or not source:
-                competence_q |= Q(profil_candidat__competences__in=competence)
-            if source == 'diplomes' or not source:
-                competence_q |= Q(diplomes__competences__in=competence)
-            if source == 'experiences' or not source:
-                competence_q |= Q(experiences__competences__in=competence)
-                
-            candidats = candidats.filter(competence_q).distinct()
+            # Semi-jointure sur l'index (candidat, compétence, source)
+            candidats = candidats_avec_competences(candidats, competence, source)
 
         if localite:
             candidats = candidats.filter(
@@ -792,6 +783,15 @@ def backoffice_candidat_list(request):
         if disponible:
             candidats = candidats.filter(profil_candidat__disponible=True)
     
+    return candidats
+
+
+@login_required
+def backoffice_candidat_list(request):
+    """Liste des candidats avec filtres avancés"""
+    form = CandidatFilterForm(request.GET or None)
+    candidats = _candidats_filtres(form)
+    
     # Prefetch related data after filtering to optimize performance
     candidats = candidats.prefetch_related(
         'profil_candidat__competences',
@@ -800,10 +800,13 @@ def backoffice_candidat_list(request):
         'profil_candidat__adresse'
     ).distinct()
     
-    # Pagination
-    paginator = Paginator(candidats, 25)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Pagination par curseur : par pertinence si recherche, sinon par date d'inscription
+    if 'pertinence' in candidats.query.annotations:
+        ordering = ('-pertinence', 'pk')
+    else:
+        ordering = ('-profil_candidat__date_inscription', '-pk')
+    paginator = KeysetPaginator(candidats, 25, ordering=ordering, estimate_total=True)
+    page_obj = paginator.get_page(request.GET)
     
     context = {
         'page_obj': page_obj,
@@ -812,6 +815,31 @@ def backoffice_candidat_list(request):
     
     return render(request, 'candidats/backoffice/candidats/candidat_list.html', context)
 
+
+@login_required
+def backoffice_candidat_export(request):
+    """Export CSV ou XLSX des candidats filtrés, écrit en flux"""
+    form = CandidatFilterForm(request.GET or None)
+    candidats = _candidats_filtres(form)
+    
+    format_export = request.GET.get('format', 'csv')
+    horodatage = timezone.now().strftime('%Y%m%d_%H%M')
+    lignes = lignes_candidats(candidats)
+    
+    if format_export == 'xlsx':
+        response = StreamingHttpResponse(
+            flux_xlsx(lignes),
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+        extension = 'xlsx'
+    else:
+        response = StreamingHttpResponse(flux_csv(lignes), content_type='text/csv; charset=utf-8')
+        extension = 'csv'
+    response['Content-Disposition'] = f'attachment; filename="candidats_{horodatage}.{extension}"'
+    
+    enregistrer_action(request.user, 'EXPORT_CANDIDATS', f"Export {extension.upper()} des candidats")
+    return response
+
 @login_required
 
 def backoffice_candidat_detail(request, candidat_id):
@@ -883,16 +911,23 @@ def annuler_verification_document(request, document_id):
     
     # Rediriger vers la page du candidat
     return redirect('backoffice_candidat_detail', candidat_id=document.candidat.id)
-from django.http import FileResponse
-
 @login_required
-
 def telecharger_document(request, document_id):
-    """Vue pour télécharger un document"""
-    document = get_object_or_404(Document, id=document_id, est_supprime=False)
-
-    response = FileResponse(document.fichier.open(), as_attachment=True, filename=document.nom)
-    return response
+    """Vue pour télécharger un document (le candidat propriétaire ou l'équipe recrutement)"""
+    document = get_object_or_404(Document, id=document_id)
+    recruteur = request.user.is_superuser or is_recruiter(request.user)
+
+    # Un document retiré par le candidat reste consultable depuis ses candidatures
+    if document.est_supprime and not recruteur:
+        raise Http404
+    if document.candidat_id != request.user.id and not recruteur:
+        raise PermissionDenied
+
+    # Aperçu dans le navigateur avec ?apercu=1, téléchargement sinon
+    return servir_fichier(
+        request, document.fichier, nom=document.nom,
+        en_piece_jointe=not request.GET.get('apercu'),
+    )
 # ====================================================
 # VUES GESTION DES CANDIDATURES
 # ====================================================
@@ -935,10 +970,9 @@ def backoffice_candidature_list(request):
         except ValueError:
             pass
 
-    # Pagination
-    paginator = Paginator(candidatures, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Pagination par curseur sur (date_postulation, id)
+    paginator = KeysetPaginator(candidatures, 20, ordering=('-date_postulation', '-pk'))
+    page_obj = paginator.get_page(request.GET)
     
     # Préparer les choix de statut pour le template
     statut_choices = STATUT_CANDIDATURE_CHOICES
@@ -1032,11 +1066,7 @@ def backoffice_candidature_detail(request, candidature_id):
             roles_concernes = ['admin', 'rh', 'employe', 'stagiaire']
             utilisateurs_concernes = User.objects.filter(role__in=roles_concernes)
             
-            for utilisateur in utilisateurs_concernes:
-                NoteReception.objects.create(
-                    note=note_entretien,
-                    destinataire=utilisateur
-                )
+            diffuser_note(note_entretien, utilisateurs_concernes)
             
             # Mettre à jour la candidature
             candidature.statut = 'ENTRETIEN'
@@ -1049,11 +1079,15 @@ def backoffice_candidature_detail(request, candidature_id):
             messages.success(request, "Entretien planifié avec succès et note interne créée.")
             return redirect('backoffice_candidature_detail', candidature_id=candidature.id)
     
+    # Autres profils proches de l'offre (index de matching)
+    suggestions = candidats_suggeres(candidature.offre, limite=5, exclure=[candidature.candidat_id])
+    
     context = {
         'candidature': candidature,
         'form_candidature': form_candidature,
         'form_note': form_note,
         'form_entretien': form_entretien,
+        'suggestions': suggestions,
         'now': timezone.now(),  # Ajout pour les comparaisons de date
     }
     
@@ -1105,6 +1139,40 @@ def backoffice_candidature_quick_action(request, candidature_id, action):
     messages.success(request, f"Candidature {nouveau_statut.lower()} avec succès.")
     return redirect('backoffice_candidature_detail', candidature_id=candidature.id)
 
+@login_required
+def backoffice_candidature_bulk_action(request):
+    """Changement de statut groupé sur les candidatures sélectionnées"""
+    retour = request.POST.get('next')
+    if not url_has_allowed_host_and_scheme(retour, allowed_hosts={request.get_host()}):
+        retour = reverse('backoffice_candidature_list')
+    
+    if request.method != 'POST':
+        return redirect(retour)
+    
+    action = request.POST.get('action')
+    if action not in TRANSITIONS:
+        messages.error(request, "Action non valide.")
+        return redirect(retour)
+    
+    try:
+        candidature_ids = [int(pk) for pk in request.POST.getlist('candidatures')]
+    except ValueError:
+        candidature_ids = []
+    if not candidature_ids:
+        messages.warning(request, "Aucune candidature sélectionnée.")
+        return redirect(retour)
+    
+    modifiees, ignorees = appliquer_transition(candidature_ids, action, request.user)
+    
+    if modifiees:
+        messages.success(request, f"{len(modifiees)} candidature(s) mise(s) à jour.")
+    if ignorees:
+        messages.warning(
+            request,
+            f"{ignorees} candidature(s) ignorée(s) : statut incompatible avec cette action."
+        )
+    return redirect(retour)
+
 # ====================================================
 # VUES GESTION DES ENTRETIENS
 # ====================================================
@@ -1163,11 +1231,7 @@ def backoffice_entretien_create(request, candidature_id=None):
             roles_concernes = ['admin', 'rh', 'employe', 'stagiaire']
             utilisateurs_concernes = User.objects.filter(role__in=roles_concernes)
             
-            for utilisateur in utilisateurs_concernes:
-                NoteReception.objects.create(
-                    note=note_entretien,
-                    destinataire=utilisateur
-                )
+            diffuser_note(note_entretien, utilisateurs_concernes)
             
             # Lier la note à l'entretien (si votre modèle a cette relation)
             # entretien.note_liee = note_entretien
@@ -1235,11 +1299,7 @@ def backoffice_entretien_edit(request, entretien_id):
                 roles_concernes = ['admin', 'rh', 'employe', 'stagiaire']
                 utilisateurs_concernes = User.objects.filter(role__in=roles_concernes)
                 
-                for utilisateur in utilisateurs_concernes:
-                    NoteReception.objects.create(
-                        note=note_mise_a_jour,
-                        destinataire=utilisateur
-                    )
+                diffuser_note(note_mise_a_jour, utilisateurs_concernes)
             
             messages.success(request, "Entretien modifié avec succès.")
             return redirect('backoffice_entretien_detail', entretien_id=entretien.id)
@@ -1285,11 +1345,7 @@ def backoffice_entretien_delete(request, entretien_id):
         roles_concernes = ['admin', 'rh', 'employe', 'stagiaire']
         utilisateurs_concernes = User.objects.filter(role__in=roles_concernes)
         
-        for utilisateur in utilisateurs_concernes:
-            NoteReception.objects.create(
-                note=note_annulation,
-                destinataire=utilisateur
-            )
+        diffuser_note(note_annulation, utilisateurs_concernes)
         
         # Supprimer l'entretien
         entretien.soft_delete()
@@ -1325,8 +1381,14 @@ def backoffice_entretien_list(request):
     if statut_filter:
         entretiens = entretiens.filter(statut=statut_filter)
     
+    # Pagination par curseur sur (date_prevue, id)
+    paginator = KeysetPaginator(entretiens, 25, ordering=('date_prevue', 'pk'))
+    page_obj = paginator.get_page(request.GET)
+    
     context = {
-        'entretiens': entretiens,
+        'entretiens': page_obj,
+        'page_obj': page_obj,
+        'is_paginated': page_obj.has_other_pages(),
         'statut_choices': STATUT_ENTRETIEN_CHOICES,
         'now': timezone.now(),
     }
@@ -1516,11 +1578,7 @@ def _notifier_utilisateurs(note, roles):
     """Notifier les utilisateurs concernés"""
     utilisateurs_concernes = User.objects.filter(role__in=roles, is_active=True)
     
-    for utilisateur in utilisateurs_concernes:
-        NoteReception.objects.create(
-            note=note,
-            destinataire=utilisateur
-        )
+    diffuser_note(note, utilisateurs_concernes)
 
 @login_required
 
@@ -0,0 +1,91 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Substr
+
+from documents.models import ContenuStocke
+from documents.stockage import PREFIXE, champs_dedupliques, stockage_deduplique
+
+
+class Command(BaseCommand):
+    help = (
+        'Migre les fichiers existants vers le stockage dédupliqué, renseigne taille et '
+        'empreinte, puis recalcule les compteurs de références'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--supprimer-originaux', action='store_true',
+            help='Supprimer les fichiers d\'origine une fois copiés dans le stockage'
+        )
+
+    def handle(self, *args, **options):
+        migres = manquants = 0
+        for modele, champ in champs_dedupliques():
+            lignes = modele._default_manager.exclude(
+                **{f'{champ.attname}__startswith': f'{PREFIXE}/'}
+            ).exclude(**{champ.attname: ''}).exclude(**{f'{champ.attname}__isnull': True})
+
+            for pk, ancien in lignes.values_list('pk', champ.attname).iterator(chunk_size=500):
+                if not champ.storage.exists(ancien):
+                    manquants += 1
+                    continue
+                with champ.storage.open(ancien, 'rb') as fichier:
+                    nouveau = champ.storage.save(ancien, fichier)
+                # Le filtre sur l'ancien nom évite d'écraser un ré-upload concurrent
+                if modele._default_manager.filter(pk=pk, **{champ.attname: ancien}).update(
+                    **{champ.attname: nouveau}
+                ):
+                    migres += 1
+                    if options['supprimer_originaux']:
+                        champ.storage.delete(ancien)
+                else:
+                    champ.storage.liberer(nouveau)
+
+            self._renseigner_metadonnees(modele, champ)
+
+        references, purges = self._recompter()
+        self.stdout.write(self.style.SUCCESS(
+            f'{migres} fichiers migrés, {manquants} introuvables, '
+            f'{references} contenus référencés, {purges} contenus purgés'
+        ))
+
+    def _renseigner_metadonnees(self, modele, champ):
+        """Taille (depuis ContenuStocke) et empreinte (depuis le nom), en une requête par colonne"""
+        lignes = modele._default_manager.filter(**{f'{champ.attname}__startswith': f'{PREFIXE}/'})
+        if champ.taille_field:
+            lignes.filter(**{f'{champ.taille_field}__isnull': True}).update(**{
+                champ.taille_field: Subquery(
+                    ContenuStocke.objects.filter(chemin=OuterRef(champ.attname)).values('taille')[:1]
+                )
+            })
+        if champ.empreinte_field:
+            # blobs/ab/cd/<empreinte>.ext : l'empreinte commence au 13e caractère
+            lignes.filter(**{champ.empreinte_field: ''}).update(**{
+                champ.empreinte_field: Substr(champ.attname, len(PREFIXE) + 8, 64)
+            })
+
+    def _recompter(self):
+        """Références réelles = lignes pointant vers chaque contenu, tous modèles confondus"""
+        utilisations = Counter()
+        for modele, champ in champs_dedupliques():
+            utilisations.update(
+                modele._default_manager.filter(
+                    **{f'{champ.attname}__startswith': f'{PREFIXE}/'}
+                ).values_list(champ.attname, flat=True).iterator(chunk_size=2000)
+            )
+
+        a_corriger = []
+        for contenu in ContenuStocke.objects.only('empreinte', 'chemin', 'references').iterator():
+            reelles = utilisations.get(contenu.chemin, 0)
+            if contenu.references != reelles:
+                contenu.references = reelles
+                a_corriger.append(contenu)
+        ContenuStocke.objects.bulk_update(a_corriger, ['references'], batch_size=500)
+
+        purges = sum(
+            stockage_deduplique.purger(empreinte)
+            for empreinte in ContenuStocke.objects.filter(references=0).values_list('empreinte', flat=True)
+        )
+        return ContenuStocke.objects.count(), purges
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:01
+
+import documents.models
+import documents.stockage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContenuStocke',
+            fields=[
+                ('empreinte', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('chemin', models.CharField(max_length=255, unique=True)),
+                ('taille', models.PositiveBigIntegerField()),
+                ('references', models.PositiveIntegerField(default=0)),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Contenu stocké',
+                'verbose_name_plural': 'Contenus stockés',
+            },
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='empreinte_contenu',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='taille_fichier',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='document',
+            name='fichier',
+            field=documents.stockage.FichierDeduplique(empreinte_field='empreinte_contenu', taille_field='taille_fichier', upload_to=documents.models.chemin_document),
+        ),
+    ]
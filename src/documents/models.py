@@ -5,6 +5,8 @@ from datetime import timedelta
     
 import re
 
+from .stockage import FichierDeduplique
+
 def chemin_document(instance, filename):
     if instance.entreprise:
         nom_entreprise = re.sub(r'\W+', '_', instance.entreprise.nom.lower())
@@ -39,7 +41,12 @@ class Document(models.Model):
     titre = models.CharField(max_length=255)
     description = models.CharField(max_length=255)
     type = models.CharField(max_length=50, choices=TYPE_CHOICES, default='autre')
-    fichier = models.FileField(upload_to=chemin_document)
+    fichier = FichierDeduplique(
+        upload_to=chemin_document, taille_field='taille_fichier', empreinte_field='empreinte_contenu'
+    )
+    # Renseignés à l'upload par FichierDeduplique (voir documents/stockage.py)
+    taille_fichier = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
+    empreinte_contenu = models.CharField(max_length=64, blank=True, editable=False, db_index=True)
     date_ajout = models.DateTimeField(auto_now_add=True)
     auteur = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
     visibilite = models.CharField(max_length=20, choices=VISIBILITE_CHOICES, default='rh')
@@ -77,3 +84,21 @@ class Document(models.Model):
             return True
         return False
 
+
+class ContenuStocke(models.Model):
+    """
+    Contenu unique du stockage dédupliqué et son nombre de références
+    (lignes de modèles pointant vers ce fichier). Voir documents/stockage.py.
+    """
+    empreinte = models.CharField(max_length=64, primary_key=True)
+    chemin = models.CharField(max_length=255, unique=True)
+    taille = models.PositiveBigIntegerField()
+    references = models.PositiveIntegerField(default=0)
+    date_creation = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Contenu stocké"
+        verbose_name_plural = "Contenus stockés"
+
+    def __str__(self):
+        return f"{self.chemin} ({self.references} réf.)"
@@ -0,0 +1,212 @@
+# documents/stockage.py
+"""
+Stockage adressé par contenu des fichiers téléversés.
+
+Chaque fichier est haché (SHA-256) pendant son écriture sur disque, puis
+rangé une seule fois sous `blobs/<2>/<2>/<empreinte><extension>` : le même
+CV ré-uploadé sous un autre nom, une nouvelle version identique ou la même
+pièce envoyée par deux entreprises partagent les mêmes octets.
+
+La table ContenuStocke tient le compteur de références de chaque contenu :
+    - +1 à chaque enregistrement via ce stockage ;
+    - -1 quand une ligne change de fichier ou est supprimée (FichierDeduplique) ;
+    - à zéro, le fichier et sa ligne sont purgés après commit.
+Les suppressions logiques (est_supprime) ne touchent pas au fichier.
+
+FichierDeduplique renseigne aussi la taille et l'empreinte dans des colonnes
+du modèle (comme width_field / height_field pour ImageField) : l'affichage
+n'a jamais besoin de lire le disque. Ces colonnes doivent être déclarées
+après le champ fichier.
+
+Les fichiers antérieurs (hors `blobs/`) restent lisibles ; la commande
+`python manage.py dedupliquer_fichiers` les migre et recalcule les compteurs.
+"""
+import hashlib
+import os
+import re
+import tempfile
+from functools import partial
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init
+
+PREFIXE = 'blobs'
+
+_BLOB_RE = re.compile(rf'^{PREFIXE}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/([0-9a-f]{{64}})(\.[^/]*)?$')
+
+
+def empreinte_depuis_nom(nom):
+    """Empreinte SHA-256 d'un fichier du stockage, '' pour un fichier hors `blobs/`"""
+    correspondance = _BLOB_RE.match(nom or '')
+    return correspondance.group(1) if correspondance else ''
+
+
+def _contenus():
+    return apps.get_model('documents', 'ContenuStocke')
+
+
+class StockageDeduplique(FileSystemStorage):
+    """FileSystemStorage dont les noms de fichiers sont dérivés du contenu"""
+
+    def get_available_name(self, name, max_length=None):
+        # Le nom final ne dépend que du contenu : pas de suffixe aléatoire
+        return name
+
+    def _save(self, name, content):
+        extension = os.path.splitext(name)[1].lower()
+        dossier_temporaire = self.path(os.path.join(PREFIXE, 'tmp'))
+        os.makedirs(dossier_temporaire, exist_ok=True)
+
+        # Hachage pendant l'écriture : le contenu n'est lu qu'une fois
+        sha256 = hashlib.sha256()
+        taille = 0
+        descripteur, temporaire = tempfile.mkstemp(dir=dossier_temporaire)
+        try:
+            with os.fdopen(descripteur, 'wb') as sortie:
+                for bloc in content.chunks():
+                    sha256.update(bloc)
+                    taille += len(bloc)
+                    sortie.write(bloc)
+            os.chmod(temporaire, self.file_permissions_mode or 0o644)
+
+            empreinte = sha256.hexdigest()
+            nom = f'{PREFIXE}/{empreinte[:2]}/{empreinte[2:4]}/{empreinte}{extension}'
+            return self._referencer(empreinte, nom, taille, temporaire)
+        finally:
+            if os.path.exists(temporaire):
+                os.remove(temporaire)
+
+    def _referencer(self, empreinte, nom, taille, temporaire):
+        """Ajoute une référence au contenu, en l'écrivant sur disque s'il n'y est pas"""
+        ContenuStocke = _contenus()
+        with transaction.atomic():
+            # Le verrou sérialise avec la purge du même contenu
+            contenu = ContenuStocke.objects.select_for_update().filter(pk=empreinte).first()
+            if contenu is None:
+                try:
+                    with transaction.atomic():
+                        contenu = ContenuStocke.objects.create(
+                            empreinte=empreinte, chemin=nom, taille=taille, references=0
+                        )
+                except IntegrityError:
+                    contenu = ContenuStocke.objects.select_for_update().get(pk=empreinte)
+
+            # Même contenu sous une autre extension : on garde le premier chemin
+            chemin = self.path(contenu.chemin)
+            if not os.path.exists(chemin):
+                os.makedirs(os.path.dirname(chemin), exist_ok=True)
+                os.replace(temporaire, chemin)
+
+            ContenuStocke.objects.filter(pk=empreinte).update(references=F('references') + 1)
+        return contenu.chemin
+
+    def liberer(self, nom):
+        """Retire une référence ; le contenu est purgé après commit s'il n'est plus utilisé"""
+        empreinte = empreinte_depuis_nom(nom)
+        if not empreinte:
+            return
+        ContenuStocke = _contenus()
+        with transaction.atomic():
+            ContenuStocke.objects.filter(pk=empreinte, references__gt=0).update(
+                references=F('references') - 1
+            )
+            transaction.on_commit(partial(self.purger, empreinte))
+
+    def purger(self, empreinte):
+        """Supprime le fichier et sa ligne si le contenu n'a plus de référence"""
+        ContenuStocke = _contenus()
+        with transaction.atomic():
+            contenu = ContenuStocke.objects.select_for_update().filter(
+                pk=empreinte, references=0
+            ).first()
+            if contenu is None:
+                return False
+            super().delete(contenu.chemin)
+            contenu.delete()
+        return True
+
+    def delete(self, name):
+        # FieldFile.delete() : une référence de moins, pas une suppression physique
+        if empreinte_depuis_nom(name):
+            self.liberer(name)
+        else:
+            super().delete(name)
+
+
+stockage_deduplique = StockageDeduplique()
+
+
+class FichierDeduplique(models.FileField):
+    """
+    FileField enregistré dans le stockage adressé par contenu.
+    `taille_field` / `empreinte_field` : colonnes du modèle renseignées à l'upload.
+    """
+
+    def __init__(self, *args, taille_field=None, empreinte_field=None, **kwargs):
+        self.taille_field = taille_field
+        self.empreinte_field = empreinte_field
+        kwargs.setdefault('storage', stockage_deduplique)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs.pop('storage', None)
+        if self.taille_field:
+            kwargs['taille_field'] = self.taille_field
+        if self.empreinte_field:
+            kwargs['empreinte_field'] = self.empreinte_field
+        return name, path, args, kwargs
+
+    def contribute_to_class(self, cls, name, **kwargs):
+        super().contribute_to_class(cls, name, **kwargs)
+        if not cls._meta.abstract:
+            post_init.connect(self._memoriser_fichier, sender=cls)
+            post_delete.connect(self._liberer_fichier, sender=cls)
+
+    def _memoriser_fichier(self, instance, **kwargs):
+        # Valeur brute (nom) au chargement ; absente si le champ est différé
+        if self.attname in instance.__dict__:
+            instance.__dict__.setdefault('_fichiers_initiaux', {})[self.attname] = str(
+                instance.__dict__[self.attname] or ''
+            )
+
+    def _liberer_fichier(self, instance, **kwargs):
+        nom = str(instance.__dict__.get(self.attname) or '')
+        if nom:
+            transaction.on_commit(partial(self.storage.liberer, nom))
+
+    def pre_save(self, model_instance, add):
+        fichier = getattr(model_instance, self.attname)
+        nouveau = bool(fichier) and not fichier._committed
+        # Taille connue par l'upload, sans stat du fichier enregistré
+        taille = fichier.file.size if nouveau else None
+
+        fichier = super().pre_save(model_instance, add)
+        nom = fichier.name or ''
+
+        if nouveau:
+            if self.taille_field:
+                setattr(model_instance, self.taille_field, taille)
+            if self.empreinte_field:
+                setattr(model_instance, self.empreinte_field, empreinte_depuis_nom(nom))
+
+        initiaux = model_instance.__dict__.setdefault('_fichiers_initiaux', {})
+        ancien = initiaux.get(self.attname)
+        # Ré-upload d'un contenu identique : la nouvelle référence remplace l'ancienne
+        if ancien and (ancien != nom or nouveau):
+            transaction.on_commit(partial(self.storage.liberer, ancien))
+        initiaux[self.attname] = nom
+        return fichier
+
+
+def champs_dedupliques():
+    """(modèle, champ) pour chaque FichierDeduplique des applications installées"""
+    return [
+        (modele, champ)
+        for modele in apps.get_models()
+        for champ in modele._meta.concrete_fields
+        if isinstance(champ, FichierDeduplique)
+    ]
@@ -5,4 +5,5 @@ urlpatterns = [
     path('', views.document_list, name='document-list'),
     path('upload/', views.upload_document, name='upload-document'),
     path('<int:pk>/', views.document_detail, name='document-detail'),
+    path('<int:pk>/telecharger/', views.telecharger_document, name='document-telecharger'),
 ]
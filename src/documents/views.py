@@ -9,6 +9,7 @@ from django.shortcuts import get_object_or_404
 from django.http import HttpResponseForbidden
 from logs.utils import enregistrer_action
 from django.contrib import messages
+from antares_rh.telechargements import servir_fichier
 
 def has_upload_permission(user):
     return user.is_authenticated and user.role in ['admin', 'rh']
@@ -81,6 +82,19 @@ def document_detail(request, pk):
     })
 
 
+@login_required
+def telecharger_document(request, pk):
+    document = get_object_or_404(Document, pk=pk)
+
+    if not document.peut_etre_vu_par(request.user):
+        return HttpResponseForbidden("Vous n'avez pas accès à ce document.")
+
+    return servir_fichier(
+        request, document.fichier, nom=document.titre,
+        en_piece_jointe=not request.GET.get('apercu'),
+    )
+
+
 
 @login_required
 def upload_document(request, entreprise_id=None):
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entreprise', '0002_entreprise_telephone_pro'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='facturelibre',
+            index=models.Index(fields=['-date_envoi', '-id'], name='facture_libre_keyset_idx'),
+        ),
+    ]
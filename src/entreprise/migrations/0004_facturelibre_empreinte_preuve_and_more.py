@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:01
+
+import documents.models
+import documents.stockage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entreprise', '0003_facturelibre_facture_libre_keyset_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='facturelibre',
+            name='empreinte_preuve',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='facturelibre',
+            name='taille_preuve',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='notificationentreprise',
+            name='empreinte_fichier',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='notificationentreprise',
+            name='taille_fichier',
+            field=models.PositiveBigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='facturelibre',
+            name='preuve_paiement',
+            field=documents.stockage.FichierDeduplique(blank=True, empreinte_field='empreinte_preuve', null=True, taille_field='taille_preuve', upload_to='documents/preuves_paiement/'),
+        ),
+        migrations.AlterField(
+            model_name='notificationentreprise',
+            name='fichier',
+            field=documents.stockage.FichierDeduplique(blank=True, empreinte_field='empreinte_fichier', null=True, taille_field='taille_fichier', upload_to=documents.models.chemin_document),
+        ),
+    ]
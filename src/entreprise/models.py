@@ -2,6 +2,7 @@ from django.db import models
 from authentication.models import User
 from django.utils import timezone
 from documents.models import chemin_document  
+from documents.stockage import FichierDeduplique
 import os
 from datetime import timedelta
 from django.template.defaultfilters import floatformat
@@ -407,7 +408,12 @@ class NotificationEntreprise(models.Model):
         choices=[('info', 'Info'), ('alerte', 'Alerte'), ('urgent', 'Urgent')],
         default='info'
     )
-    fichier = models.FileField(upload_to=chemin_document, null=True, blank=True)
+    fichier = FichierDeduplique(
+        upload_to=chemin_document, null=True, blank=True,
+        taille_field='taille_fichier', empreinte_field='empreinte_fichier',
+    )
+    taille_fichier = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
+    empreinte_fichier = models.CharField(max_length=64, blank=True, editable=False)
     lu = models.BooleanField(default=False)
     date_envoi = models.DateTimeField(auto_now_add=True)
     action_requise = models.BooleanField(default=False)
@@ -453,7 +459,12 @@ class FactureLibre(models.Model):
         ('payee', 'Payée'),
     ], default='envoyee')
 
-    preuve_paiement = models.FileField(upload_to='documents/preuves_paiement/', null=True, blank=True)
+    preuve_paiement = FichierDeduplique(
+        upload_to='documents/preuves_paiement/', null=True, blank=True,
+        taille_field='taille_preuve', empreinte_field='empreinte_preuve',
+    )
+    taille_preuve = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
+    empreinte_preuve = models.CharField(max_length=64, blank=True, editable=False)
     commentaire_entreprise = models.TextField(blank=True)
 
     tva = models.DecimalField(
@@ -468,6 +479,11 @@ class FactureLibre(models.Model):
         verbose_name="Montant HT"
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-date_envoi', '-id'], name='facture_libre_keyset_idx'),
+        ]
+
     @property
     def montant_tva(self):
         return self.montant_ht * self.tva / 100
@@ -64,6 +64,8 @@ urlpatterns = [
     # Facture et notification - détails
     path('factures/listes', views.liste_toutes_factures, name='liste-toutes-factures'),
     path('factures/<int:facture_id>/', views.facture_detail, name='facture-detail'),
+    path('factures/<int:facture_id>/telecharger/', views.telecharger_facture, name='telecharger-facture'),
+    path('factures/<int:facture_id>/preuve/', views.telecharger_facture, {'piece': 'preuve'}, name='telecharger-preuve-paiement'),
     path('notifications/entreprise', views.liste_notifications, name='liste-notifications'),
 
     path('notification/entreprise/<int:notification_id>/', views.notification_detail, name='notification-detail'),
@@ -26,8 +26,12 @@ from entreprise.models import Entreprise
 from django.core.mail import send_mail
 from django.utils.crypto import get_random_string
 from django.core.paginator import Paginator
+from antares_rh.pagination import KeysetPaginator
+from antares_rh.telechargements import servir_fichier
+from jobs.publication import DUREE_PAGES_STATIQUES, page_publique_en_cache
 from django.contrib.auth import login, authenticate ,logout
 from django.http import HttpResponse, HttpResponseNotFound, Http404
+from django.core.exceptions import PermissionDenied
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.utils import timezone
 from django.db.models import Count, Q,Prefetch, Case, When, IntegerField, Value, Sum, ExpressionWrapper, F, FloatField
@@ -41,15 +45,18 @@ from .forms import ContrePropositionForm
 #-------------------------------------------------------------------------------------
 #                                       PUBLIC
 #_____________________________________________________________________________________
+@page_publique_en_cache(duree=DUREE_PAGES_STATIQUES)
 def entreprise_info(request):
     return render(request, 'entreprise/public/entreprise_info.html')
 
+@page_publique_en_cache(duree=DUREE_PAGES_STATIQUES)
 def savoir_plus(request):
     return render(request, 'entreprise/public/savoir_plus.html')
 
 def confirmation_inscription(request):
     return render(request, 'entreprise/public/confirmation_inscription.html')
 
+@page_publique_en_cache(duree=DUREE_PAGES_STATIQUES)
 def services(request):
     return render(request, 'entreprise/public/services.html')
 
@@ -1150,10 +1157,9 @@ def liste_toutes_factures(request):
     if statut in ['envoyee', 'reçue', 'payee']:
         factures = factures.filter(statut=statut)
 
-    # Pagination (10 factures par page)
-    paginator = Paginator(factures, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Pagination par curseur sur (date_envoi, id) - 10 factures par page
+    paginator = KeysetPaginator(factures, 10, ordering=('-date_envoi', '-pk'))
+    page_obj = paginator.get_page(request.GET)
 
     context = {
         'page_obj': page_obj,
@@ -1250,6 +1256,23 @@ def facture_detail(request, facture_id):
     return render(request, 'entreprise/backend/facture_detail.html', {'facture': facture})
 
 
+@login_required
+def telecharger_facture(request, facture_id, piece='facture'):
+    """Fichier de la facture ou preuve de paiement : équipe RH ou entreprise destinataire"""
+    facture = get_object_or_404(FactureLibre.objects.select_related('entreprise'), id=facture_id)
+
+    if not (request.user.is_superuser or is_rh_or_admin(request.user)
+            or facture.entreprise.user_id == request.user.id):
+        raise PermissionDenied
+
+    fichier = facture.preuve_paiement if piece == 'preuve' else facture.fichier_facture
+    if not fichier:
+        raise Http404("Aucun fichier pour cette facture.")
+
+    nom = f"preuve_paiement_{facture.id}" if piece == 'preuve' else f"facture_{facture.id}"
+    return servir_fichier(request, fichier, nom=nom, en_piece_jointe=not request.GET.get('apercu'))
+
+
 
 def notification_detail(request, notification_id):
     notification = get_object_or_404(NotificationEntreprise, id=notification_id)
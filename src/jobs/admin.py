@@ -1,6 +1,10 @@
 
 from django import forms
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect, render
+from django.urls import path
+from .import_offres import COLONNES_IMPORT, ErreurFichierImport, importer_offres, lire_fichier
 from .models import JobOffer
 
 class JobOfferForm(forms.ModelForm):
@@ -11,9 +15,60 @@ class JobOfferForm(forms.ModelForm):
             'secteur': forms.Select(choices=JobOffer.SectorChoices.choices),
         }
 
+class ImportOffresForm(forms.Form):
+    fichier = forms.FileField(help_text="CSV (séparateur , ou ;) ou JSON (liste d'objets), encodé en UTF-8")
+    simulation = forms.BooleanField(required=False, help_text="Valider sans rien enregistrer")
+
 @admin.register(JobOffer)
 class JobOfferAdmin(admin.ModelAdmin):
     form = JobOfferForm
     list_display = ['reference', 'titre', 'secteur', 'statut', 'date_publication']
     list_filter = ['secteur', 'statut', 'type_offre', 'date_publication']
-    search_fields = ['titre', 'reference', 'societe']
\ No newline at end of file
+    search_fields = ['titre', 'reference', 'societe']
+
+    change_list_template = 'admin/jobs/joboffer/change_list.html'
+
+    def get_urls(self):
+        urls = [
+            path(
+                'importer/', self.admin_site.admin_view(self.importer_offres),
+                name='jobs_joboffer_importer',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def importer_offres(self, request):
+        """Import CSV / JSON (jobs/import_offres.py), erreurs affichées par ligne"""
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+
+        form = ImportOffresForm(request.POST or None, request.FILES or None)
+        rapport = None
+        if request.method == 'POST' and form.is_valid():
+            fichier = form.cleaned_data['fichier']
+            try:
+                lignes = lire_fichier(fichier.read(), fichier.name)
+            except ErreurFichierImport as exc:
+                form.add_error('fichier', str(exc))
+            else:
+                rapport = importer_offres(
+                    lignes, auteur=request.user, simulation=form.cleaned_data['simulation']
+                )
+                if form.cleaned_data['simulation']:
+                    valides = len(lignes) - len(rapport['erreurs'])
+                    messages.info(request, f"Simulation : {valides} lignes valides sur {len(lignes)}.")
+                else:
+                    messages.success(request, f"{len(rapport['crees'])} offres importées.")
+                if rapport['erreurs']:
+                    messages.warning(request, f"{len(rapport['erreurs'])} lignes en erreur (détail ci-dessous).")
+                elif not form.cleaned_data['simulation']:
+                    return redirect('admin:jobs_joboffer_changelist')
+
+        return render(request, 'admin/jobs/joboffer/importer.html', {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': "Importer des offres",
+            'form': form,
+            'rapport': rapport,
+            'colonnes': COLONNES_IMPORT,
+        })
@@ -0,0 +1,208 @@
+# jobs/images.py
+"""
+Images insérées dans les offres via Summernote (SummernoteAttachment).
+
+À l'upload, chaque image est déclinée en WebP et JPEG aux largeurs
+standard LARGEURS (sans agrandissement) ; les noms des dérivés sont
+enregistrés dans `SummernoteAttachment.derives`.
+
+À l'enregistrement d'une offre, le HTML nettoyé est réécrit
+(`images_responsives`) : chaque image connue devient un <picture>
+(source WebP + repli JPEG, srcset par largeur, loading="lazy"), les
+autres images reçoivent au moins loading="lazy".
+
+SummernoteAttachment sert à tous les éditeurs du site (offres, entreprise,
+candidats...). Une pièce jointe citée par une offre lui est rattachée
+(`SummernoteAttachment.offer`, `rattacher_pieces`) : seules ces pièces,
+qu'aucune offre ne cite plus, sont supprimées par
+`python manage.py purger_pieces_jointes --supprimer`. Les dérivés des
+images déjà en ligne se génèrent avec `python manage.py generer_derives_images`.
+"""
+import io
+import logging
+import os
+import re
+from urllib.parse import unquote, urlparse
+
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+LARGEURS = (480, 960, 1440)
+QUALITE_WEBP = 80
+QUALITE_JPEG = 82
+# Au-delà, pas de dérivés : décodage et encodages trop lourds pour la requête d'upload
+PIXELS_MAX = min(Image.MAX_IMAGE_PIXELS or 40_000_000, 40_000_000)
+# Colonne de contenu des pages offres : au plus ~800 px affichés
+TAILLES = '(max-width: 860px) 100vw, 800px'
+
+
+def _encoder(image, format_image, qualite):
+    tampon = io.BytesIO()
+    if format_image == 'JPEG':
+        if image.mode in ('RGBA', 'LA', 'P'):
+            # Transparence aplatie sur fond blanc
+            fond = Image.new('RGB', image.size, 'white')
+            image = image.convert('RGBA')
+            fond.paste(image, mask=image.getchannel('A'))
+            image = fond
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+        image.save(tampon, 'JPEG', quality=qualite, optimize=True, progressive=True)
+    else:
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands() or image.mode == 'P' else 'RGB')
+        image.save(tampon, 'WEBP', quality=qualite, method=6)
+    return ContentFile(tampon.getvalue())
+
+
+def generer_derives(piece):
+    """
+    Crée les dérivés WebP / JPEG d'une pièce jointe image et enregistre
+    largeur, hauteur et `derives` ([[largeur, webp, jpeg], ...]).
+    Retourne False si le fichier n'est pas une image exploitable.
+    """
+    from .models import SummernoteAttachment
+
+    stockage = piece.file.storage
+    try:
+        with piece.file.open('rb') as fichier:
+            image = Image.open(fichier)
+            if getattr(image, 'is_animated', False):
+                # GIF animés : les dérivés perdraient l'animation
+                return False
+            # Taille lue dans l'en-tête : une image très compressée peut peser
+            # quelques Mo et demander des centaines de millions de pixels
+            if image.width * image.height > PIXELS_MAX:
+                logger.warning('Pièce jointe %s trop grande (%sx%s) : pas de dérivés', piece.pk, *image.size)
+                return False
+            image = ImageOps.exif_transpose(image)
+            image.load()
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as exc:
+        logger.warning('Pièce jointe %s illisible comme image : %s', piece.pk, exc)
+        return False
+
+    largeur, hauteur = image.size
+    largeurs = sorted({l for l in LARGEURS if l < largeur} | {min(largeur, LARGEURS[-1])})
+    base = os.path.splitext(piece.file.name)[0]
+
+    supprimer_derives(piece)
+    derives = []
+    for cible in largeurs:
+        reduite = image if cible == largeur else image.resize(
+            (cible, max(round(hauteur * cible / largeur), 1)), Image.LANCZOS
+        )
+        derives.append([
+            cible,
+            stockage.save(f'{base}-{cible}w.webp', _encoder(reduite, 'WEBP', QUALITE_WEBP)),
+            stockage.save(f'{base}-{cible}w.jpg', _encoder(reduite, 'JPEG', QUALITE_JPEG)),
+        ])
+
+    piece.largeur, piece.hauteur, piece.derives = largeur, hauteur, derives
+    SummernoteAttachment.objects.filter(pk=piece.pk).update(
+        largeur=largeur, hauteur=hauteur, derives=derives
+    )
+    return True
+
+
+def supprimer_derives(piece):
+    """Supprime les fichiers dérivés d'une pièce jointe"""
+    stockage = piece.file.storage
+    for _, webp, jpeg in piece.derives or []:
+        for nom in (webp, jpeg):
+            if nom and stockage.exists(nom):
+                stockage.delete(nom)
+
+
+# ====================================================
+# RÉÉCRITURE DU HTML DES OFFRES
+# ====================================================
+def nom_depuis_src(src):
+    """Nom de fichier du stockage pour une URL d'image de MEDIA_URL, sinon None"""
+    chemin = unquote(urlparse(src or '').path)
+    prefixe = urlparse(settings.MEDIA_URL).path
+    if prefixe and chemin.startswith(prefixe):
+        return chemin[len(prefixe):]
+    return None
+
+
+_SRC_RE = re.compile(r'''src\s*=\s*["']([^"']+)["']''', re.IGNORECASE)
+
+
+def fichiers_cites(*fragments):
+    """Noms de stockage des images de MEDIA_URL citées par des fragments HTML"""
+    return {
+        nom_depuis_src(src) for html in fragments for src in _SRC_RE.findall(html or '')
+    } - {None}
+
+
+def rattacher_pieces(offres):
+    """Rattache à chaque offre les pièces jointes encore libres que cite son HTML saisi"""
+    from .models import CHAMPS_HTML, SummernoteAttachment
+
+    for offre in offres:
+        noms = fichiers_cites(*(getattr(offre, champ) for champ in CHAMPS_HTML))
+        if noms:
+            SummernoteAttachment.objects.filter(file__in=noms, offer__isnull=True).update(offer=offre)
+
+
+def _picture(soupe, img, piece):
+    stockage = piece.file.storage
+    derives = sorted(piece.derives, key=lambda d: d[0])
+    plus_grand = derives[-1]
+
+    img['src'] = stockage.url(plus_grand[2])
+    img['srcset'] = ', '.join(f'{stockage.url(jpeg)} {l}w' for l, _, jpeg in derives)
+    img['sizes'] = TAILLES
+    img['loading'] = 'lazy'
+    img['decoding'] = 'async'
+    # Dimensions intrinsèques : réserve la place, pas de saut de mise en page
+    img['width'] = plus_grand[0]
+    img['height'] = max(round(piece.hauteur * plus_grand[0] / piece.largeur), 1)
+
+    picture = soupe.new_tag('picture')
+    source = soupe.new_tag(
+        'source', type='image/webp', sizes=TAILLES,
+        srcset=', '.join(f'{stockage.url(webp)} {l}w' for l, webp, _ in derives),
+    )
+    img.wrap(picture)
+    img.insert_before(source)
+
+
+def images_responsives(contenus):
+    """
+    Réécrit les <img> de plusieurs fragments HTML nettoyés ({clé: html}).
+    Une seule requête pour toutes les pièces jointes citées.
+    """
+    from .models import SummernoteAttachment
+
+    soupes = {
+        cle: BeautifulSoup(html, 'html.parser')
+        for cle, html in contenus.items() if html and '<img' in html
+    }
+    if not soupes:
+        return contenus
+
+    images = [img for soupe in soupes.values() for img in soupe.find_all('img')]
+    noms = {nom_depuis_src(img.get('src')) for img in images} - {None}
+    pieces = {
+        piece.file.name: piece
+        for piece in SummernoteAttachment.objects.filter(file__in=noms).exclude(derives=[])
+    }
+
+    for cle, soupe in soupes.items():
+        for img in soupe.find_all('img'):
+            if not img.get('src'):
+                # src retiré par le nettoyage (data:, javascript:...)
+                img.decompose()
+                continue
+            piece = pieces.get(nom_depuis_src(img.get('src')))
+            if piece and piece.largeur and img.parent.name != 'picture':
+                _picture(soupe, img, piece)
+            else:
+                img['loading'] = 'lazy'
+
+    return {**contenus, **{cle: str(soupe) for cle, soupe in soupes.items()}}
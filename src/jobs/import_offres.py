@@ -0,0 +1,246 @@
+# jobs/import_offres.py
+"""
+Import en masse d'offres d'emploi (CSV ou JSON), depuis la commande
+`python manage.py importer_offres` ou l'admin (JobOfferAdmin).
+
+Déroulement, par lots de TAILLE_LOT lignes :
+    - validation de chaque ligne par ImportOffreForm (sans requête : l'unicité
+      des références est vérifiée pour tout le lot en une requête) ;
+    - nettoyage HTML, aperçus et salaire (`contenus_calcules`) répartis sur
+      un pool de processus, le nettoyage bleach étant coûteux en CPU ;
+    - réécriture des images connues en une requête pour le lot ;
+    - statut calculé comme JobOffer.save, références générées si absentes,
+      puis insertion par bulk_create.
+bulk_create ne déclenchant pas les signaux de JobOffer, l'index plein texte,
+les offres similaires et le cache des pages publiques sont mis à jour une
+fois pour tout l'import.
+"""
+import csv
+import io
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from django import forms
+from django.db import transaction
+from django.db.models import Max
+
+from .models import CHAMPS_HTML, JobOffer, contenus_calcules
+
+TAILLE_LOT = 500
+# En dessous, le démarrage des processus coûte plus que le nettoyage
+LIGNES_MIN_POOL = 200
+PREFIXE_REFERENCE = 'ANT/IMP/'
+
+COLONNES_IMPORT = [
+    'reference', 'titre', 'type_offre', 'societe', 'nombre_candidat',
+    'mission_principale', 'taches', 'profil_recherche', 'competences_qualifications',
+    'conditions', 'comment_postuler', 'lieu', 'contact', 'salaire', 'niveau_etude',
+    'experience_requise', 'secteur', 'date_publication', 'date_limite', 'visible_sur_site',
+]
+
+
+class ErreurFichierImport(Exception):
+    """Fichier illisible : format inconnu, CSV ou JSON invalide"""
+
+
+class ImportOffreForm(forms.ModelForm):
+    """Validation d'une ligne importée (mêmes règles que le modèle)"""
+
+    class Meta:
+        model = JobOffer
+        fields = COLONNES_IMPORT
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Générée à l'import si absente ; valeurs par défaut du modèle si colonne vide
+        self.fields['reference'].required = False
+        for nom in ('type_offre', 'societe', 'secteur', 'date_publication'):
+            self.fields[nom].required = False
+
+    def clean(self):
+        cleaned_data = super().clean()
+        for nom in ('type_offre', 'societe', 'secteur', 'date_publication'):
+            if not cleaned_data.get(nom):
+                cleaned_data[nom] = JobOffer._meta.get_field(nom).get_default()
+        return cleaned_data
+
+    def validate_unique(self):
+        # Vérifiée pour tout le lot en une requête (importer_offres)
+        pass
+
+
+# ====================================================
+# LECTURE DU FICHIER
+# ====================================================
+def lire_fichier(contenu, nom_fichier):
+    """Lignes (dicts) d'un fichier CSV (séparateur , ou ;) ou JSON (liste d'objets)"""
+    if isinstance(contenu, bytes):
+        try:
+            contenu = contenu.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            # Exports Excel « CSV (séparateur : point-virgule) » : Windows-1252
+            try:
+                contenu = contenu.decode('cp1252')
+            except UnicodeDecodeError:
+                raise ErreurFichierImport('Encodage non reconnu : enregistrer le fichier en UTF-8')
+    extension = os.path.splitext(nom_fichier)[1].lower()
+
+    if extension == '.json':
+        try:
+            lignes = json.loads(contenu)
+        except ValueError as exc:
+            raise ErreurFichierImport(f'JSON invalide : {exc}')
+        if isinstance(lignes, dict):
+            lignes = lignes.get('offres', [])
+        if not isinstance(lignes, list) or not all(isinstance(l, dict) for l in lignes):
+            raise ErreurFichierImport('Le JSON doit être une liste d\'offres (objets)')
+        return lignes
+
+    if extension == '.csv':
+        # Séparateur lu sur l'en-tête seul : le HTML des cellules fausserait la détection
+        entete = contenu.split('\n', 1)[0]
+        separateur = ';' if entete.count(';') > entete.count(',') else ','
+        try:
+            return list(csv.DictReader(io.StringIO(contenu), delimiter=separateur))
+        except csv.Error as exc:
+            raise ErreurFichierImport(f'CSV invalide : {exc}')
+
+    raise ErreurFichierImport(f'Format non pris en charge : {extension or nom_fichier} (CSV ou JSON)')
+
+
+def _donnees_formulaire(ligne):
+    donnees = {}
+    for nom in COLONNES_IMPORT:
+        valeur = ligne.get(nom)
+        if valeur is None:
+            continue
+        if nom == 'visible_sur_site' and isinstance(valeur, str):
+            # Tableurs : oui/non, 1/0, vrai/faux
+            valeur = valeur.strip().lower() in ('1', 'true', 'vrai', 'oui', 'yes', 'x')
+        donnees[nom] = valeur.strip() if isinstance(valeur, str) else valeur
+    return donnees
+
+
+def _erreurs(form):
+    return '; '.join(
+        f"{nom if nom != '__all__' else 'ligne'} : {' '.join(messages)}"
+        for nom, messages in form.errors.items()
+    )
+
+
+# ====================================================
+# IMPORT
+# ====================================================
+def _prochains_numeros():
+    """Générateur de références PREFIXE_REFERENCE + numéro, après la plus haute existante"""
+    derniere = JobOffer.objects.filter(
+        reference__regex=rf'^{re.escape(PREFIXE_REFERENCE)}[0-9]+$'
+    ).aggregate(m=Max('reference'))['m']
+    numero = int(derniere[len(PREFIXE_REFERENCE):]) if derniere else 0
+    while True:
+        numero += 1
+        yield f'{PREFIXE_REFERENCE}{numero:08d}'
+
+
+def _calculer_contenus(valeurs, executeur):
+    if executeur is None:
+        return [contenus_calcules(v) for v in valeurs]
+    return list(executeur.map(contenus_calcules, valeurs, chunksize=50))
+
+
+def _valider_lot(lot, references_fichier):
+    """(numéro, offre non enregistrée) des lignes valides, (numéro, message) des autres"""
+    valides, erreurs = [], []
+    for numero, ligne in lot:
+        form = ImportOffreForm(data=_donnees_formulaire(ligne))
+        if not form.is_valid():
+            erreurs.append((numero, _erreurs(form)))
+            continue
+        reference = form.cleaned_data.get('reference')
+        if reference:
+            if reference in references_fichier:
+                erreurs.append((numero, f'reference : « {reference} » déjà présente dans le fichier'))
+                continue
+            references_fichier.add(reference)
+        valides.append((numero, form.instance))
+
+    # Unicité des références fournies : une requête pour le lot
+    existantes = set(JobOffer.objects.filter(
+        reference__in=[o.reference for _, o in valides if o.reference]
+    ).values_list('reference', flat=True))
+    if existantes:
+        erreurs += [
+            (numero, f'reference : « {offre.reference} » existe déjà')
+            for numero, offre in valides if offre.reference in existantes
+        ]
+        valides = [(numero, offre) for numero, offre in valides if offre.reference not in existantes]
+    return valides, erreurs
+
+
+def importer_offres(lignes, auteur=None, taille_lot=TAILLE_LOT, processus=None, simulation=False):
+    """
+    Importe des lignes (dicts) ; retourne {'crees': [...ids], 'erreurs': [(ligne, message)]}.
+    Les numéros de ligne commencent à 1 (ligne 2 du CSV, après l'en-tête).
+    `simulation` : validation seule, rien n'est écrit.
+    """
+    from .images import images_responsives, rattacher_pieces
+    from .publication import invalider_pages_publiques
+    from .search import mettre_a_jour_documents
+    from .similarite import actualiser_voisins
+
+    numerotees = list(enumerate(lignes, start=1))
+    crees, erreurs = [], []
+    references_fichier = set()
+    numeros = None
+
+    executeur = None
+    # Plus de processus que de cœurs n'accélère pas un travail CPU
+    processus = min(processus or os.cpu_count() or 1, os.cpu_count() or 1)
+    if not simulation and len(numerotees) >= LIGNES_MIN_POOL and processus > 1:
+        executeur = ProcessPoolExecutor(max_workers=processus)
+    try:
+        with transaction.atomic():
+            for debut in range(0, len(numerotees), taille_lot):
+                valides, erreurs_lot = _valider_lot(numerotees[debut:debut + taille_lot], references_fichier)
+                erreurs += erreurs_lot
+                if simulation or not valides:
+                    continue
+
+                offres = [offre for _, offre in valides]
+                contenus = _calculer_contenus(
+                    [{champ: getattr(o, champ) for champ in CHAMPS_HTML + ('salaire',)} for o in offres],
+                    executeur,
+                )
+                # Images du lot réécrites en une requête
+                html = {
+                    (i, colonne): valeur
+                    for i, colonnes in enumerate(contenus)
+                    for colonne, valeur in colonnes.items() if colonne.endswith('_html')
+                }
+                for (i, colonne), valeur in images_responsives(html).items():
+                    contenus[i][colonne] = valeur
+
+                for offre, colonnes in zip(offres, contenus):
+                    for colonne, valeur in colonnes.items():
+                        setattr(offre, colonne, valeur)
+                    offre.auteur = auteur
+                    offre.calculer_statut()
+                    if not offre.reference:
+                        numeros = numeros or _prochains_numeros()
+                        offre.reference = next(numeros)
+
+                crees += [o.pk for o in JobOffer.objects.bulk_create(offres, batch_size=taille_lot)]
+                rattacher_pieces(offres)
+
+            if crees:
+                mettre_a_jour_documents(JobOffer.objects.filter(pk__in=crees))
+                transaction.on_commit(lambda: actualiser_voisins(crees))
+                transaction.on_commit(invalider_pages_publiques)
+    finally:
+        if executeur is not None:
+            executeur.shutdown()
+
+    erreurs.sort()
+    return {'crees': crees, 'erreurs': erreurs}
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from jobs.images import generer_derives
+from jobs.models import SummernoteAttachment
+
+
+class Command(BaseCommand):
+    help = (
+        'Génère les dérivés WebP / JPEG des images déjà téléversées dans les offres '
+        '(lancer ensuite rebuild_job_contenus pour réécrire le HTML)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tout', action='store_true',
+            help='Régénérer aussi les images qui ont déjà des dérivés'
+        )
+
+    def handle(self, *args, **options):
+        pieces = SummernoteAttachment.objects.order_by('pk')
+        if not options['tout']:
+            pieces = pieces.filter(derives=[])
+
+        traitees = ignorees = 0
+        for piece in pieces.iterator(chunk_size=100):
+            if generer_derives(piece):
+                traitees += 1
+            else:
+                ignorees += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f'{traitees} images déclinées, {ignorees} fichiers ignorés')
+        )
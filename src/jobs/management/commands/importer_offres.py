@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from jobs.import_offres import TAILLE_LOT, ErreurFichierImport, importer_offres, lire_fichier
+
+
+class Command(BaseCommand):
+    help = 'Importe des offres d\'emploi depuis un fichier CSV ou JSON (validation par lots, bulk_create)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('fichier', help='Chemin du fichier .csv ou .json')
+        parser.add_argument('--auteur', help='Email de l\'utilisateur auteur des offres')
+        parser.add_argument('--batch', type=int, default=TAILLE_LOT, help='Taille des lots de lignes')
+        parser.add_argument(
+            '--processus', type=int, default=None,
+            help='Processus de nettoyage HTML (défaut : nombre de CPU, 1 pour désactiver le pool)'
+        )
+        parser.add_argument('--simulation', action='store_true', help='Valider sans rien enregistrer')
+
+    def handle(self, *args, **options):
+        auteur = None
+        if options['auteur']:
+            auteur = get_user_model().objects.filter(email=options['auteur']).first()
+            if auteur is None:
+                raise CommandError(f"Aucun utilisateur avec l'email {options['auteur']}")
+
+        try:
+            with open(options['fichier'], 'rb') as fichier:
+                lignes = lire_fichier(fichier.read(), options['fichier'])
+        except OSError as exc:
+            raise CommandError(f'Lecture impossible : {exc}')
+        except ErreurFichierImport as exc:
+            raise CommandError(str(exc))
+
+        rapport = importer_offres(
+            lignes, auteur=auteur, taille_lot=options['batch'],
+            processus=options['processus'], simulation=options['simulation'],
+        )
+
+        for numero, message in rapport['erreurs']:
+            self.stderr.write(f'Ligne {numero} : {message}')
+        if options['simulation']:
+            resume = f"{len(lignes) - len(rapport['erreurs'])} lignes valides sur {len(lignes)} (simulation)"
+        else:
+            resume = f"{len(rapport['crees'])} offres importées, {len(rapport['erreurs'])} lignes en erreur"
+        self.stdout.write(self.style.SUCCESS(resume))
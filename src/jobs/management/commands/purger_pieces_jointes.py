@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jobs.images import fichiers_cites, rattacher_pieces
+from jobs.models import CHAMPS_HTML, JobOffer, SummernoteAttachment
+
+
+class Command(BaseCommand):
+    help = (
+        'Liste (ou supprime avec --supprimer) les pièces jointes Summernote rattachées à une offre '
+        'qu\'aucune offre ne cite plus. Les pièces des autres éditeurs (entreprise, candidats...) '
+        'ne sont jamais concernées.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--age-min', type=int, default=24,
+            help='Âge minimal en heures (une offre en cours de rédaction n\'est pas encore enregistrée)'
+        )
+        parser.add_argument(
+            '--supprimer', action='store_true',
+            help='Supprimer les pièces listées (par défaut : liste seulement)'
+        )
+
+    def handle(self, *args, **options):
+        offres = JobOffer.objects.only('pk', *CHAMPS_HTML).order_by('pk')
+
+        # Fichiers cités par le HTML saisi de toutes les offres, brouillons compris ;
+        # les pièces citées encore libres (antérieures au rattachement) sont rattachées
+        references = set()
+        lot = []
+        for offre in offres.iterator(chunk_size=200):
+            references |= fichiers_cites(*(getattr(offre, champ) for champ in CHAMPS_HTML))
+            lot.append(offre)
+            if len(lot) >= 200:
+                rattacher_pieces(lot)
+                lot = []
+        rattacher_pieces(lot)
+
+        limite = timezone.now() - timedelta(hours=options['age_min'])
+        orphelines = [
+            piece for piece in SummernoteAttachment.objects.filter(
+                uploaded__lt=limite, offer__isnull=False,
+            ).only('pk', 'file', 'derives')
+            if piece.file.name not in references
+        ]
+
+        if options['supprimer']:
+            # Un delete() par pièce : le signal post_delete supprime fichiers et dérivés
+            for piece in orphelines:
+                piece.delete()
+        else:
+            for piece in orphelines:
+                self.stdout.write(piece.file.name)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(orphelines)} pièces jointes orphelines {'supprimées' if options['supprimer'] else 'trouvées'}"
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from jobs.models import JobOffer, CHAMPS_HTML, APERCUS
+from jobs.publication import invalider_pages_publiques
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcule le HTML nettoyé, les aperçus et la fourchette de salaire '
+        'de toutes les offres (reprise des offres existantes)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=200, help='Taille des lots d\'offres')
+
+    def handle(self, *args, **options):
+        colonnes = [f'{champ}_html' for champ in CHAMPS_HTML] + list(APERCUS) + ['salaire_min', 'salaire_max']
+        lot, total = [], 0
+        offres = JobOffer.objects.only('pk', 'salaire', *CHAMPS_HTML).order_by('pk')
+        for offre in offres.iterator(chunk_size=options['batch']):
+            offre.calculer_contenus()
+            lot.append(offre)
+            if len(lot) >= options['batch']:
+                total += JobOffer.objects.bulk_update(lot, colonnes)
+                lot = []
+        if lot:
+            total += JobOffer.objects.bulk_update(lot, colonnes)
+
+        # bulk_update ne déclenche pas les signaux de JobOffer
+        invalider_pages_publiques()
+        self.stdout.write(
+            self.style.SUCCESS(f'{total} offres recalculées')
+        )
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from jobs.models import JobOffer
+from jobs.search import mettre_a_jour_documents
+
+
+class Command(BaseCommand):
+    help = 'Reconstruit le document de recherche plein texte de toutes les offres'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=500, help='Taille des lots d\'offres')
+
+    def handle(self, *args, **options):
+        # Une requête UPDATE par tranche de clés : pas de chargement des offres
+        ids = list(JobOffer.objects.order_by('pk').values_list('pk', flat=True))
+        total = 0
+        for debut in range(0, len(ids), options['batch']):
+            tranche = ids[debut:debut + options['batch']]
+            total += mettre_a_jour_documents(
+                JobOffer.objects.filter(pk__gte=tranche[0], pk__lte=tranche[-1])
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(f'{total} offres réindexées')
+        )
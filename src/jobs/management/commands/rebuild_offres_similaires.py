@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from jobs.publication import invalider_pages_publiques
+from jobs.similarite import reconstruire_voisins
+
+
+class Command(BaseCommand):
+    help = 'Recalcule les offres similaires (TF-IDF) de toutes les offres publiées'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=500, help='Taille des lots d\'offres')
+
+    def handle(self, *args, **options):
+        offres, lignes = reconstruire_voisins(options['batch'])
+
+        invalider_pages_publiques()
+        self.stdout.write(
+            self.style.SUCCESS(f'{offres} offres traitées, {lignes} voisines enregistrées')
+        )
@@ -1,9 +1,13 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from jobs.models import JobOffer, JobStatus
+from jobs.publication import invalider_pages_publiques
 
 class Command(BaseCommand):
-    help = 'Met à jour le statut des offres expirées'
+    help = (
+        'Met à jour le statut des offres expirées. À planifier (cron quotidien) : '
+        'les pages publiques ne font plus cette écriture, elles filtrent sur la date limite.'
+    )
 
     def handle(self, *args, **options):
         # Mettre à jour les offres ouvertes dont la date limite est dépassée
@@ -11,7 +15,11 @@ class Command(BaseCommand):
             statut=JobStatus.OUVERT,
             date_limite__lt=timezone.now().date()
         ).update(statut=JobStatus.EXPIRE)
+
+        # update() ne déclenche pas les signaux de JobOffer
+        if expired_count:
+            invalider_pages_publiques()
         
         self.stdout.write(
             self.style.SUCCESS(f'{expired_count} offres marquées comme expirées')
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_alter_joboffer_secteur_alter_joboffer_societe'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='joboffer',
+            index=models.Index(fields=['-date_publication', '-id'], name='joboffer_keyset_idx'),
+        ),
+    ]
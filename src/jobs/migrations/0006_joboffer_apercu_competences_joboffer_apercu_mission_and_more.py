@@ -0,0 +1,58 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_joboffer_joboffer_keyset_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='joboffer',
+            name='apercu_competences',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='joboffer',
+            name='apercu_mission',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='joboffer',
+            name='apercu_profil',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='joboffer',
+            name='comment_postuler_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='joboffer',
+            name='competences_qualifications_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='joboffer',
+            name='conditions_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='joboffer',
+            name='mission_principale_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='joboffer',
+            name='profil_recherche_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='joboffer',
+            name='taches_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
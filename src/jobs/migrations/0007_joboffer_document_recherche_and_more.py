@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:07
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_joboffer_apercu_competences_joboffer_apercu_mission_and_more'),
+        # Configuration plein texte french_unaccent
+        ('candidats', '0016_profilcandidat_document_recherche'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='joboffer',
+            name='document_recherche',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='joboffer',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['document_recherche'], name='joboffer_fts_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='joboffer',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['titre'], name='joboffer_titre_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='joboffer',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['societe'], name='joboffer_societe_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
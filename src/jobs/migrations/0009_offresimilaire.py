@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_joboffer_salaire_max_joboffer_salaire_min_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OffreSimilaire',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rang', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('offre', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similaires', to='jobs.joboffer')),
+                ('voisine', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jobs.joboffer')),
+            ],
+            options={
+                'verbose_name': 'Offre similaire',
+                'verbose_name_plural': 'Offres similaires',
+                'ordering': ['offre', 'rang'],
+                'constraints': [models.UniqueConstraint(fields=('offre', 'rang'), name='offre_similaire_rang_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_offresimilaire'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summernoteattachment',
+            name='derives',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='summernoteattachment',
+            name='hauteur',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='summernoteattachment',
+            name='largeur',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_summernoteattachment_derives_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='summernoteattachment',
+            name='offer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attachments', to='jobs.joboffer'),
+        ),
+    ]
@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils import timezone
 from django.core.exceptions import ValidationError
@@ -7,8 +9,12 @@ import bleach
 from django_summernote.models import AbstractAttachment
 from django.utils.html import strip_tags
 from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
+from html import unescape
 from bs4 import BeautifulSoup
 import bleach
+import re
+import unicodedata
 
 from django.db import models
 from django.utils import timezone
@@ -18,6 +24,130 @@ from django.utils.safestring import mark_safe
 import bleach
 from django_summernote.models import AbstractAttachment
 
+# Contenus HTML saisis avec Summernote : une version nettoyée est stockée
+# à l'enregistrement dans <champ>_html, les gabarits n'affichent que celle-ci
+CHAMPS_HTML = (
+    'mission_principale', 'taches', 'profil_recherche',
+    'competences_qualifications', 'conditions', 'comment_postuler',
+)
+BALISES_AUTORISEES = [
+    'a', 'p', 'br', 'strong', 'em', 'b', 'i', 'u', 'ul', 'ol', 'li', 'div', 'span',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'img', 'picture', 'source',
+]
+ATTRIBUTS_AUTORISES = {
+    'a': ['href', 'title', 'target', 'rel'],
+    # Images : réécrites en version responsive par jobs/images.py
+    'img': ['src', 'alt', 'title', 'width', 'height', 'srcset', 'sizes', 'loading', 'decoding'],
+    'source': ['srcset', 'sizes', 'type'],
+    '*': ['style'],
+}
+
+# colonne d'aperçu -> (champ source, nombre de mots, aperçu HTML ou texte brut)
+APERCUS = {
+    'apercu_mission': ('mission_principale', 30, False),
+    'apercu_profil': ('profil_recherche', 35, True),
+    'apercu_competences': ('competences_qualifications', 20, True),
+}
+
+
+def nettoyer_html(html_content):
+    """HTML Summernote réduit aux balises et attributs autorisés"""
+    if not html_content:
+        return ''
+    return bleach.clean(
+        html_content,
+        tags=BALISES_AUTORISEES,
+        attributes=ATTRIBUTS_AUTORISES,
+        strip=True
+    )
+
+
+def apercu(html_nettoye, nombre_mots, garder_html):
+    """Aperçu tronqué au mot : HTML (balises refermées) ou texte brut"""
+    if not html_nettoye:
+        return ''
+    if garder_html:
+        # Pas d'images dans les aperçus des listes
+        sans_images = bleach.clean(
+            html_nettoye,
+            tags=[b for b in BALISES_AUTORISEES if b not in ('img', 'picture', 'source')],
+            attributes=ATTRIBUTS_AUTORISES,
+            strip=True
+        )
+        return Truncator(sans_images).words(nombre_mots, html=True, truncate='...')
+    texte = unescape(strip_tags(html_nettoye))
+    return Truncator(' '.join(texte.split())).words(nombre_mots, truncate='...')
+
+
+# Montants cités dans le champ libre `salaire` : "150 000 - 250 000 FCFA",
+# "1,5 million par an", "300K/mois"...
+# Séparateurs de milliers seulement entre groupes de trois chiffres : "250000 13 mois"
+# donne deux nombres, pas un seul
+_MONTANT_RE = re.compile(
+    r'(\d{1,3}(?:[ .,]\d{3})+(?!\d)|\d+(?:[.,]\d+)?)\s*(millions?|mille|k|m)?\b'
+)
+_MULTIPLICATEURS = {'k': 1_000, 'mille': 1_000, 'm': 1_000_000, 'million': 1_000_000, 'millions': 1_000_000}
+# Périodicité lue à côté du montant : "par an", "/an", "annuel" ; "par mois",
+# "/mois", "mensuel" l'emporte ("2 ans d'expérience", "13e mois" ne comptent pas)
+_ANNUEL_RE = re.compile(r'(?:\bpar|/)\s*(?:an|annee)\b|\bannuel')
+_MENSUEL_RE = re.compile(r'(?:\bpar|/)\s*mois\b|\bmensuel')
+# Une année ("grille 2024") n'est un montant que suivie d'une devise
+_ANNEE_RE = re.compile(r'(?:19|20)\d\d')
+# Au-delà (FCFA annuels), le nombre n'est pas un salaire : téléphone, référence...
+SALAIRE_ANNUEL_MAX = 250_000_000
+_DEVISE_RE = re.compile(r'\s*(?:f\b|fcfa|cfa|xof|€|eur|\$)')
+
+
+def interpreter_salaire(texte):
+    """
+    Fourchette (min, max) en FCFA annuels lue dans le texte libre du salaire,
+    (None, None) si aucun montant. Sans mention annuelle, les montants sont
+    considérés comme mensuels. Les nombres < 1000 (ex. "13e mois"), les
+    années sans devise et les montants annuels > SALAIRE_ANNUEL_MAX sont ignorés.
+    """
+    texte = unicodedata.normalize('NFKD', texte or '')
+    texte = ''.join(c for c in texte if not unicodedata.combining(c)).lower()
+
+    montants = []
+    for correspondance in _MONTANT_RE.finditer(texte):
+        nombre, unite = correspondance.groups()
+        if unite:
+            # "1,5 million" : virgule ou point décimal
+            try:
+                valeur = float(re.sub(r'\s', '', nombre).replace(',', '.')) * _MULTIPLICATEURS[unite]
+            except ValueError:
+                continue
+        else:
+            if _ANNEE_RE.fullmatch(nombre) and not _DEVISE_RE.match(texte, correspondance.end()):
+                continue
+            # "250.000" ou "250 000" : séparateurs de milliers
+            valeur = int(re.sub(r'\D', '', nombre))
+        if valeur >= 1000:
+            montants.append(int(valeur))
+    if not montants:
+        return None, None
+
+    annuel = _ANNUEL_RE.search(texte) and not _MENSUEL_RE.search(texte)
+    facteur = 1 if annuel else 12
+    montants = [m * facteur for m in montants if m * facteur <= SALAIRE_ANNUEL_MAX]
+    if not montants:
+        return None, None
+    return min(montants), max(montants)
+
+
+def contenus_calcules(valeurs):
+    """
+    Colonnes dérivées d'une offre, sans accès à la base : HTML nettoyé,
+    aperçus et fourchette de salaire, depuis {champ: texte saisi}.
+    Les images sont réécrites ensuite (jobs/images.py).
+    """
+    contenus = {f'{champ}_html': nettoyer_html(valeurs.get(champ)) for champ in CHAMPS_HTML}
+    for colonne, (champ, nombre_mots, garder_html) in APERCUS.items():
+        contenus[colonne] = apercu(contenus[f'{champ}_html'], nombre_mots, garder_html)
+    contenus['salaire_min'], contenus['salaire_max'] = interpreter_salaire(valeurs.get('salaire'))
+    return contenus
+
+
 class JobType(models.TextChoices):
     EMPLOI = "emploi", "Offre d'emploi"
     APPEL_OFFRE = "appel_offre", "Appel d'offres"
@@ -72,6 +202,9 @@ class JobOffer(models.Model):
     lieu = models.CharField(max_length=255, blank=True)
     contact = models.EmailField(blank=True)
     salaire = models.CharField(max_length=100, blank=True)
+    # Fourchette interprétée depuis `salaire` (FCFA annuels), calculée à l'enregistrement
+    salaire_min = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
+    salaire_max = models.PositiveBigIntegerField(null=True, blank=True, editable=False)
     niveau_etude = models.CharField(max_length=300, blank=True, verbose_name="Niveau d'étude requis")
     experience_requise = models.CharField(max_length=300,blank=True,verbose_name="Expérience requise",help_text="Ex: '3 ans minimum'")
     secteur =models.CharField(max_length=50,choices=SectorChoices.choices,default=SectorChoices.AUTRE)
@@ -90,10 +223,33 @@ class JobOffer(models.Model):
     date_creation = models.DateTimeField(auto_now_add=True)
     date_mise_a_jour = models.DateTimeField(auto_now=True)
 
+    # Contenus nettoyés et aperçus, calculés à l'enregistrement (calculer_contenus)
+    mission_principale_html = models.TextField(blank=True, editable=False)
+    taches_html = models.TextField(blank=True, editable=False)
+    profil_recherche_html = models.TextField(blank=True, editable=False)
+    competences_qualifications_html = models.TextField(blank=True, editable=False)
+    conditions_html = models.TextField(blank=True, editable=False)
+    comment_postuler_html = models.TextField(blank=True, editable=False)
+    apercu_mission = models.TextField(blank=True, editable=False)
+    apercu_profil = models.TextField(blank=True, editable=False)
+    apercu_competences = models.TextField(blank=True, editable=False)
+
+    # Recherche plein texte pondérée (voir jobs/search.py)
+    document_recherche = SearchVectorField(null=True, editable=False)
+
     class Meta:
         ordering = ["-date_publication"]
         verbose_name = "Offre d'emploi"
         verbose_name_plural = "Offres d'emploi"
+        indexes = [
+            models.Index(fields=['-date_publication', '-id'], name='joboffer_keyset_idx'),
+            models.Index(fields=['salaire_min'], name='joboffer_salaire_min_idx'),
+            models.Index(fields=['salaire_max'], name='joboffer_salaire_max_idx'),
+            GinIndex(fields=['document_recherche'], name='joboffer_fts_gin'),
+            # Repli tolérant aux fautes de frappe (pg_trgm)
+            GinIndex(fields=['titre'], name='joboffer_titre_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['societe'], name='joboffer_societe_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
     @property
     def est_expiree(self):
@@ -118,35 +274,44 @@ class JobOffer(models.Model):
         return f"{self.reference} - {self.titre}"
     
     def save(self, *args, **kwargs):
-        
-        # Auto-set status
+        from .images import rattacher_pieces
+
+        self.calculer_statut()
+        self.calculer_contenus()
+        super().save(*args, **kwargs)
+        rattacher_pieces([self])
+
+    def calculer_statut(self):
+        """Auto-set status : expirée si la date limite est passée, ouverte si visible"""
         today = timezone.now().date()
         if self.date_limite and self.date_limite < today:
             self.statut = JobStatus.EXPIRE
         elif self.visible_sur_site:
             self.statut = JobStatus.OUVERT
-        
-        super().save(*args, **kwargs)
+
+    def calculer_contenus(self):
+        """
+        Nettoie les champs HTML, calcule les aperçus et la fourchette
+        de salaire (une fois, à l'écriture)
+        """
+        from .images import images_responsives
+
+        contenus = contenus_calcules({champ: getattr(self, champ) for champ in CHAMPS_HTML + ('salaire',)})
+        contenus.update(images_responsives({
+            f'{champ}_html': contenus[f'{champ}_html'] for champ in CHAMPS_HTML
+        }))
+        for colonne, valeur in contenus.items():
+            setattr(self, colonne, valeur)
 
     def clean(self):
         if self.date_limite and self.date_publication and self.date_limite <= self.date_publication:
             raise ValidationError("La date limite doit être postérieure à la date de publication")
 
     def get_clean_html(self, field_name):
-        """Sanitize HTML content"""
-        html_content = getattr(self, field_name, '')
-        if not html_content:
-            return ''
-        
-        allowed_tags = ['a', 'p', 'br', 'strong', 'em', 'ul', 'ol', 'li', 'div', 'span', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr']
-        allowed_attributes = {'a': ['href', 'title', 'target', 'rel'], '*': ['style']}
-        
-        return mark_safe(bleach.clean(
-            html_content,
-            tags=allowed_tags,
-            attributes=allowed_attributes,
-            strip=True
-        ))
+        """Sanitize HTML content (colonne précalculée si disponible)"""
+        if field_name in CHAMPS_HTML:
+            return mark_safe(getattr(self, f'{field_name}_html'))
+        return mark_safe(nettoyer_html(getattr(self, field_name, '')))
     
     def get_plain_text_preview(self, field_name, max_length=150):
         """Extrait un aperçu texte pour les métadonnées"""
@@ -166,17 +331,41 @@ from django.db import models
 from django_summernote.models import AbstractAttachment
 
 class SummernoteAttachment(AbstractAttachment):
+    # Offre qui cite la pièce (jobs/images.py) ; les autres éditeurs n'y touchent pas.
+    # SET_NULL : une image reprise ailleurs ne disparaît pas avec l'offre
     offer = models.ForeignKey(
         JobOffer,
-        on_delete=models.CASCADE,
+        on_delete=models.SET_NULL,
         null=True,
         blank=True,
         related_name='attachments'
     )
+    # Image d'origine et dérivés WebP / JPEG [[largeur, webp, jpeg], ...] (jobs/images.py)
+    largeur = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    hauteur = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    derives = models.JSONField(default=list, blank=True, editable=False)
 
     class Meta:
         verbose_name = "Pièce jointe"
         verbose_name_plural = "Pièces jointes"
     
     def __str__(self):
-        return self.file.name
\ No newline at end of file
+        return self.file.name
+
+class OffreSimilaire(models.Model):
+    """Voisines précalculées d'une offre, par rang (voir jobs/similarite.py)"""
+    offre = models.ForeignKey(JobOffer, on_delete=models.CASCADE, related_name='similaires')
+    voisine = models.ForeignKey(JobOffer, on_delete=models.CASCADE, related_name='+')
+    rang = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['offre', 'rang']
+        verbose_name = "Offre similaire"
+        verbose_name_plural = "Offres similaires"
+        constraints = [
+            models.UniqueConstraint(fields=['offre', 'rang'], name='offre_similaire_rang_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.offre_id} -> {self.voisine_id} ({self.score:.2f})"
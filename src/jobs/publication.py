@@ -0,0 +1,186 @@
+# jobs/publication.py
+"""
+Offres publiées sur le site et cache des pages publiques.
+
+L'expiration n'est plus écrite pendant les requêtes : une offre ouverte
+dont la date limite est passée est considérée expirée dès la requête
+(`expiree_q`), et son statut est mis à jour par la tâche planifiée
+`python manage.py update_job_status` (cron quotidien, peu après minuit).
+
+Les pages publiques (liste, accueil, détail, pages de présentation) sont
+mises en cache pour les visiteurs anonymes, par combinaison de filtres et
+par langue ; les flux (RSS, Atom, JSON Feed) et le plan du site aussi, avec
+leurs validateurs HTTP (`flux_en_cache`). La clé contient la date du jour
+(bascule d'expiration à minuit) et un numéro de version incrémenté par les
+signaux save/delete de JobOffer. Les blocs d'offres des pages non mises en
+cache en entier (utilisateurs connectés, formulaires) sont des fragments
+`{% cache %}` discriminés par `version_offres()`.
+Le cache étant partagé (settings.CACHES), la version l'est aussi : une
+modification est visible de tous les processus à la requête suivante.
+"""
+import datetime
+import hashlib
+from functools import wraps
+
+from django.core.cache import cache
+from django.db.models import BooleanField, Case, Count, IntegerField, Max, Q, Value, When
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import get_language
+
+from .models import CHAMPS_HTML, JobOffer, JobStatus
+from .search import rechercher_offres
+
+CLE_VERSION = 'jobs:pages_publiques:version'
+DUREE_PAGES = 5 * 60
+# Pages de présentation : contenu des gabarits seulement
+DUREE_PAGES_STATIQUES = 60 * 60
+
+
+def expiree_q(aujourd_hui=None):
+    """Offre expirée : statut déjà mis à jour ou date limite dépassée"""
+    aujourd_hui = aujourd_hui or timezone.now().date()
+    return Q(statut=JobStatus.EXPIRE) | Q(statut=JobStatus.OUVERT, date_limite__lt=aujourd_hui)
+
+
+def offres_publiques(aujourd_hui=None):
+    """
+    Offres visibles sur le site (ouvertes ou expirées), annotées de
+    `est_expiree_db` et `status_priority` (1 ouvertes, 2 expirées).
+    Le HTML brut n'est pas chargé : les pages lisent les colonnes nettoyées ;
+    le document de recherche non plus (il ne sert qu'au filtrage en SQL).
+    """
+    expiree = expiree_q(aujourd_hui)
+    return JobOffer.objects.filter(
+        visible_sur_site=True,
+        statut__in=[JobStatus.OUVERT, JobStatus.EXPIRE],
+    ).defer(*CHAMPS_HTML, 'document_recherche').annotate(
+        est_expiree_db=Case(When(expiree, then=Value(True)), default=Value(False), output_field=BooleanField()),
+        status_priority=Case(When(expiree, then=Value(2)), default=Value(1), output_field=IntegerField()),
+    )
+
+
+# Paramètres GET des filtres de la liste publique (page et API)
+PARAMETRES_FILTRES = ('q', 'location', 'sector', 'contract_type', 'hide_expired')
+
+
+def filtrer_offres(offres, parametres):
+    """
+    Applique les filtres de la liste publique (`parametres` : request.GET).
+    Avec une recherche, le queryset est annoté de `pertinence`.
+    """
+    if parametres.get('hide_expired', 'false') == 'true':
+        offres = offres.filter(est_expiree_db=False)
+    if parametres.get('location'):
+        offres = offres.filter(lieu__icontains=parametres['location'])
+    if parametres.get('sector'):
+        offres = offres.filter(secteur=parametres['sector'])
+    if parametres.get('contract_type'):
+        offres = offres.filter(type_offre=parametres['contract_type'])
+    # Recherche plein texte après les autres filtres : le repli trigrammes en dépend
+    if parametres.get('q'):
+        offres = rechercher_offres(offres, parametres['q'])
+    return offres
+
+
+# ====================================================
+# CACHE DES PAGES PUBLIQUES
+# ====================================================
+def invalider_pages_publiques():
+    """Rend obsolètes toutes les pages publiques en cache (nouvelle version de clé)"""
+    try:
+        cache.incr(CLE_VERSION)
+    except ValueError:
+        cache.set(CLE_VERSION, 1, None)
+
+
+def version_offres():
+    """Discriminant des fragments de gabarits qui affichent des offres"""
+    return f"{cache.get(CLE_VERSION, 0)}-{timezone.now().date().isoformat()}"
+
+
+def _cle_page(nom_vue, arguments, parametres):
+    version = cache.get(CLE_VERSION, 0)
+    brut = repr((nom_vue, arguments, parametres, get_language(), timezone.now().date().isoformat()))
+    return f'jobs:pages_publiques:{version}:{hashlib.md5(brut.encode()).hexdigest()}'
+
+
+def page_publique_en_cache(*parametres, duree=DUREE_PAGES):
+    """
+    Met en cache la page rendue pour les visiteurs anonymes. Seuls les
+    paramètres GET listés entrent dans la clé (les autres, ex. utm_*, sont
+    ignorés et ne fragmentent pas le cache). `duree` en secondes.
+    """
+    def decorateur(vue):
+        @wraps(vue)
+        def enveloppe(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return vue(request, *args, **kwargs)
+
+            valeurs = tuple(request.GET.get(nom, '') for nom in parametres)
+            cle = _cle_page(vue.__name__, (args, sorted(kwargs.items())), valeurs)
+            contenu = cache.get(cle)
+            if contenu is not None:
+                reponse = HttpResponse(contenu)
+            else:
+                reponse = vue(request, *args, **kwargs)
+                if reponse.status_code == 200 and not reponse.streaming:
+                    cache.set(cle, reponse.content, duree)
+            # La même URL est personnalisée pour les utilisateurs connectés
+            patch_vary_headers(reponse, ('Cookie', 'Accept-Language'))
+            return reponse
+        return enveloppe
+    return decorateur
+
+
+# ====================================================
+# FLUX ET PLAN DU SITE
+# ====================================================
+def _validateurs(aujourd_hui):
+    """
+    (ETag, Last-Modified) des offres visibles : dernière modification, nombre
+    d'offres (suppressions) et dernière expiration passée (bascule à minuit,
+    sans écriture en base). Une seule requête d'agrégat.
+    """
+    agregats = JobOffer.objects.filter(visible_sur_site=True).aggregate(
+        modification=Max('date_mise_a_jour'),
+        nombre=Count('pk'),
+        expiration=Max('date_limite', filter=Q(date_limite__lt=aujourd_hui)),
+    )
+    instants = [agregats['modification'] or timezone.now()]
+    if agregats['expiration']:
+        lendemain = agregats['expiration'] + datetime.timedelta(days=1)
+        instants.append(timezone.make_aware(datetime.datetime.combine(lendemain, datetime.time.min)))
+    derniere_modification = int(max(instants).timestamp())
+    brut = f"{derniere_modification}:{agregats['nombre']}"
+    return hashlib.md5(brut.encode()).hexdigest(), derniere_modification
+
+
+def flux_en_cache(request, format_flux, generer, parametres=()):
+    """
+    Réponse d'un flux public servie depuis un instantané en cache :
+    (ETag, Last-Modified, type, contenu). Tant que l'instantané est valide,
+    un client à jour reçoit 304 sans aucune requête SQL.
+    `generer(request)` retourne (contenu, content_type) ; `parametres` :
+    valeurs de la requête qui distinguent les réponses (API).
+    """
+    cle = _cle_page(f'flux:{format_flux}', (request.scheme, request.get_host()), parametres)
+    instantane = cache.get(cle)
+    if instantane is None:
+        empreinte, derniere_modification = _validateurs(timezone.now().date())
+        contenu, content_type = generer(request)
+        # ETag fort : même contenu pour les mêmes validateurs, par format
+        etag = quote_etag(f'{format_flux}-{empreinte}')
+        instantane = (etag, derniere_modification, content_type, contenu)
+        cache.set(cle, instantane, DUREE_PAGES)
+
+    etag, derniere_modification, content_type, contenu = instantane
+    reponse = get_conditional_response(request, etag=etag, last_modified=derniere_modification)
+    if reponse is None:
+        reponse = HttpResponse(contenu, content_type=content_type)
+    reponse['ETag'] = etag
+    reponse['Last-Modified'] = http_date(derniere_modification)
+    reponse['Cache-Control'] = f'public, max-age={DUREE_PAGES}'
+    return reponse
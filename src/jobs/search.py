@@ -0,0 +1,81 @@
+# jobs/search.py
+"""
+Recherche plein texte des offres d'emploi (PostgreSQL).
+
+Chaque JobOffer porte un tsvector `document_recherche` pondéré, calculé
+en SQL depuis ses propres colonnes (configuration `french_unaccent`) :
+    A : titre, référence
+    B : compétences et profil recherché
+    C : mission principale et tâches
+    D : société, lieu
+Les colonnes HTML nettoyées sont indexées telles quelles : le parseur
+PostgreSQL reconnaît les balises et entités, que la configuration ignore.
+Le document est recalculé après chaque enregistrement (jobs/signals.py)
+et peut être reconstruit avec `python manage.py rebuild_job_search`.
+
+Si la recherche plein texte ne trouve rien (faute de frappe : "devlopeur"),
+on se rabat sur la similarité de trigrammes (pg_trgm) du titre et de la
+société, indexés en GIN.
+"""
+import re
+
+from django.contrib.postgres.search import SearchRank, SearchVector, TrigramWordSimilarity
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast, Greatest
+
+from candidats.search import SEARCH_CONFIG, construire_requete
+
+_TERME_RE = re.compile(r'\w+', re.UNICODE)
+
+# poids -> colonnes de JobOffer
+COLONNES = {
+    'A': ('titre', 'reference'),
+    'B': ('competences_qualifications_html', 'profil_recherche_html'),
+    'C': ('mission_principale_html', 'taches_html'),
+    'D': ('societe', 'lieu'),
+}
+
+
+def expression_document():
+    """Expression SQL du tsvector pondéré, évaluée sur la ligne de l'offre"""
+    vecteur = None
+    for poids, colonnes in COLONNES.items():
+        partie = SearchVector(*colonnes, weight=poids, config=SEARCH_CONFIG)
+        vecteur = partie if vecteur is None else vecteur + partie
+    return vecteur
+
+
+def mettre_a_jour_documents(offres):
+    """Recalcule le document des offres du queryset, en une requête UPDATE"""
+    return offres.update(document_recherche=expression_document())
+
+
+def rechercher_offres(offres, texte):
+    """
+    Filtre un queryset de JobOffer sur la saisie libre, annote `pertinence`
+    et trie les plus pertinentes en premier. Les vues qui gardent un premier
+    critère de tri (offres ouvertes d'abord) réordonnent avec `pertinence`.
+    """
+    requete = construire_requete(texte)
+    if requete is None:
+        return offres
+
+    trouvees = offres.filter(document_recherche=requete)
+    if trouvees.exists():
+        rang = SearchRank(F('document_recherche'), requete)
+        # Cast en double précision : clé de pagination par curseur exacte
+        return trouvees.annotate(
+            pertinence=Cast(rang, FloatField())
+        ).order_by('-pertinence', '-pk')
+
+    # Repli tolérant aux fautes : similarité de mots sur titre et société
+    saisie = ' '.join(_TERME_RE.findall(texte))
+    similarite = Greatest(
+        TrigramWordSimilarity(saisie, 'titre'),
+        TrigramWordSimilarity(saisie, 'societe'),
+    )
+    return offres.filter(
+        Q(titre__trigram_word_similar=saisie) | Q(societe__trigram_word_similar=saisie)
+    ).annotate(
+        pertinence=Cast(similarite, FloatField())
+    ).order_by('-pertinence', '-pk')
@@ -0,0 +1,72 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .images import generer_derives, supprimer_derives
+from .models import JobOffer, OffreSimilaire, SummernoteAttachment
+from .publication import invalider_pages_publiques
+from .search import mettre_a_jour_documents
+from .similarite import CHAMPS_MODELE, actualiser_voisins, est_indexee
+
+
+@receiver(post_save, sender=JobOffer)
+@receiver(post_delete, sender=JobOffer)
+def invalider_pages_offres(sender, instance, **kwargs):
+    """Toute modification d'offre rend obsolètes les pages publiques en cache"""
+    invalider_pages_publiques()
+
+
+@receiver(post_save, sender=JobOffer)
+def indexer_offre(sender, instance, **kwargs):
+    """Recalcule le document de recherche depuis les colonnes enregistrées"""
+    mettre_a_jour_documents(JobOffer.objects.filter(pk=instance.pk))
+
+
+@receiver(pre_save, sender=JobOffer)
+def memoriser_etat_similarite(sender, instance, **kwargs):
+    """Colonnes du modèle de similarité avant l'enregistrement (None à la création)"""
+    instance._etat_similarite = (
+        JobOffer.objects.filter(pk=instance.pk).values(*CHAMPS_MODELE).first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=JobOffer)
+def actualiser_offres_similaires(sender, instance, **kwargs):
+    """
+    Voisines de l'offre (et des offres dont le classement change), après commit.
+    Le recalcul relit toutes les offres publiées : seulement si l'offre est ou
+    était publiée et qu'une colonne du modèle a changé.
+    """
+    avant = getattr(instance, '_etat_similarite', None)
+    apres = {champ: getattr(instance, champ) for champ in CHAMPS_MODELE}
+    if avant == apres:
+        return
+    if not est_indexee(apres) and not (avant and est_indexee(avant)):
+        return
+    transaction.on_commit(partial(actualiser_voisins, [instance.pk]))
+
+
+@receiver(pre_delete, sender=JobOffer)
+def retirer_offres_similaires(sender, instance, **kwargs):
+    """Les offres qui listaient l'offre supprimée perdent une voisine : à recalculer"""
+    sources = list(OffreSimilaire.objects.filter(voisine=instance).values_list('offre_id', flat=True))
+    transaction.on_commit(partial(actualiser_voisins, [instance.pk], sources))
+
+
+@receiver(post_save, sender=SummernoteAttachment)
+def deriver_image(sender, instance, created, **kwargs):
+    """Dérivés redimensionnés de chaque image téléversée depuis l'éditeur"""
+    if created and instance.file:
+        generer_derives(instance)
+
+
+@receiver(post_delete, sender=SummernoteAttachment)
+def supprimer_fichiers_piece_jointe(sender, instance, **kwargs):
+    """Fichier d'origine et dérivés supprimés avec la pièce jointe, après commit"""
+    def supprimer():
+        supprimer_derives(instance)
+        if instance.file:
+            instance.file.storage.delete(instance.file.name)
+    transaction.on_commit(supprimer)
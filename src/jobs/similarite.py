@@ -0,0 +1,294 @@
+# jobs/similarite.py
+"""
+Offres similaires précalculées (NumPy).
+
+Chaque offre publiée est représentée par un vecteur TF-IDF de son texte
+nettoyé (titre compté deux fois, compétences, profil, mission, tâches).
+Les vecteurs sont normalisés : le produit scalaire est la similarité
+cosinus. La matrice creuse offre x terme est tenue sous deux formes :
+    - par offre (CSR) : termes et poids de chaque offre ;
+    - par terme (CSC) : offres et poids de chaque terme (listes inversées).
+Les similarités d'une offre avec toutes les autres ne parcourent donc que
+les listes de ses propres termes, puis s'accumulent avec np.bincount.
+
+Le score final ajoute un bonus de même secteur et de même lieu. Les
+K_STOCKES meilleures voisines ouvertes sont enregistrées dans OffreSimilaire :
+la page détail lit ces lignes par clé, sans calcul. Les voisines expirées
+depuis sont écartées à la lecture (d'où plus de lignes stockées qu'affichées).
+
+Mises à jour :
+    - `actualiser_voisins` après l'enregistrement ou la suppression d'une offre
+      (jobs/signals.py) : l'offre et les offres dont le classement change.
+      Le modèle étant reconstruit à chaque appel, les enregistrements sans
+      effet sur les voisines (brouillons, offres non publiées, colonnes hors
+      CHAMPS_MODELE) ne le déclenchent pas ;
+    - `python manage.py rebuild_offres_similaires` : recalcul complet
+      (reprise initiale, puis quotidien après update_job_status).
+"""
+import math
+import re
+import unicodedata
+from collections import Counter
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from .models import JobOffer, JobStatus, OffreSimilaire
+
+K_STOCKES = 10
+BONUS_SECTEUR = 0.15
+BONUS_LIEU = 0.1
+SCORE_MIN = 0.05
+
+_MOT_RE = re.compile(r'[a-z0-9+#]{3,}')
+MOTS_VIDES = frozenset("""
+    les des une pour par avec dans sur aux est sont ont qui que quoi dont sans sous
+    vous nous leur leurs ses son sa votre vos notre nos cette ces cet etre avoir
+    plus moins tres bien tout tous toute toutes autre autres ainsi etc afin entre
+    lors chez selon aussi faire fait mise ans mois jour poste offre candidat
+    candidats profil mission missions taches recherche recherchons
+""".split())
+
+
+def _sans_accents(texte):
+    texte = unicodedata.normalize('NFKD', strip_tags(texte or ''))
+    return ''.join(c for c in texte if not unicodedata.combining(c)).lower()
+
+
+def _singulier(mot):
+    # Pluriels réguliers seulement : "réseaux" -> "reseau", "comptables" -> "comptable"
+    return mot[:-1] if len(mot) > 4 and mot[-1] in 'sx' else mot
+
+
+def termes(texte):
+    """Mots significatifs du texte, sans accents ni mots vides, au singulier"""
+    return [
+        _singulier(mot) for mot in _MOT_RE.findall(_sans_accents(texte)) if mot not in MOTS_VIDES
+    ]
+
+
+def _texte_offre(titre, *contenus):
+    # Titre compté deux fois : il résume le mieux le poste
+    return ' '.join((titre, titre) + contenus)
+
+
+# ====================================================
+# MODÈLE TF-IDF
+# ====================================================
+class ModeleSimilarite:
+    """Vecteurs TF-IDF normalisés des offres publiées, en tableaux NumPy"""
+
+    def __init__(self, offres):
+        """`offres` : [(id, texte, secteur, lieu, ouverte)]"""
+        self.ids = np.array([o[0] for o in offres], dtype=np.int64)
+        self.position = {pk: ligne for ligne, pk in enumerate(self.ids.tolist())}
+        self.ouvertes = np.array([o[4] for o in offres], dtype=bool)
+        # Le secteur « Autre » ne rapproche pas les offres
+        self.secteurs = self._codes([o[2] if o[2] != JobOffer.SectorChoices.AUTRE else '' for o in offres])
+        self.lieux = self._codes([_sans_accents(o[3]).strip() for o in offres])
+
+        comptes = [Counter(termes(o[1])) for o in offres]
+        vocabulaire = {}
+        lignes, colonnes, tf = [], [], []
+        for ligne, compte in enumerate(comptes):
+            for terme, n in compte.items():
+                lignes.append(ligne)
+                colonnes.append(vocabulaire.setdefault(terme, len(vocabulaire)))
+                tf.append(1 + math.log(n))
+        lignes = np.array(lignes, dtype=np.int32)
+        colonnes = np.array(colonnes, dtype=np.int32)
+        n = len(offres)
+
+        # IDF lissé, puis normalisation L2 de chaque offre
+        df = np.bincount(colonnes, minlength=len(vocabulaire))
+        idf = np.log((1 + n) / (1 + df)) + 1
+        poids = np.array(tf, dtype=np.float64) * idf[colonnes]
+        normes = np.sqrt(np.bincount(lignes, weights=poids ** 2, minlength=n))
+        poids = (poids / np.where(normes > 0, normes, 1)[lignes]).astype(np.float32)
+
+        # Les paires (ligne, colonne) sont déjà groupées par ligne : CSR direct
+        self.offre_ptr = np.concatenate([[0], np.cumsum(np.bincount(lignes, minlength=n))])
+        self.offre_termes = colonnes
+        self.offre_poids = poids
+
+        ordre = np.argsort(colonnes, kind='stable')
+        self.terme_ptr = np.concatenate([[0], np.cumsum(df)])
+        self.terme_offres = lignes[ordre]
+        self.terme_poids = poids[ordre]
+
+    @staticmethod
+    def _codes(valeurs):
+        codes = {'': -1}
+        return np.array([codes.setdefault(v, len(codes) - 1) for v in valeurs], dtype=np.int32)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def scores(self, ligne):
+        """Score de l'offre `ligne` avec chaque offre (symétrique), -1 pour elle-même"""
+        debut, fin = self.offre_ptr[ligne], self.offre_ptr[ligne + 1]
+        termes_offre = self.offre_termes[debut:fin]
+        poids_offre = self.offre_poids[debut:fin]
+
+        # Concaténation des listes inversées des termes de l'offre
+        starts = self.terme_ptr[termes_offre]
+        longueurs = self.terme_ptr[termes_offre + 1] - starts
+        decalages = np.repeat(starts - (np.cumsum(longueurs) - longueurs), longueurs)
+        positions = np.arange(longueurs.sum()) + decalages
+
+        contributions = self.terme_poids[positions] * np.repeat(poids_offre, longueurs)
+        scores = np.bincount(
+            self.terme_offres[positions], weights=contributions, minlength=len(self)
+        )
+
+        if self.secteurs[ligne] >= 0:
+            scores += BONUS_SECTEUR * (self.secteurs == self.secteurs[ligne])
+        if self.lieux[ligne] >= 0:
+            scores += BONUS_LIEU * (self.lieux == self.lieux[ligne])
+        scores[ligne] = -1
+        return scores
+
+    def voisines(self, ligne, scores=None):
+        """[(id, score)] des K_STOCKES meilleures voisines ouvertes, par score décroissant"""
+        if scores is None:
+            scores = self.scores(ligne)
+        candidates = np.flatnonzero(self.ouvertes & (scores >= SCORE_MIN))
+        if len(candidates) > K_STOCKES:
+            candidates = candidates[np.argpartition(-scores[candidates], K_STOCKES - 1)[:K_STOCKES]]
+        # Tri décroissant par score, puis par id pour un ordre stable
+        candidates = candidates[np.lexsort((self.ids[candidates], -scores[candidates]))]
+        return [(int(self.ids[i]), float(scores[i])) for i in candidates]
+
+
+# Colonnes lues par construire_modele : seules leurs modifications changent les voisines
+CHAMPS_MODELE = (
+    'titre', 'competences_qualifications_html', 'profil_recherche_html', 'mission_principale_html',
+    'taches_html', 'secteur', 'lieu', 'statut', 'date_limite', 'visible_sur_site',
+)
+
+
+def est_indexee(valeurs):
+    """L'offre ({champ: valeur} de CHAMPS_MODELE) fait-elle partie du modèle ?"""
+    return bool(valeurs['visible_sur_site']) and valeurs['statut'] in (JobStatus.OUVERT, JobStatus.EXPIRE)
+
+
+def construire_modele():
+    """Modèle des offres visibles sur le site (une requête, texte nettoyé uniquement)"""
+    aujourd_hui = timezone.now().date()
+    lignes = JobOffer.objects.filter(
+        visible_sur_site=True, statut__in=[JobStatus.OUVERT, JobStatus.EXPIRE],
+    ).order_by('pk').values_list(
+        'pk', 'titre', 'competences_qualifications_html', 'profil_recherche_html',
+        'mission_principale_html', 'taches_html', 'secteur', 'lieu', 'statut', 'date_limite',
+    )
+    return ModeleSimilarite([
+        (
+            pk, _texte_offre(titre, *contenus), secteur, lieu,
+            statut == JobStatus.OUVERT and not (date_limite and date_limite < aujourd_hui),
+        )
+        for pk, titre, *contenus, secteur, lieu, statut, date_limite in lignes
+    ])
+
+
+# ====================================================
+# ENREGISTREMENT DES VOISINES
+# ====================================================
+def _enregistrer(modele, lignes, scores_connus=None):
+    """Remplace les voisines stockées des offres aux `lignes` du modèle"""
+    scores_connus = scores_connus or {}
+    nouvelles = []
+    for ligne in lignes:
+        voisines = modele.voisines(ligne, scores_connus.get(ligne))
+        nouvelles += [
+            OffreSimilaire(offre_id=int(modele.ids[ligne]), voisine_id=pk, rang=rang, score=score)
+            for rang, (pk, score) in enumerate(voisines, start=1)
+        ]
+    ids = [int(modele.ids[ligne]) for ligne in lignes]
+    with transaction.atomic():
+        # Deux enregistrements simultanés peuvent recalculer la même offre :
+        # verrou sur ses lignes (ordre des pk, sans interblocage), le second
+        # DELETE voit alors les voisines insérées par le premier
+        list(JobOffer.objects.select_for_update().filter(pk__in=ids).order_by('pk').values_list('pk', flat=True))
+        OffreSimilaire.objects.filter(offre_id__in=ids).delete()
+        OffreSimilaire.objects.bulk_create(nouvelles, batch_size=1000)
+    return len(nouvelles)
+
+
+def reconstruire_voisins(taille_lot=500, modele=None):
+    """Recalcule les voisines de toutes les offres publiées ; retourne (offres, lignes)"""
+    modele = modele or construire_modele()
+    total = 0
+    for debut in range(0, len(modele), taille_lot):
+        total += _enregistrer(modele, range(debut, min(debut + taille_lot, len(modele))))
+    # Offres retirées du site depuis le dernier calcul
+    OffreSimilaire.objects.exclude(offre_id__in=modele.ids.tolist()).delete()
+    return len(modele), total
+
+
+def actualiser_voisins(offre_ids, sources=()):
+    """
+    Mise à jour incrémentale après modification des offres `offre_ids`.
+    Sont recalculées : ces offres, les offres `sources` qui les listaient
+    (cas d'une suppression), celles qui les listent encore et celles dont
+    la nouvelle similarité dépasse la plus faible voisine stockée.
+    """
+    from .publication import invalider_pages_publiques
+
+    offre_ids = set(offre_ids)
+    modele = construire_modele()
+    if len(offre_ids) * 4 >= len(modele):
+        # Import en masse : le recalcul complet est moins coûteux
+        resultat = reconstruire_voisins(modele=modele)
+        invalider_pages_publiques()
+        return resultat
+
+    a_recalculer = {modele.position[pk] for pk in offre_ids if pk in modele.position}
+    retirees = [pk for pk in offre_ids if pk not in modele.position]
+    if retirees:
+        OffreSimilaire.objects.filter(offre_id__in=retirees).delete()
+
+    listantes = set(sources) | set(
+        OffreSimilaire.objects.filter(voisine_id__in=offre_ids).values_list('offre_id', flat=True)
+    )
+    a_recalculer |= {modele.position[pk] for pk in listantes if pk in modele.position}
+
+    # Seuil d'entrée de chaque offre : score de sa dernière voisine si la liste est pleine
+    seuils = np.zeros(len(modele), dtype=np.float64)
+    for pk, nombre, minimum in OffreSimilaire.objects.order_by().values('offre_id').annotate(
+        nombre=Count('pk'), minimum=Min('score')
+    ).values_list('offre_id', 'nombre', 'minimum'):
+        if nombre >= K_STOCKES and pk in modele.position:
+            seuils[modele.position[pk]] = minimum
+
+    scores_connus = {}
+    for pk in offre_ids:
+        ligne = modele.position.get(pk)
+        if ligne is None:
+            continue
+        scores = modele.scores(ligne)
+        scores_connus[ligne] = scores
+        if modele.ouvertes[ligne]:
+            # Similarité symétrique : scores[j] est aussi le score de l'offre vue depuis j
+            a_recalculer.update(np.flatnonzero((scores >= SCORE_MIN) & (scores > seuils)).tolist())
+
+    total = _enregistrer(modele, sorted(a_recalculer), scores_connus) if a_recalculer else 0
+    # Les pages détail en cache affichent les anciennes voisines
+    invalider_pages_publiques()
+    return len(a_recalculer), total
+
+
+def offres_similaires(offre_id, limite=5):
+    """Voisines encore ouvertes d'une offre, lues dans OffreSimilaire (par rang)"""
+    lignes = OffreSimilaire.objects.filter(
+        offre_id=offre_id,
+        voisine__visible_sur_site=True,
+        voisine__statut=JobStatus.OUVERT,
+    ).exclude(
+        voisine__date_limite__lt=timezone.now().date()
+    ).select_related('voisine').only(
+        'voisine__titre', 'voisine__societe', 'voisine__lieu',
+    ).order_by('rang')[:limite]
+    return [ligne.voisine for ligne in lignes]
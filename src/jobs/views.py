@@ -6,8 +6,11 @@ from django.db.models import Q
 from django.contrib import messages
 from django.utils import timezone
 
+from antares_rh.pagination import KeysetPaginator
+from candidats.matching import candidats_suggeres
 from .forms import JobOfferForm
 from .models import JobOffer, JobStatus, JobType
+from .search import rechercher_offres
 
 def is_rh_or_admin(user):
     return user.is_authenticated and (user.is_superuser or getattr(user, 'role', '') in ['admin', 'rh','stagiaire','employee'])
@@ -20,7 +23,6 @@ def job_offer_list(request):
     status_filter = request.GET.get('status', 'all')
     type_filter = request.GET.get('type', 'all')
     search_query = request.GET.get('q', '')
-    page_number = request.GET.get('page', 1)
     
     # Filtrage de base
     offers = JobOffer.objects.all().order_by('-date_publication')
@@ -33,19 +35,17 @@ def job_offer_list(request):
     if type_filter != 'all':
         offers = offers.filter(type_offre=type_filter)
     
-    # Recherche texte
+    # Recherche plein texte classée par pertinence (repli trigrammes si aucun résultat)
     if search_query:
-        offers = offers.filter(
-            Q(titre__icontains=search_query) |
-            Q(reference__icontains=search_query) |
-            Q(societe__icontains=search_query) |
-            Q(lieu__icontains=search_query) |
-            Q(description__icontains=search_query)
-        )
-    
-    # Pagination - 10 éléments par page
-    paginator = Paginator(offers, 10)
-    page_obj = paginator.get_page(page_number)
+        offers = rechercher_offres(offers, search_query)
+    
+    # Pagination par curseur : par pertinence si recherche, sinon sur (date_publication, id)
+    if 'pertinence' in offers.query.annotations:
+        ordering = ('-pertinence', '-pk')
+    else:
+        ordering = ('-date_publication', '-pk')
+    paginator = KeysetPaginator(offers, 10, ordering=ordering)
+    page_obj = paginator.get_page(request.GET)
     
     context = {
         'offers': page_obj,
@@ -68,7 +68,10 @@ def job_offer_detail(request, pk):
     if not (request.user.is_superuser or request.user.role in ['admin', 'rh']):
         return HttpResponseForbidden("Vous n'avez pas accès à cette ressource")
     
-    return render(request, 'jobs/job_offer_detail.html', {'offer': offer})
+    # Shortlist des candidats les plus proches de l'offre (index de matching)
+    suggestions = candidats_suggeres(offer, limite=10)
+    
+    return render(request, 'jobs/job_offer_detail.html', {'offer': offer, 'suggestions': suggestions})
 
 # --- CREATION ---
 @login_required
@@ -203,12 +206,7 @@ def job_offer_public_list(request):
     
     search_query = request.GET.get('q', '')
     if search_query:
-        offers = offers.filter(
-            Q(titre__icontains=search_query) |
-            Q(mission_principale__icontains=search_query) |
-            Q(lieu__icontains=search_query) |
-            Q(secteur__icontains=search_query)
-        )
+        offers = rechercher_offres(offers, search_query)
     
     paginator = Paginator(offers, 9)
     page_number = request.GET.get('page', 1)
@@ -0,0 +1,74 @@
+# notes/services.py
+"""
+Diffusion des notes internes à leurs destinataires.
+
+`diffuser_note` crée toutes les NoteReception en un seul bulk_create
+(donc sans signal post_save par destinataire), puis, une fois la
+transaction validée, pousse les notifications websocket en un seul envoi
+groupé exécuté hors de la requête.
+"""
+import asyncio
+import threading
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.db.models import QuerySet
+
+from .models import NoteReception
+
+TAILLE_LOT = 500
+
+
+def _ids_utilisateurs(destinataires):
+    if isinstance(destinataires, QuerySet):
+        return list(destinataires.values_list('pk', flat=True))
+    return [getattr(destinataire, 'pk', destinataire) for destinataire in destinataires]
+
+
+def message_notification(note):
+    return f"Nouvelle note reçue de {note.expediteur.get_full_name()}"
+
+
+def pousser_notifications(user_ids, message):
+    """
+    Envoie la notification aux groupes `user_<id>` en un seul lot concurrent,
+    dans un thread pour ne pas bloquer la requête.
+    Sans couche de canaux configurée, ne fait rien.
+    """
+    channel_layer = get_channel_layer()
+    user_ids = list(user_ids)
+    if channel_layer is None or not user_ids:
+        return
+
+    async def envoyer():
+        await asyncio.gather(*(
+            channel_layer.group_send(
+                f"user_{user_id}",
+                {"type": "send_note_notification", "message": message},
+            )
+            for user_id in user_ids
+        ), return_exceptions=True)
+
+    threading.Thread(target=async_to_sync(envoyer), daemon=True).start()
+
+
+def diffuser_note(note, destinataires):
+    """
+    Crée les réceptions de `note` pour `destinataires` (queryset, utilisateurs
+    ou ids) et programme les notifications après commit.
+    Les réceptions déjà existantes sont ignorées. Retourne le nombre de destinataires.
+    """
+    user_ids = _ids_utilisateurs(destinataires)
+    if not user_ids:
+        return 0
+
+    NoteReception.objects.bulk_create(
+        [NoteReception(note=note, destinataire_id=user_id) for user_id in user_ids],
+        ignore_conflicts=True,
+        batch_size=TAILLE_LOT,
+    )
+
+    message = message_notification(note)
+    transaction.on_commit(lambda: pousser_notifications(user_ids, message))
+    return len(user_ids)
@@ -2,18 +2,11 @@
 from django.dispatch import receiver
 from django.db.models.signals import post_save
 from .models import NoteReception
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from .services import message_notification, pousser_notifications
 
 @receiver(post_save, sender=NoteReception)
 def send_note_notification(sender, instance, created, **kwargs):
+    # Création unitaire (admin...) ; les diffusions passent par
+    # notes.services.diffuser_note, qui notifie en un seul lot
     if created:
-        channel_layer = get_channel_layer()
-        group_name = f"user_{instance.destinataire.id}"
-        async_to_sync(channel_layer.group_send)(
-            group_name,
-            {
-                "type": "send_note_notification",
-                "message": f"Nouvelle note reçue de {instance.note.expediteur.get_full_name()}",
-            }
-        )
+        pousser_notifications([instance.destinataire_id], message_notification(instance.note))
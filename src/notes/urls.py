@@ -8,6 +8,7 @@ urlpatterns = [
     path('sent_note/', views.sent_notes, name='sent-note'),
     path('note/<int:note_id>/', views.note_detail, name='note-detail'),
     path('note/<int:note_id>/archiver/', views.archiver_note, name='archiver-note'),
+    path('note/<int:note_id>/piece-jointe/', views.telecharger_piece_jointe, name='note-piece-jointe'),
     path('note_envoyee/<int:note_id>/', views.note_envoyee_detail, name='note-envoyee-detail'),
     path('compteur_notes_non_lues/', views.compteur_notes_non_lues, name='compteur_notes_non_lues'),
 ]
@@ -6,6 +6,8 @@ from django.http import Http404
 from django.utils import timezone
 from .forms import NoteForm
 from .models import NoteInterne, NoteReception
+from .services import diffuser_note
+from antares_rh.telechargements import servir_fichier
 from logs.utils import enregistrer_action  
 
 from django.http import JsonResponse
@@ -45,14 +47,12 @@ def send_note(request):
             note = form.save(commit=False)
             note.expediteur = request.user
             note.save()
-            form.save_m2m()  # pour les destinataires
 
-            # Création d'une NoteReception pour chaque destinataire
-            for destinataire in note.destinataires.all():
-                NoteReception.objects.get_or_create(note=note, destinataire=destinataire)
+            # Réceptions créées en un seul insert, notifications envoyées en lot
+            nombre = diffuser_note(note, form.cleaned_data['destinataires'])
 
             messages.success(request, "✅ Note envoyée avec succès.")
-            enregistrer_action(request.user, 'ENVOI_NOTE', f"Note envoyée à {note.destinataires.count()} utilisateur(s)")
+            enregistrer_action(request.user, 'ENVOI_NOTE', f"Note envoyée à {nombre} utilisateur(s)")
             return redirect('inbox')  
         else:
             messages.error(request, "⚠️ Erreur dans le formulaire.")
@@ -92,6 +92,19 @@ def note_detail(request, note_id):
     })
 
 
+@login_required
+def telecharger_piece_jointe(request, note_id):
+    """Pièce jointe d'une note : réservée à l'expéditeur et aux destinataires"""
+    note = get_object_or_404(NoteInterne, id=note_id)
+
+    if note.expediteur_id != request.user.id and not note.receptions.filter(destinataire=request.user).exists():
+        raise Http404
+    if not note.pieces_jointes:
+        raise Http404
+
+    return servir_fichier(request, note.pieces_jointes, en_piece_jointe=not request.GET.get('apercu'))
+
+
 @login_required
 @require_POST
 def archiver_note(request, note_id):
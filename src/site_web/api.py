@@ -0,0 +1,148 @@
+# site_web/api.py
+"""
+API JSON en lecture seule des offres publiées (widget carrières, application
+mobile). Versionnée dans l'URL : /api/v1/offres/ et /api/v1/offres/<id>/.
+
+Liste :
+    - mêmes filtres que la page publique (`q`, `location`, `sector`,
+      `contract_type`, `hide_expired`), même ordre (ouvertes d'abord) ;
+    - pagination par curseur (`cursor`, `limit` <= LIMITE_MAX) : liens
+      `suivant` / `precedent` dans la réponse ;
+    - `fields=titre,societe,...` : seules les colonnes demandées sont lues
+      (`.only()`). Par défaut, les colonnes HTML des descriptions ne sont ni
+      lues ni renvoyées ; le détail d'une offre les renvoie toutes.
+
+Les réponses sont servies depuis le cache des flux (jobs.publication.flux_en_cache) :
+ETag / Last-Modified, 304 sans requête SQL, invalidation par les signaux
+de JobOffer.
+"""
+import json
+
+from django.http import Http404, JsonResponse
+from django.urls import reverse
+
+from antares_rh.pagination import CURSOR_PARAM, KeysetPaginator
+from jobs.publication import PARAMETRES_FILTRES, filtrer_offres, flux_en_cache, offres_publiques
+
+LIMITE_DEFAUT = 20
+LIMITE_MAX = 100
+
+COLONNES = (
+    'reference', 'titre', 'type_offre', 'societe', 'lieu', 'secteur',
+    'salaire', 'salaire_min', 'salaire_max', 'niveau_etude', 'experience_requise',
+    'date_publication', 'date_limite', 'date_mise_a_jour',
+    'apercu_mission', 'apercu_profil', 'apercu_competences',
+)
+COLONNES_HTML = (
+    'mission_principale_html', 'taches_html', 'profil_recherche_html',
+    'competences_qualifications_html', 'conditions_html', 'comment_postuler_html',
+)
+# Champs calculés : aucune colonne à lire
+CALCULES = ('est_expiree', 'url')
+
+CHAMPS = ('id',) + COLONNES + COLONNES_HTML + CALCULES
+CHAMPS_LISTE = ('id',) + COLONNES + CALCULES
+
+
+class ErreurParametre(ValueError):
+    pass
+
+
+def _champs(request, par_defaut):
+    """Champs demandés par `fields=`, dans l'ordre de CHAMPS"""
+    saisie = request.GET.get('fields', '').strip()
+    if not saisie:
+        return par_defaut
+    demandes = {nom.strip() for nom in saisie.split(',') if nom.strip()}
+    inconnus = demandes - set(CHAMPS)
+    if inconnus:
+        raise ErreurParametre(f"Champs inconnus : {', '.join(sorted(inconnus))}")
+    return tuple(nom for nom in CHAMPS if nom in demandes)
+
+
+def _limite(request):
+    try:
+        limite = int(request.GET.get('limit', LIMITE_DEFAUT))
+    except ValueError:
+        raise ErreurParametre('limit doit être un entier')
+    if not 1 <= limite <= LIMITE_MAX:
+        raise ErreurParametre(f'limit doit être compris entre 1 et {LIMITE_MAX}')
+    return limite
+
+
+def _serialiser(request, offre, champs):
+    donnees = {}
+    for nom in champs:
+        if nom == 'id':
+            valeur = offre.pk
+        elif nom == 'est_expiree':
+            valeur = offre.est_expiree_db
+        elif nom == 'url':
+            valeur = request.build_absolute_uri(reverse('public-job-offer-detail', args=[offre.pk]))
+        else:
+            valeur = getattr(offre, nom)
+        donnees[nom] = valeur.isoformat() if hasattr(valeur, 'isoformat') else valeur
+    return donnees
+
+
+def _json(donnees):
+    return json.dumps(donnees, ensure_ascii=False), 'application/json; charset=utf-8'
+
+
+def _erreur(exc, statut=400):
+    return JsonResponse({'erreur': str(exc)}, status=statut, json_dumps_params={'ensure_ascii': False})
+
+
+# ====================================================
+# VUES
+# ====================================================
+def offres_api(request):
+    """Liste paginée des offres visibles sur le site"""
+    try:
+        champs = _champs(request, CHAMPS_LISTE)
+        limite = _limite(request)
+    except ErreurParametre as exc:
+        return _erreur(exc)
+
+    def generer(request):
+        offres = filtrer_offres(offres_publiques(), request.GET)
+        if 'pertinence' in offres.query.annotations:
+            ordre = ('status_priority', '-pertinence', '-date_publication', '-pk')
+        else:
+            ordre = ('status_priority', '-date_publication', '-pk')
+        # Colonnes demandées + clé du curseur (lue sur chaque objet de la page)
+        offres = offres.only(*(nom for nom in champs if nom in COLONNES + COLONNES_HTML), 'date_publication')
+
+        page = KeysetPaginator(offres, limite, ordering=ordre).get_page(request.GET)
+        base = request.build_absolute_uri(request.path)
+        return _json({
+            'offres': [_serialiser(request, offre, champs) for offre in page],
+            'suivant': f'{base}?{page.next_querystring}' if page.has_next() else None,
+            'precedent': f'{base}?{page.previous_querystring}' if page.has_previous() else None,
+        })
+
+    parametres = tuple(request.GET.get(nom, '') for nom in PARAMETRES_FILTRES) + (
+        champs, limite, request.GET.get(CURSOR_PARAM, ''),
+    )
+    return flux_en_cache(request, 'api:offres', generer, parametres)
+
+
+def offre_api(request, pk):
+    """Détail d'une offre visible sur le site, descriptions HTML comprises"""
+    try:
+        champs = _champs(request, CHAMPS)
+    except ErreurParametre as exc:
+        return _erreur(exc)
+
+    def generer(request):
+        # 'pk' : sans colonne demandée (fields=id,url), .only() vide chargerait tout
+        offres = offres_publiques().only(*(nom for nom in champs if nom in COLONNES + COLONNES_HTML), 'pk')
+        offre = offres.filter(pk=pk).first()
+        if offre is None:
+            raise Http404
+        return _json(_serialiser(request, offre, champs))
+
+    try:
+        return flux_en_cache(request, 'api:offre', generer, (pk, champs))
+    except Http404:
+        return _erreur('Offre introuvable', 404)
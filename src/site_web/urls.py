@@ -12,6 +12,9 @@ urlpatterns = [
     
     #07_08
     path('emplois/<int:pk>/', views.public_job_offer_detail, name='public-job-offer-detail'),
+    path('emplois/rss.xml', views.jobs_rss, name='jobs-rss'),
+    path('emplois/atom.xml', views.jobs_atom, name='jobs-atom'),
+    path('emplois/feed.json', views.jobs_json_feed, name='jobs-json-feed'),
     #07_08
     #_____________________________________________________
     path('home', views.home, name='home'),
@@ -10,7 +10,17 @@ from django.db.models import Q
 #09_08
 from django.db.models import Q
 from django.core.paginator import Paginator
-from jobs.models import JobOffer, JobStatus
+from jobs.models import JobOffer, JobStatus, CHAMPS_HTML
+from jobs.publication import (
+    DUREE_PAGES_STATIQUES, PARAMETRES_FILTRES, filtrer_offres, flux_en_cache, offres_publiques,
+    page_publique_en_cache, version_offres,
+)
+from jobs.similarite import offres_similaires
+import io
+import json
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.xmlutils import SimplerXMLGenerator
 #12_08
 from django.shortcuts import render, redirect
 from django.urls import reverse_lazy
@@ -53,7 +63,7 @@ from django.core.mail import send_mail
 from django.conf import settings
 import secrets
 import string
-from datetime import datetime
+from datetime import datetime, time
 
 # Correction de la fonction create_user_from_consultant
 def create_user_from_consultant(consultant):
@@ -304,8 +314,8 @@ def send_general_email(contact):
 
 #12_08
 #_____________________________________________________________________________
-from django.db.models import Case, When, Value, IntegerField
 
+@page_publique_en_cache(*PARAMETRES_FILTRES, 'page')
 def jobs(request):
     # Récupération des paramètres
     search_query = request.GET.get('q', '')
@@ -315,50 +325,19 @@ def jobs(request):
     hide_expired = request.GET.get('hide_expired', 'false') == 'true'
     page_number = request.GET.get('page', 1)
     
-    # Mettre à jour automatiquement le statut des offres expirées
-    offres_a_mettre_a_jour = JobOffer.objects.filter(
-        statut=JobStatus.OUVERT,
-        date_limite__lt=timezone.now().date()
-    )
-    offres_a_mettre_a_jour.update(statut=JobStatus.EXPIRE)
-    
-    # Filtrage de base avec tri personnalisé
-    jobs = JobOffer.objects.filter(
-        visible_sur_site=True,
-        statut__in=[JobStatus.OUVERT, JobStatus.EXPIRE]
-    ).exclude(
-        statut=JobStatus.BROUILLON
-    ).annotate(
-        # Priorité 1 pour les offres ouvertes, 2 pour les expirées
-        status_priority=Case(
-            When(statut=JobStatus.OUVERT, then=Value(1)),
-            When(statut=JobStatus.EXPIRE, then=Value(2)),
-            default=Value(3),
-            output_field=IntegerField()
-        )
+    # Expiration calculée à la requête (date limite), le statut est mis à jour
+    # par la commande planifiée update_job_status : aucune écriture ici
+    # La liste n'affiche que les aperçus : le HTML complet n'est pas chargé
+    jobs = offres_publiques().defer(
+        *(f'{champ}_html' for champ in CHAMPS_HTML)
     ).order_by('status_priority', '-date_publication')
     
-    # pour masquer les offres expirées
-    if hide_expired:
-        jobs = jobs.exclude(statut=JobStatus.EXPIRE)
-    
-    # Filtres supplémentaires
-    if search_query:
-        jobs = jobs.filter(
-            Q(titre__icontains=search_query) |
-            Q(mission_principale__icontains=search_query) |
-            Q(profil_recherche__icontains=search_query) |
-            Q(societe__icontains=search_query)
-        )
-    
-    if location:
-        jobs = jobs.filter(lieu__icontains=location)
+    # Filtres communs avec l'API (jobs.publication.filtrer_offres)
+    jobs = filtrer_offres(jobs, request.GET)
     
-    if sector:
-        jobs = jobs.filter(secteur=sector)
-    
-    if contract_type:
-        jobs = jobs.filter(type_offre=contract_type)
+    # Recherche plein texte : offres ouvertes d'abord, puis par pertinence
+    if 'pertinence' in jobs.query.annotations:
+        jobs = jobs.order_by('status_priority', '-pertinence', '-date_publication')
     
     # Pagination - 10 éléments par page
     paginator = Paginator(jobs, 10)
@@ -381,25 +360,17 @@ def jobs(request):
 #_________________________________________________________________________________________________________________________
 #
 
+@page_publique_en_cache()
 def public_job_offer_detail(request, pk):
-    job = get_object_or_404(
-        JobOffer, 
-        pk=pk, 
-        visible_sur_site=True,
-        statut__in=['ouvert', 'expire'] 
-    )
+    job = get_object_or_404(offres_publiques(), pk=pk)
     
-    # Suggestions d'autres offres
-    related_jobs = JobOffer.objects.filter(
-        visible_sur_site=True,
-        statut='ouvert',
-        secteur=job.secteur
-    ).exclude(pk=pk).order_by('-date_publication')[:5]
+    # Offres similaires précalculées (jobs/similarite.py)
+    related_jobs = offres_similaires(job.pk, limite=5)
     
     context = {
         'job': job,
         'related_jobs': related_jobs,
-        'is_expired': job.statut == 'expire'
+        'is_expired': job.est_expiree_db
     }
     
     return render(request, 'site_web/public_job_detail.html', context)
@@ -407,26 +378,130 @@ def public_job_offer_detail(request, pk):
 #
 #_________________________________________________________________________________________________________________________
 #
+@page_publique_en_cache()
 def home(request):
-    featured_jobs = JobOffer.objects.filter(
-        visible_sur_site=True,
-        statut__in=['ouvert', 'expire']
-    ).order_by('-date_publication')[:6]
+    featured_jobs = offres_publiques().order_by('-date_publication')[:6]
     
     context = {
-        'featured_jobs': featured_jobs
+        'featured_jobs': featured_jobs,
+        'version_offres': version_offres(),
     }
     
     return render(request, 'site_web/index.html', context)
 
+#
+#_________________________________________________________________________________________________________________________
+#
+# Flux des offres (RSS, Atom, JSON Feed) et plan du site, servis depuis
+# un instantané en cache avec ETag / Last-Modified (jobs.publication)
+LIMITE_FLUX = 100
+TITRE_FLUX = "Antares RH - Offres d'emploi"
+
+
+def _offres_flux():
+    """Offres ouvertes les plus récentes, colonnes nécessaires aux flux seulement"""
+    return offres_publiques().filter(est_expiree_db=False).order_by('-date_publication', '-pk').only(
+        'pk', 'titre', 'societe', 'lieu', 'secteur', 'apercu_mission',
+        'date_publication', 'date_mise_a_jour',
+    )[:LIMITE_FLUX]
+
+
+def _date_publication(offre):
+    return timezone.make_aware(datetime.combine(offre.date_publication, time.min))
+
+
+def _generer_flux(request, classe_flux):
+    flux = classe_flux(
+        title=TITRE_FLUX,
+        link=request.build_absolute_uri(reverse('jobs')),
+        description="Dernières offres d'emploi publiées par Antares RH",
+        language='fr',
+        feed_url=request.build_absolute_uri(),
+    )
+    for offre in _offres_flux():
+        lien = request.build_absolute_uri(reverse('public-job-offer-detail', args=[offre.pk]))
+        flux.add_item(
+            title=f'{offre.titre} - {offre.societe}',
+            link=lien,
+            unique_id=lien,
+            description=offre.apercu_mission,
+            pubdate=_date_publication(offre),
+            updateddate=offre.date_mise_a_jour,
+            categories=[offre.get_secteur_display()] + ([offre.lieu] if offre.lieu else []),
+        )
+    return flux.writeString('utf-8'), flux.content_type
+
+
+def _generer_json_feed(request):
+    elements = []
+    for offre in _offres_flux():
+        lien = request.build_absolute_uri(reverse('public-job-offer-detail', args=[offre.pk]))
+        elements.append({
+            'id': lien,
+            'url': lien,
+            'title': f'{offre.titre} - {offre.societe}',
+            'content_text': offre.apercu_mission,
+            'date_published': _date_publication(offre).isoformat(),
+            'date_modified': offre.date_mise_a_jour.isoformat(),
+            'tags': [offre.get_secteur_display()] + ([offre.lieu] if offre.lieu else []),
+        })
+    contenu = json.dumps({
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': TITRE_FLUX,
+        'home_page_url': request.build_absolute_uri(reverse('jobs')),
+        'feed_url': request.build_absolute_uri(),
+        'language': 'fr',
+        'items': elements,
+    }, ensure_ascii=False)
+    return contenu, 'application/feed+json; charset=utf-8'
+
+
+def _generer_sitemap(request):
+    # Toutes les offres visibles, expirées comprises (la page détail reste publique)
+    offres = offres_publiques().order_by('-date_publication', '-pk').values_list('pk', 'date_mise_a_jour')
+    sortie = io.StringIO()
+    xml = SimplerXMLGenerator(sortie, 'utf-8')
+    xml.startDocument()
+    xml.startElement('urlset', {'xmlns': 'http://www.sitemaps.org/schemas/sitemap/0.9'})
+    for chemin, modification in [(reverse('home'), None), (reverse('jobs'), None)] + [
+        (reverse('public-job-offer-detail', args=[pk]), date_mise_a_jour)
+        for pk, date_mise_a_jour in offres
+    ]:
+        xml.startElement('url', {})
+        xml.addQuickElement('loc', request.build_absolute_uri(chemin))
+        if modification:
+            xml.addQuickElement('lastmod', modification.date().isoformat())
+        xml.endElement('url')
+    xml.endElement('urlset')
+    xml.endDocument()
+    return sortie.getvalue(), 'application/xml; charset=utf-8'
+
+
+def jobs_rss(request):
+    return flux_en_cache(request, 'rss', lambda r: _generer_flux(r, Rss201rev2Feed))
+
+
+def jobs_atom(request):
+    return flux_en_cache(request, 'atom', lambda r: _generer_flux(r, Atom1Feed))
+
+
+def jobs_json_feed(request):
+    return flux_en_cache(request, 'json', _generer_json_feed)
+
+
+def sitemap(request):
+    return flux_en_cache(request, 'sitemap', _generer_sitemap)
+
 #09_08 
 #07_08
 #______________________________________________________________________________
+@page_publique_en_cache(duree=DUREE_PAGES_STATIQUES)
 def about(request):
     return render(request, 'site_web/about.html')
 
 
 
+@page_publique_en_cache(duree=DUREE_PAGES_STATIQUES)
 def teams(request):
     return render(request, 'site_web/teams.html')
 
@@ -435,9 +510,11 @@ def appointment(request):
 
 
 
+@page_publique_en_cache(duree=DUREE_PAGES_STATIQUES)
 def recruteur_info(request):
     return render(request, 'site_web/recruteur_info.html')
 
+@page_publique_en_cache(duree=DUREE_PAGES_STATIQUES)
 def rejoindre_team(request):
     return render(request, 'site_web/rejoindre_team.html')
 
@@ -475,7 +552,8 @@ def candidat_register(request):
 
     return render(request, 'site_web/candidate_registry.html', {
         'form': form,
-        'featured_jobs': featured_jobs
+        'featured_jobs': featured_jobs,
+        'version_offres': version_offres(),
     })
 
 #22_08
@@ -12,4 +12,5 @@ urlpatterns = [
     path('historique_user/<int:user_id>/', views.historique_user, name='historique-employe'),
     path('historique_user/<int:user_id>/<str:semaine>/<str:jour>/', views.historique_detail_user, name='historique-detail-user'),
     path('commentaire/<int:tache_id>/', views.commentaire_tache, name='commentaire-tache'),
+    path('planning/equipe/', views.planning_equipe, name='planning-equipe'),
 ]
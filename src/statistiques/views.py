@@ -4,6 +4,9 @@ import json
 from django.shortcuts import render, redirect,get_object_or_404
 from django.utils import timezone
 from todo.models import Tache, TacheSelectionnee, FichePoste, SuiviTache
+from todo.durees import duree_selections
+from todo.bilans import bilans_par_jour
+from todo.planning import planning, semaine
 from django.utils.dateparse import parse_date
 from django.views.decorators.http import require_POST
 from collections import defaultdict
@@ -82,17 +85,14 @@ def historique_par_mois(request):
     # Récupération des données par jour (uniquement du lundi au vendredi)
     jours_data = []
     current_date = date_debut
+    bilans = bilans_par_jour(user, date_debut, date_fin)
     
     while current_date <= date_fin:
         # Ne traiter que les jours de semaine (0=lundi, 4=vendredi)
         if current_date.weekday() < 5:  # 0-4 correspond à lundi-vendredi
-            taches_jour = TacheSelectionnee.objects.filter(
-                user=user,
-                date_selection=current_date
-            )
-            
-            total = taches_jour.count()
-            terminees = taches_jour.filter(is_done=True).count()
+            bilan = bilans.get((user.pk, current_date))
+            total = bilan.total if bilan else 0
+            terminees = bilan.terminees if bilan else 0
             
             # Protection contre la division par zéro
             if total == 0:
@@ -199,12 +199,7 @@ def historique_jour(request, date_str):
     terminees = taches.filter(is_done=True).count()
     pourcentage = round((terminees / total) * 100) if total else 0
     # Calcul du temps total et moyen
-    suivis = SuiviTache.objects.filter(
-        user=user,
-        start_time__date=date_obj
-    )
-    
-    duree_totale = sum((s.duree() for s in suivis), timedelta())
+    duree_totale = duree_selections(taches)
     moyenne = duree_totale / total if total > 0 else timedelta()
     
     context = {
@@ -271,7 +266,7 @@ def statistique_globale(request):
     en_pause = taches_auj.filter(is_paused=True, is_done=False).count()
     non_demarre = taches_auj.filter(is_started=False, is_paused=False, is_done=False).count()
 
-    duree_totale = sum((s.duree() for s in SuiviTache.objects.filter(user=user, start_time__date=today)), timedelta())
+    duree_totale = duree_selections(taches_auj)
     moyenne_par_tache = duree_totale / total_selectionnees if total_selectionnees > 0 else timedelta()
 
     historique_jour = []
@@ -393,6 +388,8 @@ def historique_user(request, user_id):
     employe = get_object_or_404(User, id=user_id)
     today = now().date()
     semaines = []
+    debut_periode = today - timedelta(days=today.weekday(), weeks=3)
+    bilans = bilans_par_jour(employe, debut_periode, debut_periode + timedelta(weeks=3, days=4))
     
     for i in range(4):  # 4 dernières semaines
         start_of_week = today - timedelta(days=today.weekday(), weeks=i)
@@ -408,13 +405,8 @@ def historique_user(request, user_id):
         total_percentage = 0
         
         for jour in jours_semaine:
-            taches = TacheSelectionnee.objects.filter(
-                user=employe,
-                date_selection=jour,
-                is_done=True
-            ).select_related('tache__fiche_poste')
-            
-            done = taches.count()
+            bilan = bilans.get((employe.pk, jour))
+            done = bilan.terminees if bilan else 0
             percentage = min(round((done / 6) * 100), 100)  # 6 tâches = 100%
             css_class = get_performance_class(percentage)
             total_percentage += percentage
@@ -465,6 +457,36 @@ def historique_detail_user(request, user_id, semaine, jour):
     return render(request, 'statistiques/historique_detail_user.html', context)
 
 
+@login_required
+@user_passes_test(is_rh_or_admin)
+def planning_equipe(request):
+    """Planning de la semaine de tous les employés : une requête pour la grille"""
+    try:
+        offset = int(request.GET.get('semaine', 0))
+    except ValueError:
+        offset = 0
+    jours = semaine(offset)
+
+    employes = User.objects.filter(role__in=['employe', 'stagiaire']).order_by('last_name', 'first_name')
+    role = request.GET.get('role')
+    if role:
+        employes = employes.filter(role=role)
+    employes = list(employes)
+
+    grille = planning(employes, jours[0], jours[-1])
+    lignes = [
+        {'employe': employe, 'taches_par_jour': grille.get(employe.pk, {})}
+        for employe in employes
+    ]
+
+    return render(request, 'statistiques/planning_equipe.html', {
+        'jours': jours,
+        'lignes': lignes,
+        'offset': offset,
+        'role': role,
+        'today': timezone.localdate(),
+    })
+
 def get_performance_class(percentage):
     if percentage >= 90: return 'Excellent'
     elif percentage >= 70: return 'Très bon'
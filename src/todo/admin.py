@@ -1,5 +1,26 @@
-from django.contrib import admin
-from .models import FichePoste, Tache
+from django.contrib import admin, messages
+from .models import FichePoste, LigneModeleSemaine, ModeleSemaine, Tache
+from .programmation import modele_depuis_fiche
+
+@admin.register(FichePoste)
+class FichePosteAdmin(admin.ModelAdmin):
+    list_display = ['titre', 'employe', 'is_modele', 'date_creation']
+    actions = ['creer_modele_semaine']
+
+    @admin.action(description="Créer une semaine type (toutes les tâches, du lundi au vendredi)")
+    def creer_modele_semaine(self, request, queryset):
+        for fiche in queryset:
+            modele_depuis_fiche(fiche)
+        messages.success(request, f"{queryset.count()} semaine(s) type créée(s), à ajuster dans « Modèles de semaine ».")
 
-admin.site.register(FichePoste)
 admin.site.register(Tache)
+
+class LigneModeleSemaineInline(admin.TabularInline):
+    model = LigneModeleSemaine
+    extra = 0
+    raw_id_fields = ['tache']
+
+@admin.register(ModeleSemaine)
+class ModeleSemaineAdmin(admin.ModelAdmin):
+    list_display = ['titre', 'fiche_poste', 'date_creation']
+    inlines = [LigneModeleSemaineInline]
@@ -0,0 +1,105 @@
+# todo/bilans.py
+"""
+Bilans journaliers : compteurs par (utilisateur, jour) des tâches
+sélectionnées, lus par les historiques et le tableau de bord RH.
+
+Une ligne BilanJournalier est recalculée depuis les sélections du jour
+à chaque écriture qui les touche :
+    - enregistrement / suppression d'une TacheSelectionnee (todo/signals.py) ;
+    - mises à jour en masse (UPDATE, bulk_create), qui appellent
+      `actualiser_bilans` avec les couples concernés.
+Les vues lisent une période pour un ensemble d'utilisateurs en une requête
+(`bilans_par_jour`), sur l'index unique (user, date).
+
+`python manage.py reconstruire_bilans` recalcule toute la table
+(reprise initiale, contrôle).
+"""
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .models import BilanJournalier, TacheSelectionnee
+
+CHAMPS_BILAN = ['total', 'terminees', 'en_cours', 'en_pause', 'secondes_actives']
+
+
+def _compteurs():
+    return {
+        'nb_total': Count('pk'),
+        'nb_terminees': Count('pk', filter=Q(is_done=True)),
+        'nb_en_cours': Count('pk', filter=Q(is_started=True, is_paused=False, is_done=False)),
+        'nb_en_pause': Count('pk', filter=Q(is_paused=True, is_done=False)),
+        'duree': Sum('duree_cumulee'),
+    }
+
+
+def _bilan(ligne):
+    return BilanJournalier(
+        user_id=ligne['user_id'],
+        date=ligne['date_selection'],
+        total=ligne['nb_total'],
+        terminees=ligne['nb_terminees'],
+        en_cours=ligne['nb_en_cours'],
+        en_pause=ligne['nb_en_pause'],
+        secondes_actives=int(ligne['duree'].total_seconds()) if ligne['duree'] else 0,
+    )
+
+
+def _couples_q(couples, champ_date):
+    return reduce(or_, (Q(user_id=user_id, **{champ_date: jour}) for user_id, jour in couples))
+
+
+def actualiser_bilans(couples, taille_lot=200):
+    """Recalcule les bilans des couples (user_id, date) : un agrégat, un upsert par lot"""
+    couples = list(set(couples))
+    for debut in range(0, len(couples), taille_lot):
+        _actualiser(set(couples[debut:debut + taille_lot]))
+
+
+def _actualiser(couples):
+    bilans = [
+        _bilan(ligne)
+        for ligne in TacheSelectionnee.objects.filter(_couples_q(couples, 'date_selection'))
+        .values('user_id', 'date_selection').order_by().annotate(**_compteurs())
+    ]
+    with transaction.atomic():
+        BilanJournalier.objects.bulk_create(
+            bilans, update_conflicts=True, unique_fields=['user', 'date'], update_fields=CHAMPS_BILAN,
+        )
+        # Jours dont toutes les sélections ont été supprimées
+        vides = couples - {(b.user_id, b.date) for b in bilans}
+        if vides:
+            BilanJournalier.objects.filter(_couples_q(vides, 'date')).delete()
+
+
+def reconstruire_bilans(depuis=None, taille_lot=1000):
+    """Recalcule tous les bilans (à partir de `depuis`) ; retourne le nombre de lignes"""
+    selections = TacheSelectionnee.objects.all()
+    bilans = BilanJournalier.objects.all()
+    if depuis:
+        selections = selections.filter(date_selection__gte=depuis)
+        bilans = bilans.filter(date__gte=depuis)
+
+    lignes = [
+        _bilan(ligne)
+        for ligne in selections.values('user_id', 'date_selection').order_by().annotate(**_compteurs())
+    ]
+    with transaction.atomic():
+        bilans.delete()
+        BilanJournalier.objects.bulk_create(lignes, batch_size=taille_lot)
+    return len(lignes)
+
+
+def bilans_par_jour(users, debut, fin):
+    """
+    {(user_id, date): BilanJournalier} de la période, en une requête.
+    `users` : utilisateur, liste ou queryset d'utilisateurs.
+    """
+    if hasattr(users, 'pk'):
+        users = [users]
+    return {
+        (bilan.user_id, bilan.date): bilan
+        for bilan in BilanJournalier.objects.filter(user__in=users, date__range=(debut, fin))
+    }
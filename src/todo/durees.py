@@ -0,0 +1,169 @@
+# todo/durees.py
+"""
+Chronométrage des tâches sélectionnées : états et durée active en colonnes.
+
+Chaque suivi (SuiviTache) est rattaché à la sélection chronométrée
+(`SuiviTache.selection`) ; les suivis antérieurs à ce lien le sont par
+(tâche, utilisateur, jour de leur début). Chaque TacheSelectionnee porte :
+    - `duree_cumulee` : somme de ses suivis fermés ;
+    - `debut_suivi` : début de son suivi ouvert, None à l'arrêt.
+La durée active se lit donc sans requête :
+duree_cumulee + (maintenant - debut_suivi).
+
+`changer_etat` applique une action du chronomètre en un nombre fixe de
+requêtes : démarrer une tâche met en pause les autres (un UPDATE, durée
+cumulée calculée en SQL) et ferme tous les suivis ouverts de l'utilisateur
+(un UPDATE, index partiel sur les suivis ouverts).
+
+`python manage.py reconcilier_durees` recalcule les deux colonnes depuis
+les suivis (reprise des sélections existantes, contrôle).
+"""
+from datetime import timedelta
+
+from django.db.models import DateTimeField, DurationField, ExpressionWrapper, F, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .bilans import actualiser_bilans
+from .models import SuiviTache, TacheSelectionnee
+
+ACTIONS = ('start', 'pause', 'done')
+
+
+def _duree_suivi():
+    return ExpressionWrapper(F('end_time') - F('start_time'), output_field=DurationField())
+
+
+def _cumul_a(instant):
+    """duree_cumulee + suivi en cours jusqu'à `instant`, évalué en SQL"""
+    en_cours = ExpressionWrapper(
+        Value(instant, output_field=DateTimeField()) - F('debut_suivi'), output_field=DurationField()
+    )
+    return F('duree_cumulee') + Coalesce(en_cours, Value(timedelta(0), output_field=DurationField()))
+
+
+def _arreter(selection, instant):
+    """Ferme le suivi ouvert de la sélection (en base) et l'ajoute à son cumul (en mémoire)"""
+    SuiviTache.objects.filter(
+        Q(selection=selection) | Q(selection__isnull=True, tache_id=selection.tache_id),
+        user_id=selection.user_id, end_time__isnull=True,
+    ).update(end_time=instant)
+    if selection.debut_suivi:
+        selection.duree_cumulee += instant - selection.debut_suivi
+        selection.debut_suivi = None
+
+
+def changer_etat(selection, action, instant):
+    """
+    Applique `action` ('start', 'pause', 'done') à la sélection, lue après
+    le verrou de l'utilisateur. Retourne les ids des autres sélections mises
+    en pause (démarrage). Les autres actions sans effet sur l'état courant
+    sont ignorées, comme un double-clic.
+    """
+    champs = ['duree_cumulee', 'debut_suivi']
+
+    if action == 'start':
+        autres = TacheSelectionnee.objects.filter(
+            Q(is_started=True, is_paused=False) | Q(debut_suivi__isnull=False),
+            user_id=selection.user_id,
+        ).exclude(pk=selection.pk)
+        mises_en_pause = dict(autres.values_list('pk', 'date_selection'))
+        if mises_en_pause:
+            TacheSelectionnee.objects.filter(pk__in=mises_en_pause).update(
+                is_started=False, is_paused=True, pause_time=instant,
+                duree_cumulee=_cumul_a(instant), debut_suivi=None,
+            )
+            # UPDATE sans signaux ; le jour de la sélection démarrée suit son save()
+            actualiser_bilans(
+                (selection.user_id, jour) for jour in set(mises_en_pause.values()) - {selection.date_selection}
+            )
+        # Tous les suivis ouverts de l'utilisateur, dont un double démarrage
+        SuiviTache.objects.filter(user_id=selection.user_id, end_time__isnull=True).update(end_time=instant)
+        if selection.debut_suivi:
+            selection.duree_cumulee += instant - selection.debut_suivi
+
+        if not selection.is_started:
+            selection.is_started = True
+            selection.start_time = instant
+        selection.is_paused = False
+        selection.debut_suivi = instant
+        selection.save(update_fields=champs + ['is_started', 'start_time', 'is_paused'])
+        SuiviTache.objects.create(
+            tache_id=selection.tache_id, user_id=selection.user_id, selection=selection, start_time=instant,
+        )
+        return list(mises_en_pause)
+
+    if action == 'pause' and selection.is_started and not selection.is_paused:
+        _arreter(selection, instant)
+        selection.is_paused = True
+        selection.is_started = False
+        selection.pause_time = instant
+        selection.save(update_fields=champs + ['is_paused', 'is_started', 'pause_time'])
+
+    elif action == 'done' and (selection.is_started or selection.is_paused) and not selection.is_done:
+        _arreter(selection, instant)
+        selection.is_done = True
+        selection.is_started = False
+        selection.is_paused = False
+        selection.pause_time = None
+        selection.end_time = instant
+        selection.save(update_fields=champs + ['is_done', 'is_started', 'is_paused', 'pause_time', 'end_time'])
+
+    return []
+
+
+def duree_selections(selections):
+    """Durée active cumulée d'un queryset de sélections (suivis en cours compris)"""
+    cumul = selections.aggregate(total=Sum('duree_cumulee'))['total'] or timedelta(0)
+    maintenant = timezone.now()
+    return cumul + sum(
+        (maintenant - debut for debut in selections.filter(
+            debut_suivi__isnull=False
+        ).values_list('debut_suivi', flat=True)),
+        timedelta(0),
+    )
+
+
+def reconcilier_durees(selections=None, taille_lot=500):
+    """
+    Recalcule `duree_cumulee` et `debut_suivi` depuis les suivis, en deux
+    requêtes d'agrégat ; retourne le nombre de sélections corrigées.
+    """
+    selections = selections if selections is not None else TacheSelectionnee.objects.all()
+
+    # Suivis rattachés : par sélection ; suivis antérieurs : par (tâche, utilisateur, jour)
+    fermes, ouverts = {}, {}
+    groupes = (
+        SuiviTache.objects.filter(selection__isnull=False).values('selection_id'),
+        SuiviTache.objects.filter(selection__isnull=True).annotate(
+            jour=TruncDate('start_time')
+        ).values('tache_id', 'user_id', 'jour'),
+    )
+    for groupe in groupes:
+        for ligne in groupe.order_by().annotate(
+            total=Sum(_duree_suivi(), filter=Q(end_time__isnull=False)),
+            debut=Max('start_time', filter=Q(end_time__isnull=True)),
+        ):
+            cle = ligne.get('selection_id') or (ligne['tache_id'], ligne['user_id'], ligne['jour'])
+            fermes[cle] = (fermes.get(cle) or timedelta(0)) + (ligne['total'] or timedelta(0))
+            if ligne['debut']:
+                ouverts[cle] = ligne['debut']
+
+    corrigees = []
+    for selection in selections.only(
+        'pk', 'tache_id', 'user_id', 'date_selection', 'duree_cumulee', 'debut_suivi'
+    ).iterator(chunk_size=taille_lot):
+        cles = (selection.pk, (selection.tache_id, selection.user_id, selection.date_selection))
+        attendu = (
+            sum((fermes.get(cle) or timedelta(0) for cle in cles), timedelta(0)),
+            max((ouverts[cle] for cle in cles if cle in ouverts), default=None),
+        )
+        if (selection.duree_cumulee, selection.debut_suivi) != attendu:
+            selection.duree_cumulee, selection.debut_suivi = attendu
+            corrigees.append(selection)
+
+    TacheSelectionnee.objects.bulk_update(
+        corrigees, ['duree_cumulee', 'debut_suivi'], batch_size=taille_lot
+    )
+    actualiser_bilans((s.user_id, s.date_selection) for s in corrigees)
+    return len(corrigees)
@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from authentication.models import User
+from todo.models import ModeleSemaine
+from todo.programmation import appliquer_modele, reporter_non_terminees
+
+
+class Command(BaseCommand):
+    help = (
+        'Programmation en masse : applique une semaine type (--modele) aux employés de sa '
+        'fiche de poste, ou reporte les tâches non terminées d\'un jour (--reporter, cron quotidien)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modele', type=int, help='Id de la semaine type (ModeleSemaine) à appliquer')
+        parser.add_argument('--semaine', help='Un jour de la première semaine visée (AAAA-MM-JJ, défaut : semaine prochaine)')
+        parser.add_argument('--semaines', type=int, default=1, help='Nombre de semaines à programmer')
+        parser.add_argument('--reporter', help='Jour dont les tâches non terminées sont reportées (AAAA-MM-JJ ou "hier")')
+        parser.add_argument('--vers', help='Jour de destination du report (défaut : lendemain)')
+        parser.add_argument('--deplacer', action='store_true', help='Déplacer les tâches jamais démarrées au lieu de les copier')
+
+    def _date(self, valeur, option):
+        if valeur == 'hier':
+            return timezone.localdate() - timedelta(days=1)
+        date = parse_date(valeur)
+        if date is None:
+            raise CommandError(f"{option} : date invalide ({valeur})")
+        return date
+
+    def handle(self, *args, **options):
+        if not options['modele'] and not options['reporter']:
+            raise CommandError('Indiquer --modele ou --reporter')
+
+        if options['modele']:
+            try:
+                modele = ModeleSemaine.objects.select_related('fiche_poste').get(pk=options['modele'])
+            except ModeleSemaine.DoesNotExist:
+                raise CommandError(f"Semaine type introuvable : {options['modele']}")
+            if options['semaine']:
+                jour = self._date(options['semaine'], '--semaine')
+            else:
+                jour = timezone.localdate() + timedelta(weeks=1)
+            lundi = jour - timedelta(days=jour.weekday())
+            lundis = [lundi + timedelta(weeks=i) for i in range(options['semaines'])]
+
+            employes = User.objects.filter(employeeprofile__fiche_poste=modele.fiche_poste)
+            total = appliquer_modele(modele, employes, lundis)
+            self.stdout.write(self.style.SUCCESS(
+                f'{modele} : {total} nouvelles tâches programmées à partir du {lundi:%d/%m/%Y} (déjà programmées ignorées)'
+            ))
+
+        if options['reporter']:
+            jour = self._date(options['reporter'], '--reporter')
+            vers = self._date(options['vers'], '--vers') if options['vers'] else None
+            total = reporter_non_terminees(jour, vers, deplacer=options['deplacer'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{total} tâches non terminées du {jour:%d/%m/%Y} reportées (déjà programmées ignorées)'
+            ))
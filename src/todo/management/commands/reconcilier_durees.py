@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from todo.durees import reconcilier_durees
+from todo.models import TacheSelectionnee
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcule la durée cumulée et le suivi en cours des tâches sélectionnées '
+        'depuis SuiviTache (reprise des sélections existantes, contrôle)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--depuis', help='Seulement les sélections à partir de cette date (AAAA-MM-JJ)')
+        parser.add_argument('--batch', type=int, default=500, help='Taille des lots de mise à jour')
+
+    def handle(self, *args, **options):
+        selections = TacheSelectionnee.objects.all()
+        if options['depuis']:
+            depuis = parse_date(options['depuis'])
+            if depuis is None:
+                raise CommandError(f"Date invalide : {options['depuis']}")
+            selections = selections.filter(date_selection__gte=depuis)
+
+        corrigees = reconcilier_durees(selections, taille_lot=options['batch'])
+        self.stdout.write(
+            self.style.SUCCESS(f'{corrigees} sélections corrigées')
+        )
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from todo.bilans import reconstruire_bilans
+
+
+class Command(BaseCommand):
+    help = 'Recalcule les bilans journaliers (utilisateur, jour) depuis les tâches sélectionnées'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--depuis', help='Seulement les jours à partir de cette date (AAAA-MM-JJ)')
+        parser.add_argument('--batch', type=int, default=1000, help='Taille des lots d\'insertion')
+
+    def handle(self, *args, **options):
+        depuis = None
+        if options['depuis']:
+            depuis = parse_date(options['depuis'])
+            if depuis is None:
+                raise CommandError(f"Date invalide : {options['depuis']}")
+
+        total = reconstruire_bilans(depuis, taille_lot=options['batch'])
+        self.stdout.write(
+            self.style.SUCCESS(f'{total} bilans journaliers recalculés')
+        )
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:23
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0003_tache_commentaire_rh_tache_duree_estimee'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tacheselectionnee',
+            name='debut_suivi',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='tacheselectionnee',
+            name='duree_cumulee',
+            field=models.DurationField(default=datetime.timedelta(0), editable=False),
+        ),
+    ]
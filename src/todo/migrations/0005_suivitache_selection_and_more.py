@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0004_tacheselectionnee_debut_suivi_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='suivitache',
+            name='selection',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='suivis', to='todo.tacheselectionnee'),
+        ),
+        migrations.AddIndex(
+            model_name='suivitache',
+            index=models.Index(condition=models.Q(('end_time__isnull', True)), fields=['user'], name='suivi_ouvert_user_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0006_bilanjournalier'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tacheselectionnee',
+            index=models.Index(fields=['user', 'date_selection'], name='selection_user_date_idx'),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:31
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Doublons (utilisateur, tâche, jour) laissés par les anciens get_or_create
+# concurrents : la sélection la plus avancée est gardée, les suivis des
+# autres lui sont rattachés. Puis : reconcilier_durees et reconstruire_bilans.
+DOUBLONS = """
+    WITH classees AS (
+        SELECT id, FIRST_VALUE(id) OVER (
+            PARTITION BY user_id, tache_id, date_selection
+            ORDER BY is_done DESC, duree_cumulee DESC, id
+        ) AS gardee
+        FROM todo_tacheselectionnee
+    )
+    SELECT id, gardee FROM classees WHERE id <> gardee
+"""
+
+SUPPRIMER_DOUBLONS = f"""
+    UPDATE todo_suivitache s SET selection_id = d.gardee
+    FROM ({DOUBLONS}) d WHERE s.selection_id = d.id;
+    DELETE FROM todo_tacheselectionnee t
+    USING ({DOUBLONS}) d WHERE t.id = d.id;
+    -- La FK todo_suivitache.selection_id est différée : ses vérifications en
+    -- attente bloqueraient l'ALTER TABLE de la contrainte qui suit
+    SET CONSTRAINTS ALL IMMEDIATE;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0007_tacheselectionnee_selection_user_date_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LigneModeleSemaine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jour', models.PositiveSmallIntegerField(choices=[(0, 'Lundi'), (1, 'Mardi'), (2, 'Mercredi'), (3, 'Jeudi'), (4, 'Vendredi'), (5, 'Samedi')])),
+            ],
+            options={
+                'ordering': ['jour', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ModeleSemaine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('titre', models.CharField(max_length=255)),
+                ('date_creation', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.RunSQL(SUPPRIMER_DOUBLONS, migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='tacheselectionnee',
+            constraint=models.UniqueConstraint(fields=('user', 'tache', 'date_selection'), name='selection_user_tache_date_uniq'),
+        ),
+        migrations.AddField(
+            model_name='lignemodelesemaine',
+            name='tache',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='todo.tache'),
+        ),
+        migrations.AddField(
+            model_name='modelesemaine',
+            name='fiche_poste',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='modeles_semaine', to='todo.ficheposte'),
+        ),
+        migrations.AddField(
+            model_name='lignemodelesemaine',
+            name='modele',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lignes', to='todo.modelesemaine'),
+        ),
+        migrations.AddConstraint(
+            model_name='lignemodelesemaine',
+            constraint=models.UniqueConstraint(fields=('modele', 'tache', 'jour'), name='ligne_modele_semaine_uniq'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.utils import timezone
 from datetime import timedelta
 
@@ -9,10 +10,20 @@ User = get_user_model()
 class SuiviTache(models.Model):
     tache = models.ForeignKey('Tache', on_delete=models.CASCADE, related_name='suivis')
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    # Sélection chronométrée (vide pour les suivis antérieurs : rattachés par jour)
+    selection = models.ForeignKey(
+        'TacheSelectionnee', on_delete=models.SET_NULL, null=True, blank=True, related_name='suivis'
+    )
     
     start_time = models.DateTimeField()
     end_time = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Suivis ouverts : quelques lignes, cherchées à chaque clic
+            models.Index(fields=['user'], condition=models.Q(end_time__isnull=True), name='suivi_ouvert_user_idx'),
+        ]
+
     # Dans models.py > SuiviTache
     def duree(self):
         end = self.end_time or timezone.now()
@@ -68,27 +79,27 @@ class TacheSelectionnee(models.Model):
     
     commentaire_rh = models.TextField(blank=True, null=True)  
     commentaire_employe = models.TextField(blank=True, null=True) 
+
+    # Durée des suivis fermés et début du suivi en cours (todo/durees.py)
+    duree_cumulee = models.DurationField(default=timedelta(0), editable=False)
+    debut_suivi = models.DateTimeField(null=True, blank=True, editable=False)
      
     def duree_pause_en_cours(self):
         if self.is_paused and self.pause_time:
             return timezone.now() - self.pause_time
         return timedelta(0)
     def duree_active(self):
-        suivis = SuiviTache.objects.filter(
-            tache=self.tache,
-            user=self.user,
-            start_time__date=self.date_selection 
-        )
-        total = timedelta()
-        for s in suivis:
-            total += s.duree()
+        """Durée des suivis du jour, lue en colonnes (aucune requête)"""
+        total = self.duree_cumulee
+        if self.debut_suivi:
+            total += timezone.now() - self.debut_suivi
         return total
 
     
     @property
     def duree_active_affichee(self):
         total = self.duree_active()
-        heures, reste = divmod(total.seconds, 3600)
+        heures, reste = divmod(int(total.total_seconds()), 3600)
         minutes, secondes = divmod(reste, 60)
         return f"{heures:02d}:{minutes:02d}:{secondes:02d}"
     
@@ -111,9 +122,43 @@ class TacheSelectionnee(models.Model):
             return self.end_time - self.start_time
             
         return timezone.now() - self.start_time
+
+    class Meta:
+        indexes = [
+            # Planning et pages du jour : (utilisateurs, période) (todo/planning.py)
+            models.Index(fields=['user', 'date_selection'], name='selection_user_date_idx'),
+        ]
+        constraints = [
+            # Une tâche au plus une fois par jour : programmation en masse sans doublon
+            models.UniqueConstraint(
+                fields=['user', 'tache', 'date_selection'], name='selection_user_tache_date_uniq'
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.tache.titre} ({self.date_selection})"
 
+class BilanJournalier(models.Model):
+    """Compteurs des tâches sélectionnées d'un utilisateur pour un jour (todo/bilans.py)"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='bilans_journaliers')
+    date = models.DateField()
+    total = models.PositiveIntegerField(default=0)
+    terminees = models.PositiveIntegerField(default=0)
+    en_cours = models.PositiveIntegerField(default=0)
+    en_pause = models.PositiveIntegerField(default=0)
+    # Durée des suivis fermés (duree_cumulee), en secondes
+    secondes_actives = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Sert aussi d'index aux lectures (utilisateurs, période)
+            models.UniqueConstraint(fields=['user', 'date'], name='bilan_journalier_user_date_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.date} ({self.terminees}/{self.total})"
+
+
 class FichePoste(models.Model):
     titre = models.CharField(max_length=255)
     employe = models.ForeignKey(User, on_delete=models.CASCADE, related_name="fiches", null=True, blank=True)
@@ -121,4 +166,38 @@ class FichePoste(models.Model):
     date_creation = models.DateTimeField(default=timezone.now)  # Exemple d'utilisation
 
     def __str__(self):
-        return f"{self.titre}"
\ No newline at end of file
+        return f"{self.titre}"
+
+
+class ModeleSemaine(models.Model):
+    """Semaine type d'une fiche de poste, appliquée en masse (todo/programmation.py)"""
+    titre = models.CharField(max_length=255)
+    fiche_poste = models.ForeignKey(FichePoste, on_delete=models.CASCADE, related_name='modeles_semaine')
+    date_creation = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.titre} ({self.fiche_poste})"
+
+
+class LigneModeleSemaine(models.Model):
+    JOURS = [
+        (0, 'Lundi'), (1, 'Mardi'), (2, 'Mercredi'),
+        (3, 'Jeudi'), (4, 'Vendredi'), (5, 'Samedi'),
+    ]
+
+    modele = models.ForeignKey(ModeleSemaine, on_delete=models.CASCADE, related_name='lignes')
+    tache = models.ForeignKey(Tache, on_delete=models.CASCADE)
+    jour = models.PositiveSmallIntegerField(choices=JOURS)
+
+    class Meta:
+        ordering = ['jour', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['modele', 'tache', 'jour'], name='ligne_modele_semaine_uniq'),
+        ]
+
+    def clean(self):
+        if self.tache_id and self.modele_id and self.tache.fiche_poste_id != self.modele.fiche_poste_id:
+            raise ValidationError({'tache': "La tâche doit appartenir à la fiche de poste du modèle."})
+
+    def __str__(self):
+        return f"{self.get_jour_display()} - {self.tache}"
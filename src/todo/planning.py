@@ -0,0 +1,43 @@
+# todo/planning.py
+"""
+Planning des tâches sélectionnées : une période (semaine, mois) pour un ou
+plusieurs utilisateurs, lue en une requête.
+
+`planning` charge les sélections de la période par `date_selection__range`
+(index selection_user_date_idx), avec leur tâche, puis les regroupe en
+Python : {user_id: {jour: [sélections]}}. Les jours
+sans tâche sont absents ; le filtre de gabarit `get_item` renvoie alors
+une liste vide.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import TacheSelectionnee
+
+JOURS_PLANNING = 6  # Lundi à samedi
+
+
+def semaine(offset=0, nb_jours=JOURS_PLANNING):
+    """Jours de la semaine courante décalée de `offset` semaines, à partir du lundi"""
+    today = timezone.localdate()
+    lundi = today - timedelta(days=today.weekday()) + timedelta(weeks=offset)
+    return [lundi + timedelta(days=i) for i in range(nb_jours)]
+
+
+def planning(users, debut, fin):
+    """
+    {user_id: {jour: [sélections]}} de la période, en une requête.
+    `users` : utilisateur, liste ou queryset d'utilisateurs.
+    """
+    if hasattr(users, 'pk'):
+        users = [users]
+    selections = TacheSelectionnee.objects.filter(
+        user__in=users, date_selection__range=(debut, fin),
+    ).select_related('tache').order_by('date_selection', 'id')
+
+    grille = defaultdict(lambda: defaultdict(list))
+    for selection in selections:
+        grille[selection.user_id][selection.date_selection].append(selection)
+    return {user_id: dict(jours) for user_id, jours in grille.items()}
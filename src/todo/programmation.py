@@ -0,0 +1,118 @@
+# todo/programmation.py
+"""
+Programmation des tâches en masse : sélections de plusieurs utilisateurs
+et jours insérées en une requête.
+
+L'unicité (utilisateur, tâche, jour) est garantie par la contrainte
+selection_user_tache_date_uniq : les insertions passent par
+bulk_create(ignore_conflicts=True), une tâche déjà programmée est ignorée
+au lieu d'un get_or_create par tâche. bulk_create ne déclenchant pas les
+signaux, les bilans des jours touchés sont recalculés une fois à la fin.
+
+Semaines types : un ModeleSemaine liste les tâches d'une fiche de poste
+par jour (0 = lundi) ; `appliquer_modele` le programme pour des
+utilisateurs et des semaines (lundis) en une insertion. Les fonctions
+retournent le nombre de sélections réellement créées.
+
+`reporter_non_terminees` reporte les tâches non terminées d'un jour sur
+un autre (par défaut le lendemain) : une lecture, un UPDATE (déplacement)
+et une insertion, quel que soit le nombre d'employés.
+`python manage.py programmer_taches` expose ces opérations (cron, RH).
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from .bilans import actualiser_bilans
+from .models import LigneModeleSemaine, ModeleSemaine, TacheSelectionnee
+
+TAILLE_LOT = 1000
+
+
+def _ids(users):
+    """Ids d'un utilisateur, d'une liste ou d'un queryset d'utilisateurs"""
+    if hasattr(users, 'pk'):
+        return [users.pk]
+    if hasattr(users, 'values_list'):
+        return list(users.values_list('pk', flat=True))
+    return [getattr(user, 'pk', user) for user in users]
+
+
+def programmer(lignes, taille_lot=TAILLE_LOT):
+    """
+    Programme les (user_id, tache_id, jour) ; les tâches déjà programmées ce
+    jour-là sont ignorées. Retourne le nombre de sélections créées.
+    """
+    lignes = set(lignes)
+    if not lignes:
+        return 0
+    # ignore_conflicts ne renvoie pas les lignes insérées : comptage avant / après
+    concernees = TacheSelectionnee.objects.filter(
+        user_id__in={user_id for user_id, _, _ in lignes},
+        date_selection__in={jour for _, _, jour in lignes},
+    )
+    with transaction.atomic():
+        avant = concernees.count()
+        TacheSelectionnee.objects.bulk_create(
+            [
+                TacheSelectionnee(user_id=user_id, tache_id=tache_id, date_selection=jour)
+                for user_id, tache_id, jour in lignes
+            ],
+            batch_size=taille_lot, ignore_conflicts=True,
+        )
+        actualiser_bilans((user_id, jour) for user_id, _, jour in lignes)
+        return concernees.count() - avant
+
+
+def modele_depuis_fiche(fiche_poste, titre=None, jours=range(5)):
+    """Semaine type reprenant toutes les tâches de la fiche, chaque jour de `jours`"""
+    with transaction.atomic():
+        modele = ModeleSemaine.objects.create(
+            titre=titre or f"Semaine type - {fiche_poste.titre}", fiche_poste=fiche_poste,
+        )
+        LigneModeleSemaine.objects.bulk_create([
+            LigneModeleSemaine(modele=modele, tache_id=tache_id, jour=jour)
+            for tache_id in fiche_poste.taches.values_list('pk', flat=True)
+            for jour in jours
+        ])
+    return modele
+
+
+def appliquer_modele(modele, users, lundis):
+    """Programme la semaine type pour chaque utilisateur et chaque semaine (lundi)"""
+    jours_taches = list(modele.lignes.values_list('jour', 'tache_id'))
+    return programmer(
+        (user_id, tache_id, lundi + timedelta(days=jour))
+        for user_id in _ids(users)
+        for lundi in lundis
+        for jour, tache_id in jours_taches
+    )
+
+
+def reporter_non_terminees(jour, vers=None, users=None, deplacer=False):
+    """
+    Reporte sur `vers` (lendemain par défaut) les tâches non terminées de
+    `jour` : copie, ou avec `deplacer` déplacement des tâches jamais
+    démarrées (un UPDATE ; celles démarrées restent sur `jour` avec leur
+    temps passé et sont recopiées). Retourne le nombre de tâches ajoutées
+    à `vers` (déplacées ou copiées).
+    """
+    vers = vers or jour + timedelta(days=1)
+    non_terminees = TacheSelectionnee.objects.filter(date_selection=jour, is_done=False)
+    if users is not None:
+        non_terminees = non_terminees.filter(user_id__in=_ids(users))
+
+    with transaction.atomic():
+        a_reporter = list(non_terminees.values_list('user_id', 'tache_id'))
+        deplacees = 0
+        if deplacer:
+            deja_programmee = TacheSelectionnee.objects.filter(
+                user_id=OuterRef('user_id'), tache_id=OuterRef('tache_id'), date_selection=vers,
+            )
+            deplacees = non_terminees.filter(
+                is_started=False, is_paused=False, start_time__isnull=True,
+            ).exclude(Exists(deja_programmee)).update(date_selection=vers)
+            actualiser_bilans((user_id, jour) for user_id, _ in a_reporter)
+        # Les tâches déplacées sont déjà sur `vers` : ignorées par la contrainte
+        return deplacees + programmer((user_id, tache_id, vers) for user_id, tache_id in a_reporter)
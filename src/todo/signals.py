@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .bilans import actualiser_bilans
+from .models import TacheSelectionnee
+
+
+@receiver(post_save, sender=TacheSelectionnee)
+@receiver(post_delete, sender=TacheSelectionnee)
+def actualiser_bilan_jour(sender, instance, **kwargs):
+    """Le bilan du jour de la sélection suit chaque écriture"""
+    actualiser_bilans([(instance.user_id, instance.date_selection)])
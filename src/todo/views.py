@@ -6,6 +6,10 @@ import json
 from django.shortcuts import render, redirect,get_object_or_404
 from django.utils import timezone
 from .models import Tache, TacheSelectionnee, FichePoste, SuiviTache
+from .bilans import bilans_par_jour
+from .planning import planning, semaine
+from .programmation import programmer
+from .durees import ACTIONS, changer_etat, duree_selections
 from django.utils.dateparse import parse_date
 from django.views.decorators.http import require_POST
 from collections import defaultdict
@@ -20,9 +24,10 @@ from django.contrib import messages
 from django.db.models.functions import TruncMonth, TruncDate
 import csv
 from io import BytesIO
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
 from django.template.loader import render_to_string
-from authentication.models import EmployeeProfile
+from django.middleware.csrf import get_token
+from authentication.models import EmployeeProfile, User
 from xhtml2pdf import pisa  
 
 
@@ -33,17 +38,10 @@ from xhtml2pdf import pisa
 def get_planning_context(request):
     offset = int(request.GET.get('semaine', 0))
     today = timezone.localdate()
-    monday = today - timedelta(days=today.weekday()) + timedelta(weeks=offset)
-    
-    # Génération des jours du lundi au samedi seulement
-    jours = [monday + timedelta(days=i) for i in range(6)]  # 0=Monday to 5=Saturday
     
-    taches_par_jour = {}
-    for jour in jours:
-        taches_par_jour[jour] = TacheSelectionnee.objects.filter(
-            user=request.user,
-            date_selection=jour
-        ).select_related('tache')
+    # Du lundi au samedi, lus en une requête
+    jours = semaine(offset)
+    taches_par_jour = planning(request.user, jours[0], jours[-1]).get(request.user.pk, {})
     
     return {
         'jours': jours,
@@ -94,101 +92,47 @@ def supprimer_tache_selectionnee(request, sel_id):
     sel.delete()
     return redirect("mes-taches")
 
+def _etat_selection(sel):
+    return {
+        'id': sel.id,
+        'etat': sel.etat_courant,
+        'is_started': sel.is_started,
+        'is_paused': sel.is_paused,
+        'is_done': sel.is_done,
+        'duree_cumulee': sel.duree_cumulee.total_seconds(),
+        'debut_suivi': sel.debut_suivi.isoformat() if sel.debut_suivi else None,
+    }
+
+
 @require_POST
 @login_required
 def changer_etat_tache_selectionnee(request, sel_id):
-    selection = get_object_or_404(TacheSelectionnee, id=sel_id, user=request.user)
     action = request.POST.get("action")
+    if action not in ACTIONS:
+        return HttpResponseBadRequest("Action inconnue")
     now = timezone.now()
 
     with transaction.atomic():
-        if action == "start":
-            # Mettre en pause les autres tâches
-            autres = TacheSelectionnee.objects.filter(
-                user=request.user,
-                is_started=True,
-                
-                is_paused=False
-            ).exclude(id=selection.id)
-
-            for autre in autres:
-                autre.is_paused = True
-                autre.is_started = False
-                autre.save()
-
-                suivi = SuiviTache.objects.filter(
-                    tache=autre.tache,
-                    user=request.user,
-                    end_time__isnull=True
-                ).last()
-
-                if suivi:
-                    suivi.end_time = now
-                    suivi.save()
-
-            if not selection.is_started:
-                selection.is_started = True
-                selection.start_time = now
-
-            selection.is_paused = False
-            selection.save()
-
-            SuiviTache.objects.create(
-                tache=selection.tache,
-                user=request.user,
-                start_time=now
-            )
-
-        elif action == "pause":
-            if selection.is_started and not selection.is_paused:
-                selection.is_paused = True
-                selection.is_started = False  # Ajout ici pour arrêter le chrono
-                selection.pause_time = now
-                selection.save()
-
-                suivi = SuiviTache.objects.filter(
-                    tache=selection.tache,
-                    user=request.user,
-                    end_time__isnull=True
-                ).last()
-
-                if suivi:
-                    suivi.end_time = now
-                    suivi.save()
-
-
-        elif action == "done":
-            if (selection.is_started or selection.is_paused) and not selection.is_done:
-                selection.is_done = True
-                selection.is_started = False
-                selection.is_paused = False
-                selection.pause_time = None
-                selection.end_time = now
-                selection.save()
-
-                # Fermer un suivi en cours s’il y en a
-                suivi = SuiviTache.objects.filter(
-                    tache=selection.tache,
-                    user=request.user,
-                    end_time__isnull=True
-                ).last()
-
-                if suivi:
-                    suivi.end_time = now
-                    suivi.save()
-
-                # Calcule de la durée réelle (somme des suivis)
-                total = timedelta()
-                for s in SuiviTache.objects.filter(
-                    tache=selection.tache,
-                    user=request.user
-                ):
-                    total += s.duree()
-
-                # Sauvegarde dans TacheSelectionnee (si tu ajoutes un champ duree_total)
-                # selection.duree_total = total
-                # selection.save()
-
+        # Verrou par utilisateur : un double-clic attend la fin du premier
+        list(User.objects.select_for_update().filter(pk=request.user.pk).values_list('pk', flat=True))
+        selection = get_object_or_404(TacheSelectionnee, id=sel_id, user=request.user)
+        mises_en_pause = changer_etat(selection, action, now)
+
+    # Réponses partielles : la ligne modifiée et celles mises en pause
+    if request.headers.get('HX-Request') or 'application/json' in request.headers.get('Accept', ''):
+        modifiees = TacheSelectionnee.objects.filter(
+            pk__in=[selection.pk, *mises_en_pause]
+        ).select_related('tache').order_by('pk')
+        if request.headers.get('HX-Request'):
+            # Jeton CSRF passé directement : pas de processeurs de contexte par ligne
+            csrf_token = get_token(request)
+            return HttpResponse(''.join(
+                render_to_string('todo/partials/selection_item.html', {
+                    'sel': sel, 'oob': sel.pk != selection.pk, 'csrf_token': csrf_token,
+                })
+                for sel in modifiees
+            ))
+        return JsonResponse({'selections': [_etat_selection(sel) for sel in modifiees]})
 
     return redirect("dashboard")
 
@@ -219,6 +163,7 @@ def historique_par_mois(request):
     semaines = []
     current_date = date_debut
     semaine_num = 1
+    bilans = bilans_par_jour(request.user, date_debut, date_fin)
     
     while current_date <= date_fin:
         # Déterminer le début et la fin de la semaine
@@ -234,16 +179,10 @@ def historique_par_mois(request):
             if date_courante > date_fin:
                 break
             
-            # Compter les tâches (optimisation: une seule requête par jour)
-            taches = TacheSelectionnee.objects.filter(
-                user=request.user,
-                date_selection=date_courante
-            ).aggregate(
-                total=Count('id'),
-                terminees=Count('id', filter=Q(is_done=True))
-            )
-            total = taches['total']
-            terminees = taches['terminees']
+            # Compteurs du jour lus dans les bilans du mois (une requête)
+            bilan = bilans.get((request.user.pk, date_courante))
+            total = bilan.total if bilan else 0
+            terminees = bilan.terminees if bilan else 0
             
             # Calculer le pourcentage
             pourcentage = round((terminees / total) * 100) if total > 0 else 0
@@ -306,12 +245,7 @@ def historique_jour(request, date_str):
     terminees = taches.filter(is_done=True).count()
     
     # Calcul du temps total et moyen
-    suivis = SuiviTache.objects.filter(
-        user=request.user,
-        start_time__date=date_obj
-    )
-    
-    duree_totale = sum((s.duree() for s in suivis), timedelta())
+    duree_totale = duree_selections(taches)
     moyenne = duree_totale / total if total > 0 else timedelta()
     
     context = {
@@ -400,7 +334,7 @@ def statistique_globale(request):
     en_pause = taches_auj.filter(is_paused=True, is_done=False).count()
     non_demarre = taches_auj.filter(is_started=False, is_paused=False, is_done=False).count()
 
-    duree_totale = sum((s.duree() for s in SuiviTache.objects.filter(user=user, start_time__date=today)), timedelta())
+    duree_totale = duree_selections(taches_auj)
     moyenne_par_tache = duree_totale / total_selectionnees if total_selectionnees > 0 else timedelta()
 
     historique_jour = []
@@ -481,6 +415,16 @@ from django.contrib import messages
 from django.core.exceptions import ObjectDoesNotExist
 from authentication.models import EmployeeProfile
 
+def _programmer_taches(request, user, fiche_poste, tache_ids, date_selection):
+    """Programme les tâches cochées de la fiche de poste : une vérification, une insertion"""
+    valides = set(Tache.objects.filter(
+        id__in=tache_ids, fiche_poste=fiche_poste
+    ).values_list('id', flat=True))
+    for tache_id in sorted(set(tache_ids) - valides):
+        messages.warning(request, f"⚠️ La tâche #{tache_id} n'existe pas ou ne fait pas partie de votre fiche de poste.")
+    programmer((user.pk, tache_id, date_selection) for tache_id in valides)
+
+
 @login_required
 def programmer_semaine(request):
     user = request.user
@@ -527,18 +471,8 @@ def programmer_semaine(request):
             # ✅ Supprimer celles décochées
             anciennes_selectionnees.exclude(tache__id__in=tache_ids).delete()
 
-            # ✅ Ajouter les nouvelles (en évitant les doublons)
-            for tache_id in tache_ids:
-                try:
-                    tache = Tache.objects.get(id=tache_id, fiche_poste=profile.fiche_poste)
-                    TacheSelectionnee.objects.get_or_create(
-                        user=user,
-                        tache=tache,
-                        date_selection=date_selection
-                    )
-                except Tache.DoesNotExist:
-                    messages.warning(request, f"⚠️ La tâche #{tache_id} n'existe pas ou ne fait pas partie de votre fiche de poste.")
-                    continue
+            # ✅ Ajouter les nouvelles en une insertion (doublons ignorés par la contrainte)
+            _programmer_taches(request, user, profile.fiche_poste, tache_ids, date_selection)
 
             messages.success(request, "✅ Votre programme a été mis à jour avec succès.")
             return redirect('dashboard')
@@ -553,8 +487,9 @@ def programmer_semaine(request):
         date_selection = parse_date(date_str) if date_str else today
 
         taches = Tache.objects.filter(fiche_poste=profile.fiche_poste)
-        selectionnees = TacheSelectionnee.objects.filter(user=user, date_selection=date_selection)
-        taches_selectionnees_ids = [s.tache.id for s in selectionnees]
+        taches_selectionnees_ids = list(TacheSelectionnee.objects.filter(
+            user=user, date_selection=date_selection
+        ).values_list('tache_id', flat=True))
 
         # Debug: Vérifier ce qui est récupéré
         print(f"Fiche de poste: {profile.fiche_poste}")
@@ -616,18 +551,7 @@ def selection_taches(request):
                 except (ValueError, TypeError):
                     continue  # Ignorer les valeurs invalides
 
-            for tache_id in tache_ids:
-                try:
-                    # Vérifier que la tâche appartient à la fiche de poste de l'utilisateur
-                    tache = Tache.objects.get(id=tache_id, fiche_poste=profile.fiche_poste)
-                    TacheSelectionnee.objects.get_or_create(
-                        user=user,
-                        tache=tache,
-                        date_selection=date_selection
-                    )
-                except Tache.DoesNotExist:
-                    messages.warning(request, f"⚠️ La tâche #{tache_id} n'existe pas ou ne fait pas partie de votre fiche de poste.")
-                    continue
+            _programmer_taches(request, user, profile.fiche_poste, tache_ids, date_selection)
 
             messages.success(request, "✅ Vos tâches ont été sélectionnées avec succès.")
             return redirect('mes-taches')
@@ -642,8 +566,9 @@ def selection_taches(request):
         date_selection = parse_date(date_str) if date_str else today
 
         taches = Tache.objects.filter(fiche_poste=profile.fiche_poste)
-        selectionnees = TacheSelectionnee.objects.filter(user=user, date_selection=date_selection)
-        taches_selectionnees_ids = [s.tache.id for s in selectionnees]
+        taches_selectionnees_ids = list(TacheSelectionnee.objects.filter(
+            user=user, date_selection=date_selection
+        ).values_list('tache_id', flat=True))
 
         # Debug: Vérifier ce qui est récupéré
         print(f"Fiche de poste: {profile.fiche_poste}")